@@ -0,0 +1,518 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:02:51 2026
+"""
+
+import re
+import inspect
+import datetime
+import eventkit
+from ib_insync import Contract, ContractDetails, PriceCondition
+from ib_insync.client import Client
+from ib_insync.objects import Execution, CommissionReport, PriceIncrement
+from ib_insync.order import OrderState
+from ib_insync.util import UNSET_DOUBLE
+
+import utils
+from trader import LiveTrader
+from subscriptions import Subscriptions
+from recording import TickReplay, readContracts
+from indicatorcache import ReplayBarBuilder, ReplayATR, ReplayDirectionalMovement
+
+
+NOT_SIMULATED = 10999    # error code of the requests a backtest does not simulate
+
+
+class WorkingOrder:
+    """ An order held by the SimulatedBroker
+        *state is 'held' until its group is transmitted, 'pending' while it
+         waits on its parent's fill or its price conditions, then 'working' """
+
+    def __init__(self, orderId, contract, order, permId):
+        self.orderId  = orderId
+        self.contract = contract
+        self.order    = order
+        self.permId   = permId
+        self.state    = 'held'
+        self.stop     = None
+
+    @property
+    def buy(self):
+        return self.order.action == 'BUY'
+
+
+class SimulatedBroker(Client):
+    """ Stands in for the ib_insync Client of a backtest
+        *requests are answered through the Wrapper callbacks, so trades, fills,
+         commission reports, positions and PnL reach the IB events as they do live
+        *order requests are queued and processed at the next tick (or sleep),
+         as a live order is only acknowledged after placeOrder returns
+        *orders fill in full against the bid/ask of the replayed ticks:
+         MKT at the touch, LMT once the touch reaches the limit, STP and TRAIL
+         at the touch once triggered, price conditions on the midpoint
+        *bracket children wait on their parent and cancel each other,
+         orders sharing an ocaGroup cancel each other
+        *commission is commission_rate of the traded value, at least min_commission
+        *simulated requests: contract details, market rules, tick-by-tick data,
+         PnL, orders, open and completed orders, executions, positions,
+         account updates and the current time, any other request is answered
+         with a NOT_SIMULATED error as IB answers a request it does not support """
+
+    def __init__(self, wrapper, account='BACKTEST', contracts=(),
+                 commission_rate=0.00002, min_commission=2.0):
+        self.account         = account
+        super().__init__(wrapper)
+        self.contracts       = {c.conId: c for c in contracts}
+        self.commission_rate = commission_rate
+        self.min_commission  = min_commission
+        self.time      = 0
+        self.quotes    = {}
+        self.requests  = []
+        self.orders    = {}
+        self.positions = {}
+        self.pnlReqs   = []
+        self.realized  = 0.0
+        self.commissions = 0.0
+        self.executions  = 0
+        self._permId   = 0
+        self._execId   = 0
+
+    def reset(self):
+        super().reset()
+        self.connState   = Client.CONNECTED
+        self._apiReady   = True
+        self._reqIdSeq   = 1
+        self.wrapper.accounts = [self.account]
+
+    def send(self, *fields, makeEmpty=True):
+        self.notSimulated(f'request {fields[0]}')
+
+    def notSimulated(self, request, reqId=-1):
+        """ Answer a request with a NOT_SIMULATED error, ending the IB call awaiting it
+            *a request without a reqId is awaited under a name, it ends without a result """
+        self.wrapper.error(reqId, NOT_SIMULATED, f'{request} is not simulated in a backtest', '')
+        if reqId == -1:
+            for key in [key for key in self.wrapper._futures if isinstance(key, str)]:
+                self.wrapper._endReq(key)
+
+    def disconnect(self):
+        Client.reset(self)
+
+    @property
+    def datetime(self):
+        """ tz-aware datetime of the last tick """
+        return utils.EPOCH_UTC + datetime.timedelta(microseconds=self.time//1000)
+
+    """
+    ///////////////////////////////////////////////////////////////////////////
+    Requests
+    ///////////////////////////////////////////////////////////////////////////
+    """
+
+    def reqContractDetails(self, reqId, contract):
+        for known in self.contracts.values():
+            if (contract.conId == known.conId
+                or (not contract.conId and contract.symbol == known.symbol
+                    and contract.secType in ('', known.secType)
+                    and contract.currency in ('', known.currency))):
+                self.wrapper.contractDetails(reqId, ContractDetails(
+                    contract=known, marketRuleIds=str(known.conId)
+                ))
+        self.wrapper.contractDetailsEnd(reqId)
+
+    def reqMarketRule(self, marketRuleId):
+        contract = self.contracts[int(marketRuleId)]
+        self.wrapper.marketRule(marketRuleId, [PriceIncrement(0.0, contract.increment)])
+
+    def reqTickByTickData(self, reqId, contract, tickType, numberOfTicks, ignoreSize):
+        pass
+
+    def cancelTickByTickData(self, reqId):
+        pass
+
+    def reqPnL(self, reqId, account, modelCode):
+        self.pnlReqs.append(reqId)
+
+    def cancelPnL(self, reqId):
+        if reqId in self.pnlReqs:
+            self.pnlReqs.remove(reqId)
+
+    def reqCurrentTime(self):
+        self.wrapper.currentTime(self.time//10**9)
+
+    def reqPositions(self):
+        for conId, (position, avgCost) in self.positions.items():
+            contract = self.contracts.get(conId, Contract(conId=conId))
+            self.wrapper.position(self.account, contract, position, avgCost*self.multiplier(contract))
+        self.wrapper.positionEnd()
+
+    def cancelPositions(self):
+        pass
+
+    def reqAccountUpdates(self, subscribe, acctCode):
+        if subscribe:
+            self.wrapper.accountDownloadEnd(self.account)
+
+    def reqOpenOrders(self):
+        for working in self.orders.values():
+            self.wrapper.openOrder(working.orderId, working.contract, working.order, OrderState(
+                status='Submitted' if working.state == 'working' else 'PreSubmitted'
+            ))
+        self.wrapper.openOrderEnd()
+
+    def reqAllOpenOrders(self):
+        self.reqOpenOrders()
+
+    def reqCompletedOrders(self, apiOnly):
+        self.wrapper.completedOrdersEnd()
+
+    def reqExecutions(self, reqId, execFilter):
+        # the executions of a backtest already reached the wrapper as they filled
+        self.wrapper.execDetailsEnd(reqId)
+
+    def placeOrder(self, orderId, contract, order):
+        self.requests.append(('place', orderId, contract, order))
+
+    def cancelOrder(self, orderId, manualCancelOrderTime=''):
+        self.requests.append(('cancel', orderId, None, None))
+
+    """
+    ///////////////////////////////////////////////////////////////////////////
+    Simulation
+    ///////////////////////////////////////////////////////////////////////////
+    """
+
+    def onTicks(self, batch):
+        """ Match the working orders against every tick of a TickBatch """
+        for i, conId in enumerate(batch.conId.tolist()):
+            self.time = int(batch.time[i])
+            self.quotes[conId] = (float(batch.bid[i]), float(batch.ask[i]))
+            if self.requests:
+                self.process()
+            for working in [w for w in self.orders.values() if w.contract.conId == conId]:
+                if working.orderId in self.orders:
+                    self.match(working)
+
+    def advance(self, time):
+        """ Move the clock to time (ns) without a tick and process the queued requests """
+        self.time = max(self.time, time)
+        self.process()
+
+    def process(self):
+        """ Answer the queued requests, in the order they were made """
+        self.wrapper.lastTime = self.datetime
+        requests, self.requests = self.requests, []
+        for request, orderId, contract, order in requests:
+            if request == 'place':
+                self.submit(orderId, contract, order)
+            else:
+                self.cancel(orderId)
+
+    def status(self, working, status, filled=0.0, price=0.0):
+        order = working.order
+        self.wrapper.orderStatus(
+            working.orderId, status, filled, order.totalQuantity - filled,
+            price, working.permId, order.parentId, price, order.clientId, ''
+        )
+
+    def submit(self, orderId, contract, order):
+        if orderId in self.orders:
+            # modification of an order the broker already holds
+            working = self.orders[orderId]
+            working.contract, working.order = contract, order
+            if working.state == 'working':
+                self.status(working, 'Submitted')
+                self.match(working)
+            return
+        self._permId += 1
+        working = WorkingOrder(orderId, contract, order, self._permId)
+        order.permId = working.permId
+        self.orders[orderId] = working
+        self.wrapper.openOrder(orderId, contract, order, OrderState(status='PreSubmitted'))
+        if order.transmit:
+            group = order.parentId or orderId
+            for held in [w for w in self.orders.values() if w.state == 'held'
+                         and group in (w.orderId, w.order.parentId)]:
+                if held.orderId in self.orders:
+                    self.activate(held)
+
+    def activate(self, working):
+        """ Transmit an order, it works unless it waits on its parent or conditions """
+        parentId = working.order.parentId
+        if (parentId and parentId in self.orders) or working.order.conditions:
+            working.state = 'pending'
+            self.status(working, 'PreSubmitted')
+        else:
+            working.state = 'working'
+            self.status(working, 'Submitted')
+        self.match(working)
+
+    def cancel(self, orderId):
+        working = self.orders.pop(orderId, None)
+        if working is None:
+            self.wrapper.error(orderId, 10147, f'OrderId {orderId} that needs to be cancelled is not found.', '')
+            return
+        self.status(working, 'Cancelled')
+        for child in [w for w in self.orders.values() if w.order.parentId == orderId]:
+            self.cancel(child.orderId)
+
+    def conditionsMet(self, working, quote):
+        for condition in working.order.conditions:
+            if isinstance(condition, PriceCondition):
+                bid, ask = self.quotes.get(condition.conId, quote)
+                mid = (bid + ask)/2
+                if (mid >= condition.price) != condition.isMore and mid != condition.price:
+                    return False
+        return True
+
+    def match(self, working):
+        """ Fill the order if the current quote of its contract reaches it """
+        quote = self.quotes.get(working.contract.conId)
+        if quote is None:
+            return
+        if working.state == 'pending':
+            if working.order.parentId in self.orders or not self.conditionsMet(working, quote):
+                return
+            working.state = 'working'
+            self.status(working, 'Submitted')
+        if working.state != 'working':
+            return
+        order = working.order
+        bid, ask = quote
+        touch = ask if working.buy else bid
+        if order.orderType == 'MKT':
+            fill = True
+        elif order.orderType == 'LMT':
+            fill = touch <= order.lmtPrice if working.buy else touch >= order.lmtPrice
+        elif order.orderType == 'STP':
+            fill = touch >= order.auxPrice if working.buy else touch <= order.auxPrice
+        elif order.orderType == 'TRAIL':
+            if working.stop is None and order.trailStopPrice != UNSET_DOUBLE:
+                working.stop = order.trailStopPrice
+            if working.buy:
+                working.stop = min(working.stop or touch + order.auxPrice, touch + order.auxPrice)
+                fill = touch >= working.stop
+            else:
+                working.stop = max(working.stop or touch - order.auxPrice, touch - order.auxPrice)
+                fill = touch <= working.stop
+        else:
+            self.orders.pop(working.orderId)
+            self.wrapper.error(working.orderId, 387, f'orderType {order.orderType} is not simulated', '')
+            return
+        if fill:
+            self.fill(working, touch)
+
+    def fill(self, working, price):
+        order, contract = working.order, working.contract
+        del self.orders[working.orderId]
+        self._execId += 1
+        shares = order.totalQuantity
+        execution = Execution(
+            execId=f'{working.permId:08d}.{self._execId:08d}',
+            time=self.datetime,
+            acctNumber=self.account,
+            exchange=contract.exchange,
+            side='BOT' if working.buy else 'SLD',
+            shares=shares,
+            price=price,
+            permId=working.permId,
+            clientId=order.clientId,
+            orderId=working.orderId,
+            cumQty=shares,
+            avgPrice=price
+        )
+        commission, realizedPNL = self.book(contract, shares if working.buy else -shares, price)
+        self.wrapper.execDetails(-1, contract, execution)
+        self.status(working, 'Filled', shares, price)
+        self.wrapper.commissionReport(CommissionReport(
+            execution.execId, commission, contract.currency, realizedPNL
+        ))
+        position, avgCost = self.positions[contract.conId]
+        self.wrapper.position(self.account, contract, position, avgCost*self.multiplier(contract))
+        unrealized = self.unrealizedPnL()
+        for reqId in self.pnlReqs:
+            self.wrapper.pnl(reqId, self.realized + unrealized, unrealized, self.realized)
+
+        # bracket children start working, siblings and oca groups are cancelled
+        for other in list(self.orders.values()):
+            if other.orderId not in self.orders:
+                continue
+            if other.order.parentId == working.orderId:
+                self.match(other)
+            elif ((order.parentId and other.order.parentId == order.parentId)
+                  or (order.ocaGroup and other.order.ocaGroup == order.ocaGroup)):
+                self.cancel(other.orderId)
+
+    @staticmethod
+    def multiplier(contract):
+        return float(contract.multiplier or 1)
+
+    def book(self, contract, quantity, price):
+        """ Update the position with a fill, return (commission, realizedPNL)
+            *the average cost includes the opening commission, as IB reports it """
+        multiplier = self.multiplier(contract)
+        commission = max(self.min_commission, self.commission_rate*abs(quantity)*price*multiplier)
+        position, avgCost = self.positions.get(contract.conId, (0.0, 0.0))
+        closed = min(abs(quantity), abs(position)) if position*quantity < 0 else 0
+        opened = abs(quantity) - closed
+        realizedPNL = 0.0
+        if closed:
+            sign = 1 if position > 0 else -1
+            realizedPNL = (sign*(price - avgCost)*closed*multiplier
+                           - commission*closed/abs(quantity))
+            position += closed*(-sign)
+            if not position:
+                avgCost = 0.0
+        if opened:
+            sign = 1 if quantity > 0 else -1
+            openCommission = commission*opened/abs(quantity)/multiplier
+            avgCost = (avgCost*abs(position) + price*opened + sign*openCommission)/(abs(position) + opened)
+            position += sign*opened
+        self.positions[contract.conId] = (position, avgCost)
+        self.realized += realizedPNL
+        self.commissions += commission
+        self.executions  += 1
+        return commission, realizedPNL
+
+    def unrealizedPnL(self):
+        unrealized = 0.0
+        for conId, (position, avgCost) in self.positions.items():
+            if position and conId in self.quotes:
+                bid, ask = self.quotes[conId]
+                multiplier = self.multiplier(self.contracts.get(conId, Contract()))
+                unrealized += position*((bid + ask)/2 - avgCost)*multiplier
+        return unrealized
+
+
+def _notSimulated(name, withReqId):
+    def request(self, *args, **kwargs):
+        self.notSimulated(name, args[0] if withReqId and args else -1)
+    request.__name__ = name
+    return request
+
+
+# every other request of the Client is answered with a NOT_SIMULATED error
+for _name, _method in vars(Client).items():
+    if (re.match('(req|cancel|calculate|query|exercise|replace|request|subscribe|'
+                 'unsubscribe|updateDisplayGroup|verify|setServerLogLevel|startApi)', _name)
+            and callable(_method) and _name not in vars(SimulatedBroker)):
+        _params = list(inspect.signature(_method).parameters)[1:2]
+        setattr(SimulatedBroker, _name, _notSimulated(_name, _params in (['reqId'], ['tickerId'])))
+
+
+class BacktestTrader(LiveTrader):
+    """ LiveTrader replaying recorded ticks against a SimulatedBroker
+        *sleep advances the simulated clock, replaying the ticks it covers,
+         so StrategyManager.run drives a backtest unchanged
+        *the utils clock follows the replayed ticks, so logs and wait times
+         are in market time
+        *contracts are resolved from the recordings' saved contracts
+         and the contracts given
+        *bars, indicators and data streams are kept per instance, so several
+         backtests can run one after another in the same process
+        *with a cutoff the replay halts once the PnL (realized + unrealized)
+         falls below it, the strategies still shut down as they would at the end
+        *with an IndicatorCache of the replayed ticks, bars and indicators added
+         before the first tick are read from its tapes instead of being rebuilt """
+
+    def __init__(self, *recordings, ticks=None, contracts=(), speed=0, cutoff=None, indicators=None,
+                 account='BACKTEST', commission_rate=0.00002, min_commission=2.0, **kwargs):
+        super().__init__(mod=True, gateway=False, **kwargs)
+        self.prices          = {}
+        self.tickBars        = {}
+        self.currentBar      = {}
+        self.barAggregators  = {}
+        self._priceUpdaters  = {}
+        self.subscriptions   = Subscriptions()
+        self._slopes         = {}
+        self.newTickBarEvent = eventkit.Event()
+        self._data_streams   = {}
+        self.streaming_ticks = []
+        contracts = {c.conId: c for c in contracts}
+        for path in recordings:
+            contracts.update(readContracts(path))
+        self.client = SimulatedBroker(
+            self.wrapper, account, contracts.values(),
+            commission_rate=commission_rate, min_commission=min_commission
+        )
+        self.replay = TickReplay(
+            self, *recordings, ticks=ticks, speed=speed, contracts=contracts.values()
+        )
+        self.now = self.replay.startTime or utils.getTimestamp()
+        self.client.time = self.now
+        self.cutoff = cutoff
+        self.indicators = indicators
+        self.tickRouter.batchEvent += self._setNow
+        self.tickRouter.batchEvent += self.client.onTicks
+        if cutoff is not None:
+            self.tickRouter.batchEvent += self._checkCutoff
+        utils.Clock.source = self.utcnow
+
+    def _setNow(self, batch):
+        if len(batch):
+            self.now = int(batch.time[-1])
+
+    def _checkCutoff(self, batch):
+        if self.client.realized + self.client.unrealizedPnL() < self.cutoff:
+            self.replay.halt()
+
+    @property
+    def stopped(self):
+        """ True if the cutoff halted the replay """
+        return self.replay.halted
+
+    def _replayable(self, bars):
+        return self.indicators is not None and not (self.replay.cursor or len(bars))
+
+    def newBarBuilder(self, contract, ticksPerBar, currentBar, tickBars, priceType='mid'):
+        if not self._replayable(tickBars['raw']):
+            return super().newBarBuilder(contract, ticksPerBar, currentBar, tickBars, priceType)
+        return ReplayBarBuilder(
+            self.indicators.bars(contract.conId, ticksPerBar, priceType),
+            ticksPerBar,
+            currentBar['raw'],
+            currentBar['smooth'],
+            tickBars['raw'],
+            tickBars['smooth'],
+            priceType=priceType,
+            moves=tickBars['moves']
+        )
+
+    def newDirectionalMovement(self, contract, ticksPerBar, bars, priceType='mid'):
+        if not self._replayable(bars):
+            return super().newDirectionalMovement(contract, ticksPerBar, bars, priceType)
+        return ReplayDirectionalMovement(
+            self.indicators, contract.conId, ticksPerBar, priceType, bars
+        )
+
+    def newFormingATR(self, contract, ticksPerBar, window):
+        bars = self.tickBars[contract.symbol][ticksPerBar]['raw']
+        if not self._replayable(bars):
+            return super().newFormingATR(contract, ticksPerBar, window)
+        aggregator = self.barAggregators.get(contract.symbol)
+        builder = aggregator.builders.get(ticksPerBar) if aggregator else None
+        priceType = builder.priceType if builder else 'mid'
+        return ReplayATR(
+            window, ticksPerBar,
+            self.indicators.bars(contract.conId, ticksPerBar, priceType),
+            self.indicators.atr(contract.conId, ticksPerBar, priceType, window)
+        )
+
+    def utcnow(self) -> datetime.datetime:
+        return utils.EPOCH + datetime.timedelta(microseconds=self.now//1000)
+
+    def connect(self, *args, **kwargs):
+        return self
+
+    def disconnect(self):
+        super().disconnect()
+        if utils.Clock.source == self.utcnow:
+            utils.Clock.source = None
+
+    def sleep(self, secs=0.02):
+        """ Replay the next secs of ticks, then answer the requests made meanwhile """
+        stop = self.now + int(secs*1e9)
+        self.replay.replay(stop)
+        self.now = max(self.now, stop)
+        self.client.advance(self.now)
+        return True
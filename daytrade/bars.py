@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:21:08 2026
+"""
+
+import candles
+
+
+class TickBarBuilder:
+    """ Builds the raw and Heikin-Ashi tick bars of one ticksPerBar
+        *bar and ha_bar are the forming bars, updated in place every tick
+        *completed bars are appended to the raw and smooth BarStores and fed
+         to their MoveTrackers
+        *the open and close of the last completed Heikin-Ashi bar are kept as
+         scalars, so the forming Heikin-Ashi bar is a few float operations """
+
+    def __init__(self, ticksPerBar, bar, ha_bar, raw, smooth, priceType='mid', moves=None):
+        self.ticksPerBar = ticksPerBar
+        self.bar         = bar
+        self.ha_bar      = ha_bar
+        self.raw         = raw
+        self.smooth      = smooth
+        self.priceType   = priceType
+        self.moves       = moves or {'raw': candles.MoveTracker(), 'smooth': candles.MoveTracker()}
+        self.ha_open     = smooth.last('open') if len(smooth) else None
+        self.ha_close    = smooth.last('close') if len(smooth) else None
+
+    def update(self, tickPrice, tickTime) -> bool:
+        """ Add a tick to the forming bar, return True if it completed the bar """
+        tickPrice = tickPrice[self.priceType]
+        bar = self.bar
+        if (not bar) or (bar['ticks'] == self.ticksPerBar):
+            bar['open']  = tickPrice
+            bar['high']  = tickPrice
+            bar['low']   = tickPrice
+            bar['ticks'] = 1
+        else:
+            bar['low']    = min(bar['low'] , tickPrice)
+            bar['high']   = max(bar['high'], tickPrice)
+            bar['ticks'] += 1
+        bar['close'] = tickPrice
+        hkbar = self.heikinAshiBar(bar)
+        self.ha_bar.update(hkbar)
+        if bar['ticks'] == self.ticksPerBar:
+            self.raw.append(tickTime, bar)
+            self.smooth.append(tickTime, hkbar)
+            self.ha_open, self.ha_close = hkbar['open'], hkbar['close']
+            self.moves['raw'].update(bar)
+            self.moves['smooth'].update(hkbar)
+            return True
+        return False
+
+    def heikinAshiBar(self, bar):
+        """ candles.getHeikinAshiBar of the forming bar from the last Heikin-Ashi open/close """
+        ha_close = (bar['open'] + bar['high'] + bar['low'] + bar['close'])/4
+        if self.ha_open is None:
+            ha_open = (bar['open'] + bar['close'])/2
+        else:
+            ha_open = (self.ha_open + self.ha_close)/2
+        return {
+            'close': ha_close,
+            'high' : max(bar['high'], bar['low'], ha_open, ha_close),
+            'low'  : min(bar['high'], bar['low'], ha_open, ha_close),
+            'open' : ha_open,
+            'ticks': bar['ticks']
+        }
+
+
+class BarAggregator:
+    """ Every ticksPerBar requested for one contract, updated in a single pass per tick """
+
+    def __init__(self):
+        self.builders    = {}
+        self.tickHandler = None
+
+    def __contains__(self, ticksPerBar):
+        return ticksPerBar in self.builders
+
+    def __iter__(self):
+        return iter(self.builders.values())
+
+    def __len__(self):
+        return len(self.builders)
+
+    def add(self, builder):
+        self.builders[builder.ticksPerBar] = builder
+
+    def remove(self, ticksPerBar):
+        self.builders.pop(ticksPerBar, None)
+
+    def update(self, tickPrice, tickTime):
+        """ Update every resolution with the tick, return the ticksPerBar of completed bars """
+        return [
+            builder.ticksPerBar for builder in list(self.builders.values())
+            if builder.update(tickPrice, tickTime)
+        ]
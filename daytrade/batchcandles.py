@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:04:47 2026
+"""
+
+import numpy as np
+from pandas import DataFrame
+from typing import Tuple
+
+from candles import candleColors, moveRuns
+
+
+HA_TAPS = 64    # 0.5**64 is below double precision, older bars no longer move ha_open
+
+
+def ohlc(
+        candlesticks : DataFrame
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """ open, high, low and close columns as float arrays """
+
+    return tuple(
+        candlesticks[column].to_numpy(dtype=float)
+        for column in ('open', 'high', 'low', 'close')
+    )
+
+
+def heikinAshi(
+        opens  : np.ndarray,
+        highs  : np.ndarray,
+        lows   : np.ndarray,
+        closes : np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """ Heikin-Ashi open, high, low and close of every candlestick (candles.getHeikinAshi)
+        *ha_open halves the previous ha_open + ha_close, that recurrence is
+         unrolled into one convolution over the last HA_TAPS ha_closes """
+
+    ha_close = (opens + highs + lows + closes)/4
+    n = ha_close.size
+    ha_open = np.empty(n)
+    if n:
+        ha_open[0] = (opens[0] + closes[0])/2
+        taps = min(HA_TAPS, n)
+        ha_open[1:] = np.convolve(ha_close, 0.5**np.arange(1, taps + 1))[:n-1]
+        ha_open[1:taps] += ha_open[0]*0.5**np.arange(1, taps)
+    ha_high = np.maximum.reduce([highs, lows, ha_open, ha_close])
+    ha_low  = np.minimum.reduce([highs, lows, ha_open, ha_close])
+    return ha_open, ha_high, ha_low, ha_close
+
+
+def trueRanges(
+        opens  : np.ndarray,
+        highs  : np.ndarray,
+        lows   : np.ndarray,
+        closes : np.ndarray
+    ) -> np.ndarray:
+    """ candles.trueRange of every candlestick, the first one measured from its open """
+
+    prev_closes = np.r_[opens[:1], closes[:-1]]
+    return np.maximum.reduce([
+        highs - lows,
+        np.abs(highs - prev_closes),
+        np.abs(prev_closes - lows)
+    ])
+
+
+def averageTrueRanges(
+        opens  : np.ndarray,
+        highs  : np.ndarray,
+        lows   : np.ndarray,
+        closes : np.ndarray,
+        window : int
+    ) -> np.ndarray:
+    """ candles.getATR after every candlestick: the mean of the last window true ranges,
+        or of all of them while there are fewer """
+
+    ranges = trueRanges(opens, highs, lows, closes)
+    n = ranges.size
+    if not (n and window > 0):
+        return np.zeros(n)
+    sums = np.convolve(ranges, np.ones(min(window, n)))[:n]
+    return sums/np.minimum(np.arange(1, n + 1), window)
+
+
+def colors(
+        opens  : np.ndarray,
+        closes : np.ndarray
+    ) -> np.ndarray:
+    """ candles.candleColor of every candlestick """
+
+    return candleColors(opens, closes)
+
+
+def moves(
+        opens  : np.ndarray,
+        closes : np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ color, size and price_change of every move, oldest first (candles.moveHistory) """
+
+    return moveRuns(opens, closes)
+
+
+def moveSizes(
+        opens  : np.ndarray,
+        closes : np.ndarray
+    ) -> np.ndarray:
+    """ size of the move ending at every candlestick (candles.moveStatus after each bar) """
+
+    _, sizes, _ = moveRuns(opens, closes)
+    if not sizes.size:
+        return np.array([], dtype=int)
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    return np.arange(starts.size) - starts + 1
+
+
+def signalBars(
+        opens  : np.ndarray,
+        closes : np.ndarray,
+        thresh : int=4
+    ) -> np.ndarray:
+    """ candles.isSignalBar after every candlestick: the first non-black bar of a move
+        that follows a move of at least thresh bars """
+
+    bar_colors = candleColors(opens, closes)
+    sizes = moveSizes(opens, closes)
+    previous = np.r_[0, sizes[:-1]]
+    return (sizes == 1) & (bar_colors != 'black') & (previous >= thresh)
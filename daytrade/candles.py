@@ -41,8 +41,9 @@ def getATR(
 
 def heikinAshiEquation(
         candlestick : Union[Series, Dict[str, float]],
-        heikin_ashi : DataFrame=DataFrame()
+        heikin_ashi : Union[DataFrame, Dict[str, float]]=DataFrame()
     ) -> List[float]:
+    """ heikin_ashi is either the Heikin-Ashi history or just its last bar """
     
     def minMax(*args : List[float]) -> Tuple[float, float]:
         x = sorted(args)
@@ -51,7 +52,10 @@ def heikinAshiEquation(
     ha_close = (candlestick['open'] + candlestick['high'] + 
                 candlestick['low']  + candlestick['close']
                 )/4
-    open_stick = heikin_ashi.iloc[-1] if heikin_ashi.size else candlestick
+    if isinstance(heikin_ashi, DataFrame):
+        open_stick = heikin_ashi.iloc[-1] if heikin_ashi.size else candlestick
+    else:
+        open_stick = heikin_ashi or candlestick
     ha_open = (open_stick['open'] + open_stick['close'])/2
     ha_low, ha_high = minMax(
         candlestick['high'],
@@ -63,8 +67,8 @@ def heikinAshiEquation(
 
 def getHeikinAshiBar(
         candlestick : Union[Series, Dict[str, float]],
-        heikin_ashi : DataFrame=DataFrame()
-    ) -> List[float]:
+        heikin_ashi : Union[DataFrame, Dict[str, float]]=DataFrame()
+    ) -> Dict[str, float]:
     
     return {x:y for x,y in zip(
         ['close', 'high', 'low', 'open'],
@@ -133,43 +137,95 @@ def priceChange(
     return candlesticks.iloc[move_end]['close'] - candlesticks.iloc[move_start]['open']
 
 
+class MoveTracker:
+    """ Streaming run-length record of candle colors, fed one closed candlestick at a time
+        *keeps the current move and the one before it, so moveStatus and
+         isSignalBar read them in O(1) instead of walking back through the bars """
+    
+    def __init__(self):
+        self.bars      = 0
+        self.color     = 'none'
+        self.size      = 0
+        self.open      = 0.0
+        self.close     = 0.0
+        self.prevClose = 0.0
+        self.previous  = None
+    
+    def __len__(self):
+        return self.bars
+    
+    def update(self, candlestick : Union[Series, Dict[str, float]]) -> None:
+        color = candleColor(candlestick)
+        if self.size and color == self.color:
+            self.size += 1
+        else:
+            if self.size:
+                self.previous = self.status()
+            self.color = color
+            self.size  = 1
+            self.open  = candlestick['open']
+        self.prevClose, self.close = self.close, candlestick['close']
+        self.bars += 1
+    
+    def status(self, moves_ago : int=0) -> Dict[str, Union[str, int, float]]:
+        """ moveStatus of the bars up to moves_ago (0 or 1) bars ago """
+        if moves_ago not in (0, 1):
+            raise ValueError('only the status of the last two bars is tracked')
+        if moves_ago == 0 and self.size:
+            return {'color'        : self.color,
+                    'size'         : self.size,
+                    'price_change' : self.close - self.open
+                    }
+        if self.size > 1:
+            return {'color'        : self.color,
+                    'size'         : self.size - 1,
+                    'price_change' : self.prevClose - self.open
+                    }
+        if self.previous:
+            return dict(self.previous)
+        raise IndexError(f'no move {moves_ago} bars ago in {self.bars} bars')
+
+
 def moveStatus(
-        candlesticks  : DataFrame,
+        candlesticks  : Union[DataFrame, MoveTracker],
         move_size     : int=1,
         current_color : str='',
         moves_ago     : int=0
     ) -> Dict[str, Union[str, int, float]]:
-    """ return move status dictionary: color, size, and price_change of current move """
+    """ return move status dictionary: color, size, and price_change of current move 
+        *the move is the run of current_color bars ending moves_ago bars ago, 
+         at least move_size bars long and never longer than the bars given """
     
+    if isinstance(candlesticks, MoveTracker):
+        return candlesticks.status(moves_ago)
     if moves_ago:
         candlesticks = candlesticks.head(-moves_ago)
-    try:
-        current_color  = current_color or getColor(candlesticks)
-        previous_color = getColor(candlesticks, moves_ago=move_size)
-    except:
-        previous_color = 'none'
-    if current_color == previous_color:
-        try:
-            return moveStatus(candlesticks,
-                              move_size+1,
-                              current_color=previous_color)
-        except: pass
-    return {'color'        : current_color, 
-            'size'         : move_size, 
+    n = candlesticks.shape[0]
+    if n:
+        opens  = candlesticks['open'].to_numpy()
+        closes = candlesticks['close'].to_numpy()
+        colors = np.where(closes > opens, 'green', np.where(closes < opens, 'red', 'black'))
+        current_color = current_color or colors[-1]
+        earlier = np.flatnonzero(colors[:max(n - move_size, 0)][::-1] != current_color)
+        move_size = move_size + earlier[0] if earlier.size else max(n, move_size)
+    else:
+        current_color = current_color or 'black'
+    return {'color'        : str(current_color), 
+            'size'         : int(move_size), 
             'price_change' : priceChange(candlesticks, -(move_size), -1)
             }
 
 
 def isSignalBar(
-        candlesticks      : DataFrame,
+        candlesticks      : Union[DataFrame, MoveTracker],
         current_move_size : int=0,
         thresh            : int=4,
     ) -> Tuple[bool, str]:
     
-    if not candlesticks.size:
+    if not len(candlesticks):
         return False, 'none'
-    elif candlesticks.shape[0] == 1:
-        return False, getColor(candlesticks)
+    elif len(candlesticks) == 1:
+        return False, moveStatus(candlesticks)['color']
     else:
         move_status = moveStatus(candlesticks)
         move_size = current_move_size or move_status['size']
@@ -180,23 +236,50 @@ def isSignalBar(
         return False, move_color
         
 
+def candleColors(
+        opens  : np.ndarray,
+        closes : np.ndarray
+    ) -> np.ndarray:
+    """ candleColor of every candlestick at once """
+    
+    return np.where(closes > opens, 'green', np.where(closes < opens, 'red', 'black'))
+
+
+def moveRuns(
+        opens  : np.ndarray,
+        closes : np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """ run-length encoding of the candle colors: color, size and price_change of every move """
+    
+    colors = candleColors(opens, closes)
+    if not colors.size:
+        return colors, np.array([], dtype=int), np.array([])
+    starts = np.flatnonzero(np.r_[True, colors[1:] != colors[:-1]])
+    ends   = np.r_[starts[1:], colors.size] - 1
+    return colors[starts], ends - starts + 1, closes[ends] - opens[starts]
+
+
 def moveHistory(
         candlesticks : DataFrame
     ) -> List[Dict[str, Union[str, int, float]]]:
+    """ every move (moveStatus) of the candlesticks, oldest first """
     
-    history = []
-    total_moves = 0
-    while total_moves < candlesticks.shape[0]:
-        move = moveStatus(candlesticks, moves_ago=total_moves)
-        total_moves += move['size']
-        history.append(move)
-    return list(reversed(history))
+    colors, sizes, price_changes = moveRuns(
+        candlesticks['open'].to_numpy(dtype=float) if candlesticks.size else np.array([]),
+        candlesticks['close'].to_numpy(dtype=float) if candlesticks.size else np.array([])
+    )
+    return [
+        {'color': str(color), 'size': int(size), 'price_change': price_change}
+        for color, size, price_change in zip(colors, sizes, price_changes)
+    ]
 
 
 class MoveHistogram:
+    """ Counts of move sizes, overall and per color
+        *counts are numpy arrays indexed by move size, grown as needed
+        *mean and std come from running sums, not from expanding the counts """
     
-    all_   = {}
-    colors = {'red':{}, 'green':{}, 'black':{}}
+    move_colors = ('red', 'green', 'black')
     
     def __init__(self,
                  candlesticks : DataFrame=DataFrame(), 
@@ -204,68 +287,110 @@ class MoveHistogram:
                  move_history : List[Dict[str, Union[str, int, float]]]=[]
                  ) -> None:
         
-        self.addHistory(move_history + moveHistory(candlesticks))
+        self.counts = {color: np.zeros(0, dtype=int) for color in ('',) + self.move_colors}
+        self.sums   = {color: [0, 0, 0] for color in self.counts}
+        self.addHistory(move_history)
+        self.addCandleHistory(candlesticks)
         self.ticksPerBar = ticksPerBar
     
     
+    def _key(self, move_color : str='') -> str:
+        return move_color if move_color in self.move_colors else ''
+    
+    
+    def addSizes(self,
+                 sizes      : np.ndarray,
+                 move_color : str=''
+                 ) -> None:
+        """ add move sizes to the histogram of move_color ('' for all moves) """
+        
+        sizes = np.asarray(sizes, dtype=int)
+        if not sizes.size:
+            return
+        counts = np.bincount(sizes)
+        current = self.counts[move_color]
+        if counts.size > current.size:
+            current = np.concatenate([current, np.zeros(counts.size - current.size, dtype=int)])
+        current[:counts.size] += counts
+        self.counts[move_color] = current
+        n, total, squares = self.sums[move_color]
+        self.sums[move_color] = [
+            n + sizes.size,
+            total + int(sizes.sum()),
+            squares + int((sizes*sizes).sum())
+        ]
+    
+    
+    def addRuns(self,
+                colors : np.ndarray,
+                sizes  : np.ndarray
+                ) -> None:
+        """ add moves given as arrays of colors and sizes (moveRuns) """
+        
+        unknown = set(np.unique(colors)) - set(self.move_colors)
+        if unknown:
+            raise KeyError(unknown.pop())
+        self.addSizes(sizes)
+        for color in self.move_colors:
+            self.addSizes(sizes[colors == color], color)
+    
+    
     def addMove(self,
                 move : Dict[str, Union[str, int, float]]
                 ) -> None:
         
-        if move['size'] in self.all_:
-            self.all_[move['size']] += 1
-        else:
-            self.all_[move['size']]  = 1
-        if move['size'] in self.colors[move['color']]:
-            self.colors[move['color']][move['size']] += 1
-        else:
-            self.colors[move['color']][move['size']]  = 1
+        self.addHistory([move])
     
     
     def addHistory(self,
                    move_history : List[Dict[str, Union[str, int, float]]]
                    ) -> None:
         
-        for move in move_history:
-            self.addMove(move)
+        self.addRuns(
+            np.array([move['color'] for move in move_history], dtype=str),
+            np.array([move['size'] for move in move_history], dtype=int)
+        )
     
     
     def addCandleHistory(self,
                          candlesticks : DataFrame
                          ) -> None:
         
-        self.addHistory(moveHistory(candlesticks))
+        if not candlesticks.size:
+            return
+        colors, sizes, _ = moveRuns(
+            candlesticks['open'].to_numpy(dtype=float),
+            candlesticks['close'].to_numpy(dtype=float)
+        )
+        self.addRuns(colors, sizes)
     
     
     def getHistogram(self,
                       move_color : str=''
                       ) -> Dict[int, int]:
         
-        if move_color in self.colors:
-            return self.colors[move_color]
-        else:
-            return self.all_
+        counts = self.counts[self._key(move_color)]
+        return {int(size): int(counts[size]) for size in np.flatnonzero(counts)}
         
         
     def get_list(self, move_color=''):
-        move_size_list = []
-        for move_size, count in self.getHistogram(move_color).items():
-            move_size_list += count*[move_size]
-        return np.array(move_size_list)
+        counts = self.counts[self._key(move_color)]
+        return np.repeat(np.arange(counts.size), counts)
     
     
     def get_average(self, move_color=''):
-        return self.get_list(move_color).mean()
+        n, total, _ = self.sums[self._key(move_color)]
+        return np.float64(total)/n if n else np.float64('nan')
     
     
     def std(self, move_color=''):
-        return self.get_list(move_color).std()
+        n, total, squares = self.sums[self._key(move_color)]
+        return np.sqrt(np.float64(n*squares - total*total)/(n*n)) if n else np.float64('nan')
     
     
     def get_stats(self, move_color=''):
-        x = self.get_list(move_color)
-        mu = x.mean()
-        sig = x.std()
+        mu = self.get_average(move_color)
+        sig = self.std(move_color)
         return {'mean': mu, 'std': sig, 'ratio': mu/sig}
     
     
@@ -276,4 +401,3 @@ class MoveHistogram:
         plt.close()
         plt.hist(x, bins=range(1,max(x)+1))
         plt.show()
-        
\ No newline at end of file
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 02:14:08 2026
+"""
+
+import os
+import json
+import time as t
+import socket
+import threading
+from collections import deque
+from multiprocessing.connection import Listener, Client
+
+from recording import contractsPath
+from replaycache import ReplayCache, fileDigest, sourceVersion
+from sweeps import SweepWorker, workerSetup
+
+
+CHUNK = 8 << 20    # bytes per message when a worker fetches a recording
+
+
+def parseAddress(address):
+    """ (host, port) of 'host:port' """
+    host, _, port = address.rpartition(':')
+    return host or 'localhost', int(port)
+
+
+class SweepCoordinator:
+    """ Hands the configs of a sweep to workers connected over TCP
+        *messages are pickled over multiprocessing connections authenticated
+         with authkey, so only workers holding the key are served
+        *a job is one algo config on the sweep's recordings, a worker without
+         the recordings (by content digest) fetches them from the coordinator
+        *workers must run the same source version, others are turned away
+        *a job is handed out again when its worker disconnects, or sends nothing
+         for timeout seconds, up to retries times before it is reported failed,
+         workers send a heartbeat every timeout/3 seconds while they run a job,
+         requeued counts the jobs handed out again
+        *workers stay connected between runs, so a successive halving or
+         hyperband search sends every rung to the same workers """
+
+    def __init__(self, address=('localhost', 6000), authkey=b'', retries=2, timeout=None):
+        if not authkey:
+            raise ValueError('a sweep coordinator needs an authkey')
+        self.address  = address
+        self.authkey  = authkey if isinstance(authkey, bytes) else authkey.encode()
+        self.retries  = int(retries)
+        self.timeout  = timeout
+        self.source   = sourceVersion()
+        self.cond     = threading.Condition()
+        self.queue    = deque()
+        self.pending  = set()
+        self.results  = {}
+        self.files    = {}
+        self.workers  = {}
+        self.batch    = 0
+        self.requeued = 0
+        self.closed   = False
+        self.listener = None
+
+    def start(self):
+        """ Listen for workers, each is served by its own thread """
+        self.listener = Listener(self.address, authkey=self.authkey)
+        self.address  = self.listener.address
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self
+
+    def close(self):
+        """ Stop listening, idle workers are told the sweep is done """
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        if self.listener is not None:
+            self.listener.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _accept(self):
+        while not self.closed:
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                if self.closed:
+                    return
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def run(self, configs, paths, options, cache=None, indicators=None) -> dict:
+        """ {config index: summary row} of the configs, once every job is done
+            *cache (a ReplayCache) is opened by each worker in its own directory """
+        ticks = [(path, fileDigest(path)) for path in paths]
+        setup = {
+            'ticks'     : ticks,
+            'options'   : options,
+            'cache'     : None if cache is None else {
+                'directory': cache.directory, 'max_bytes': cache.max_bytes
+            },
+            'indicators': indicators
+        }
+        with self.cond:
+            self.batch += 1
+            batch = self.batch
+            self.files.update({digest: path for path, digest in ticks})
+            jobs = [
+                {'id': (batch, i), 'config': config, 'setup': setup, 'attempts': 0}
+                for i, config in enumerate(configs)
+            ]
+            self.queue.extend(jobs)
+            self.pending.update(job['id'] for job in jobs)
+            self.cond.notify_all()
+            while any(job['id'] in self.pending for job in jobs):
+                self.cond.wait()
+            return {i: self.results.pop((batch, i)) for i in range(len(configs))}
+
+    def _next(self):
+        """ next job, None once closed """
+        with self.cond:
+            while not (self.queue or self.closed):
+                self.cond.wait()
+            return self.queue.popleft() if self.queue else None
+
+    def _finish(self, job, row):
+        with self.cond:
+            if job['id'] in self.pending:
+                self.pending.discard(job['id'])
+                self.results[job['id']] = row
+                self.cond.notify_all()
+
+    def _retry(self, job, worker):
+        """ Hand out the job of a lost worker again, or report it failed """
+        with self.cond:
+            if job['id'] not in self.pending:
+                return
+            job['attempts'] += 1
+            if job['attempts'] > self.retries:
+                self.pending.discard(job['id'])
+                self.results[job['id']] = dict(
+                    job['config'], error=f"lost {job['attempts']} workers, last {worker}"
+                )
+            else:
+                self.queue.appendleft(job)
+                self.requeued += 1
+            self.cond.notify_all()
+
+    def _sendFile(self, conn, digest):
+        path = self.files[digest]
+        contracts = None
+        if os.path.exists(contractsPath(path)):
+            with open(contractsPath(path)) as file:
+                contracts = file.read()
+        conn.send(('file', os.path.getsize(path), contracts))
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(CHUNK), b''):
+                conn.send_bytes(chunk)
+
+    def _serve(self, conn):
+        """ Protocol of one worker connection
+            *worker: ('hello', name, source), then ('ready',), ('fetch', digest),
+             ('alive',) or ('result', job id, row)
+            *coordinator: ('welcome', timeout) or ('reject', reason), then
+             ('job', job id, setup, config), ('file', size, contracts) or ('done',) """
+        job, name = None, None
+        try:
+            _, name, source = conn.recv()
+            if source != self.source:
+                conn.send(('reject', f'source version {source[:12]} is not {self.source[:12]}'))
+                return
+            conn.send(('welcome', self.timeout))
+            with self.cond:
+                self.workers[name] = 0
+            while True:
+                if job is not None and self.timeout is not None and not conn.poll(self.timeout):
+                    raise TimeoutError(f'{name} sent nothing for {self.timeout} seconds')
+                message = conn.recv()
+                if message[0] == 'alive':
+                    continue
+                if message[0] == 'fetch':
+                    self._sendFile(conn, message[1])
+                    continue
+                if message[0] == 'result':
+                    self._finish(job, message[2])
+                    with self.cond:
+                        self.workers[name] += 1
+                job = self._next()
+                if job is None:
+                    conn.send(('done',))
+                    return
+                conn.send(('job', job['id'], job['setup'], job['config']))
+        except (EOFError, OSError, TimeoutError):
+            pass
+        finally:
+            if job is not None:
+                self._retry(job, name)
+            with self.cond:
+                self.workers.pop(name, None)
+            conn.close()
+
+
+class Heartbeat:
+    """ Sends ('alive',) every interval seconds while a worker runs a job,
+        so the coordinator's timeout only catches a worker that stopped
+        *sends share a lock with the worker's own messages """
+
+    def __init__(self, conn, interval=None):
+        self.conn     = conn
+        self.interval = interval
+        self.lock     = threading.Lock()
+        self.busy     = threading.Event()
+        self.stopped  = threading.Event()
+        if interval:
+            threading.Thread(target=self._beat, daemon=True).start()
+
+    def send(self, message):
+        with self.lock:
+            self.conn.send(message)
+
+    def _beat(self):
+        while not self.stopped.wait(self.interval):
+            if self.busy.is_set():
+                try:
+                    self.send(('alive',))
+                except OSError:
+                    return
+
+    def stop(self):
+        self.stopped.set()
+
+
+def connect(address, authkey, wait=30):
+    """ Connection to a coordinator, retried for wait seconds while it starts """
+    deadline = t.monotonic() + wait
+    while True:
+        try:
+            return Client(address, authkey=authkey)
+        except (ConnectionRefusedError, FileNotFoundError):
+            if t.monotonic() > deadline:
+                raise
+            t.sleep(0.2)
+
+
+def fetchTicks(heartbeat, digest, path):
+    """ Save the recording of digest (and its contracts) from the coordinator to path """
+    conn = heartbeat.conn
+    heartbeat.send(('fetch', digest))
+    _, size, contracts = conn.recv()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp = f'{path}.{os.getpid()}.tmp'
+    with open(temp, 'wb') as file:
+        received = 0
+        while received < size:
+            chunk = conn.recv_bytes()
+            file.write(chunk)
+            received += len(chunk)
+    if contracts is not None:
+        with open(contractsPath(path), 'w') as file:
+            file.write(contracts)
+    os.replace(temp, path)
+
+
+def localTicks(heartbeat, ticks, directory='sweep_ticks') -> list:
+    """ local paths of the (path, digest) recordings of a job
+        *the coordinator's path is used if it holds the same content,
+         otherwise the recording is fetched once into directory """
+    paths = []
+    for path, digest in ticks:
+        if os.path.exists(path) and fileDigest(path) == digest:
+            paths.append(path)
+            continue
+        local = os.path.join(directory, f'{digest}.bin')
+        if not (os.path.exists(local) and fileDigest(local) == digest):
+            fetchTicks(heartbeat, digest, local)
+        paths.append(local)
+    return paths
+
+
+def work(address, authkey, directory='sweep_ticks', wait=30):
+    """ Run the jobs of a SweepCoordinator until it is done
+        *the ticks and indicator tapes stay loaded while the recordings of the
+         jobs stay the same, across the runs of a search
+        *returns the number of jobs run, also when the coordinator goes away """
+    authkey = authkey if isinstance(authkey, bytes) else authkey.encode()
+    name = f'{socket.gethostname()}:{os.getpid()}'
+    conn = connect(address, authkey, wait)
+    conn.send(('hello', name, sourceVersion()))
+    reply = conn.recv()
+    if reply[0] == 'reject':
+        conn.close()
+        raise RuntimeError(f'coordinator {address} turned {name} away: {reply[1]}')
+    timeout = reply[1] if len(reply) > 1 else None
+    heartbeat = Heartbeat(conn, timeout/3 if timeout else None)
+    heartbeat.send(('ready',))
+    loaded, cache, jobs = None, None, 0
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == 'done':
+                return jobs
+            _, jobId, setup, config = message
+            heartbeat.busy.set()
+            paths = localTicks(heartbeat, setup['ticks'], directory)
+            key = (paths, json.dumps([setup['cache'], setup['indicators']], sort_keys=True))
+            if key != loaded:
+                cache = None if setup['cache'] is None else ReplayCache(**setup['cache'])
+                SweepWorker.start(paths, *workerSetup(
+                    paths, setup['options'], cache, setup['indicators']
+                ))
+                loaded = key
+            SweepWorker.options = workerSetup(paths, setup['options'], cache)[0]
+            _, row = SweepWorker.run((jobId, config))
+            row['worker'] = name
+            heartbeat.busy.clear()
+            heartbeat.send(('result', jobId, row))
+            jobs += 1
+    except (EOFError, OSError):
+        return jobs
+    finally:
+        heartbeat.stop()
+        conn.close()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:36:14 2026
+"""
+
+
+class IndicatorGraph:
+    """ Per-bar indicators of one (symbol, ticksPerBar), evaluated once per closed bar
+        *each indicator declares the indicators it reads, which must already be
+         in the graph, so insertion order is a topological order
+        *values are cached until the next bar, every consumer reads the same value
+        *indicators are reference counted, inputs hold a reference for each reader """
+
+    def __init__(self):
+        self.nodes   = {}
+        self.refs    = {}
+        self.values  = {}
+        self.barTime = None
+
+    def __contains__(self, name):
+        return name in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getitem__(self, name):
+        """ cached value of name, evaluated now if it was added since the last bar """
+        if name not in self.values:
+            self.values[name] = self.nodes[name][0]()
+        return self.values[name]
+
+    def get(self, name, default=None):
+        return self[name] if name in self.nodes else default
+
+    def add(self, name, function, inputs=()):
+        """ Add (or reference again) the indicator name = function()
+            *function reads its inputs through the graph """
+        if name not in self.nodes:
+            missing = [i for i in inputs if i not in self.nodes]
+            if missing:
+                raise KeyError(f'{name} reads indicators not in the graph: {missing}')
+            for i in inputs:
+                self.refs[i] += 1
+            self.nodes[name] = (function, tuple(inputs))
+        self.refs[name] = self.refs.get(name, 0) + 1
+
+    def remove(self, name):
+        """ Drop a reference to name, it is removed with its last reference """
+        if name not in self.nodes:
+            return
+        self.refs[name] -= 1
+        if self.refs[name]:
+            return
+        function, inputs = self.nodes.pop(name)
+        del self.refs[name]
+        self.values.pop(name, None)
+        for i in inputs:
+            self.remove(i)
+
+    def update(self, barTime):
+        """ Evaluate every indicator for a new bar, in topological order """
+        self.barTime = barTime
+        self.values  = {}
+        for name in list(self.nodes):
+            self[name]
@@ -7,10 +7,16 @@ Created on Tue Aug  4 01:09:59 2020
 
 import os
 from datetime import datetime
-from pandas import Series, DataFrame
+from pandas import Series
 
 import eventkit
 import candles
+from stores import TickStore, BarStore, ColumnStore, Retention
+from bars import TickBarBuilder, BarAggregator
+from subscriptions import Subscriptions
+from graph import IndicatorGraph
+from indicators import (FormingATR, DirectionalMovement, MovingAverage, AverageSlope,
+                        windowedEwm, EWM_KWARGS, checkEwmKwargs)
 
 
 def get_smoothed_value(values: Series, new_value: float, window=14):
@@ -35,7 +41,13 @@ def movingAverage(values: Series,
 
     window = min(values.size, window) if window > 0 else values.size
     if window > 1:
-        if kwargs:
+        if kwargs and set(kwargs) <= EWM_KWARGS and not values.isna().any():
+            moving_average = Series(
+                windowedEwm(values.to_numpy(dtype=float), window, **kwargs),
+                index = values.index,
+                name  = values.name
+            )
+        elif kwargs:
             seed = Series(
                 [values.head(x+1).ewm(**kwargs).mean().iloc[-1]
                  for x in range(window)
@@ -56,6 +68,19 @@ def movingAverage(values: Series,
         return values if complete else values.iloc[-1]
 
 
+def movingAverageKey(window=0, **kwargs):
+    """ key of a registered movingAverage, windows below 1 all mean the whole history """
+    return (max(int(window), 0), tuple(sorted(kwargs.items())))
+
+
+def storedValues(store, column, steps_back=0, complete=False):
+    """ last value (or the whole series) of a ColumnStore column, steps_back bars ago """
+    if complete:
+        values = store.series(column)
+        return values.head(-steps_back) if steps_back else values
+    return store.last(column, steps_back)
+
+
 def averageSlope(values: Series,
                  window,
                  steps_back=0,
@@ -76,9 +101,12 @@ class DataExtensions:
     prices          = {}
     tickBars        = {}
     currentBar      = {}
+    barAggregators  = {}
+    _priceUpdaters  = {}
+    subscriptions   = Subscriptions()
+    formingRetention = Retention()
+    _slopes         = None
     newTickBarEvent = eventkit.Event()
-    DMI_started     = False
-    ADX_started     = False
     _data_streams   = {}
     
     
@@ -163,6 +191,36 @@ class DataExtensions:
                      steps_back=steps_back,
                      complete=complete,
                      **kwargs)
+    
+    def storedSlope(self, store, column, window,
+                    steps_back=0, complete=False, **kwargs):
+        """ averageSlope of a ColumnStore column
+            *memoized per (store, column, window, kwargs), so every consumer
+             shares one incremental update per new row
+            *kwargs outside EWM_KWARGS are computed by averageSlope instead """
+        if set(kwargs) - EWM_KWARGS:
+            return self.averageSlope(store.series(column), window,
+                                     steps_back=steps_back, complete=complete, **kwargs)
+        if self._slopes is None:
+            self._slopes = {}
+        key = (id(store), column, movingAverageKey(window, **kwargs))
+        slope = self._slopes.get(key)
+        if slope is None or slope.source is not store:
+            self._slopes[key] = slope = AverageSlope(store, column, window, **kwargs)
+        slopes = slope.update()
+        if slopes.empty:
+            return 0
+        return storedValues(slopes, 'slope', steps_back, complete)
+    
+    def dropSlopes(self, store, column=None, window=None, **kwargs):
+        """ Forget the storedSlope of a store (one column and window, or all of them) """
+        if not self._slopes:
+            return
+        if column is not None:
+            self._slopes.pop((id(store), column, movingAverageKey(window, **kwargs)), None)
+            return
+        for key in [key for key, slope in self._slopes.items() if slope.source is store]:
+            del self._slopes[key]
         
     """
     ///////////////////////////////////////////////////////////////////////////
@@ -170,23 +228,36 @@ class DataExtensions:
     ///////////////////////////////////////////////////////////////////////////
     """
 
-    def addTickPrices(self, contract):
-        """ Add contract of that symbol to series of prices being stored"""
-        self.prices[contract.symbol] = DataFrame()
+    def addTickPrices(self, contract, maxlen=0):
+        """ Add contract of that symbol to the tick prices being stored
+            *maxlen > 0 only retains the most recent maxlen ticks
+            *the store is updated once the tick handlers of the batch ran """
+        symbol = contract.symbol
+        conId  = contract.conId
+        if not self.subscriptions.acquire(('prices', symbol)):
+            return
+        self.prices[symbol] = prices = TickStore(maxlen=maxlen)
         
-        def updatePrices(tickers, contract):
-            symbol = contract.symbol
-            @self.tickersEvent(contract)
-            def setPrice(tickPrice, tickTime):
-                self.prices[symbol] = self.prices[symbol].append(
-                    Series(tickPrice, name=tickTime)
+        def updatePrices(batch):
+            mask = batch.mask(conId)
+            if mask.any():
+                prices.extend(
+                    batch.time[mask],
+                    ask=batch.ask[mask],
+                    bid=batch.bid[mask],
+                    mid=batch.mid[mask]
                 )
-            
-            return setPrice(tickers)
         
-        self.pendingTickersEvent += updatePrices
+        self.tickRouter.routedEvent += updatePrices
+        self._priceUpdaters[symbol] = updatePrices
 
-        self._data_streams[f'tickPrices_{contract.symbol}'] = lambda: self.prices[contract.symbol]
+        self._data_streams[f'tickPrices_{symbol}'] = lambda: prices.frame()
+    
+    def removeTickPrices(self, contract):
+        """ Stop storing tick prices once the last consumer releases them """
+        symbol = contract.symbol
+        if self.subscriptions.release(('prices', symbol)):
+            self.tickRouter.routedEvent -= self._priceUpdaters.pop(symbol)
 
     """
     ///////////////////////////////////////////////////////////////////////////
@@ -195,62 +266,94 @@ class DataExtensions:
     """
     
     def addTickBars(self, contract, ticksPerBar=250, ATR_windows=[], priceType='mid'):
-        """ Add tickBars for a specific symbol and ticksPerBar to pendingTickersEvent"""
+        """ Add tickBars for a specific symbol and ticksPerBar to the contract's bar aggregator
+            *every ticksPerBar of a contract is updated by one tick handler in a single pass"""
         symbol = contract.symbol
         if symbol not in self.tickBars:
             self.tickBars[symbol]   = {}
             self.currentBar[symbol] = {}
         if ticksPerBar not in self.tickBars[symbol]:
+            raw = BarStore()
             self.tickBars[symbol][ticksPerBar]   = {
-                'raw'   :DataFrame(), 
-                'smooth':DataFrame(), 
+                'raw'   :raw, 
+                'smooth':BarStore(), 
                 'ATR'   :{},
-                'STR'   :{},
+                'DM'    :self.newDirectionalMovement(contract, ticksPerBar, raw, priceType),
                 'DMI'   :{},
-                'ADX'   :{}
+                'ADX'   :{},
+                'MA'    :{},
+                'moves' :{'raw': candles.MoveTracker(), 'smooth': candles.MoveTracker()}
             }
+            self.tickBars[symbol][ticksPerBar]['graph'] = self.barGraph(self.tickBars[symbol][ticksPerBar])
             self.currentBar[symbol][ticksPerBar] = {'raw': {}, 'smooth': {}}
         for window in ATR_windows:
             self.addATR(contract, ticksPerBar, window)
+        if not self.subscriptions.acquire(('bars', symbol, ticksPerBar)):
+            return
         
-        def barUpdater(tickers):
-            """ Function added to pendingTickersEvent that updates the tickBars and current Tickbar"""
-            tickBars = self.tickBars[symbol][ticksPerBar]
-            bar   = self.currentBar[symbol][ticksPerBar]['raw']
+        if symbol not in self.barAggregators:
+            self.barAggregators[symbol] = aggregator = BarAggregator()
             
-            @self.tickersEvent(contract)
-            def updateBar(tickPrice, tickTime):
-                tickPrice = tickPrice[priceType]
-                newBar = False
-                if (not bar) or (bar['ticks'] == ticksPerBar):
-                    bar['open']  = tickPrice
-                    bar['high']  = tickPrice
-                    bar['low']   = tickPrice
-                    bar['ticks'] = 1
-                else:
-                    bar['low']    = min(bar['low'] , tickPrice)
-                    bar['high']   = max(bar['high'], tickPrice)
-                    bar['ticks'] += 1
-                bar['close'] = tickPrice
-                hkbar = candles.getHeikinAshiBar(bar, tickBars['smooth'])
-                hkbar['ticks'] = bar['ticks']
-                if bar['ticks'] == ticksPerBar:
-                    tickBars['raw'] = tickBars['raw'].append(Series(bar, name=tickTime))
-                    tickBars['smooth'] = tickBars['smooth'].append(Series(hkbar, name=tickTime))
-                    newBar = True
-                self._updateFormingTickBarIndicators(symbol, ticksPerBar, bar, tickTime)
-                return (newBar, tickTime)
+            def barUpdater(tickPrice, tickTime):
+                """ Tick handler that updates the tickBars and current Tickbars of every ticksPerBar"""
+                newBars = aggregator.update(tickPrice, tickTime)
+                for builder in aggregator:
+                    self._updateFormingTickBarIndicators(symbol, builder.ticksPerBar, builder.bar, tickTime)
+                for barTicks in newBars:
+                    self._updateTickBarIndicators(symbol, barTicks, tickTime)
+                for barTicks in newBars:
+                    self.newTickBarEvent.emit(contract, barTicks, tickTime)
             
-            for isNewBar, barTime in updateBar(tickers):
-                if isNewBar:
-                    self.newTickBarEvent.emit(contract, ticksPerBar, barTime)
-            
-        self.pendingTickersEvent += barUpdater
-
-        self._data_streams[f'rawBars_{symbol}_{ticksPerBar}tpb'] = lambda: self.tickBars[symbol][ticksPerBar]['raw']
-        self._data_streams[f'HaBars_{symbol}_{ticksPerBar}tpb']  = lambda: self.tickBars[symbol][ticksPerBar]['smooth']
+            self.subscribeTicks(contract, barUpdater)
+            aggregator.tickHandler = barUpdater
+        
+        if ticksPerBar not in self.barAggregators[symbol]:
+            self.barAggregators[symbol].add(self.newBarBuilder(
+                contract,
+                ticksPerBar,
+                self.currentBar[symbol][ticksPerBar],
+                self.tickBars[symbol][ticksPerBar],
+                priceType
+            ))
 
+        tickBars = self.tickBars[symbol][ticksPerBar]
+        self._data_streams[f'rawBars_{symbol}_{ticksPerBar}tpb'] = lambda: tickBars['raw'].frame()
+        self._data_streams[f'HaBars_{symbol}_{ticksPerBar}tpb']  = lambda: tickBars['smooth'].frame()
+    
+    def newBarBuilder(self, contract, ticksPerBar, currentBar, tickBars, priceType='mid'):
+        """ TickBarBuilder of a new ticksPerBar, can overwrite in subclasses """
+        return TickBarBuilder(
+            ticksPerBar,
+            currentBar['raw'],
+            currentBar['smooth'],
+            tickBars['raw'],
+            tickBars['smooth'],
+            priceType=priceType,
+            moves=tickBars['moves']
+        )
+    
+    def newDirectionalMovement(self, contract, ticksPerBar, bars, priceType='mid'):
+        """ DirectionalMovement of new tickBars, can overwrite in subclasses """
+        return DirectionalMovement()
     
+    def newFormingATR(self, contract, ticksPerBar, window):
+        """ FormingATR of a new window, can overwrite in subclasses """
+        return FormingATR(window, self.tickBars[contract.symbol][ticksPerBar]['raw'])
+    
+    def removeTickBars(self, contract, ticksPerBar=250, ATR_windows=[]):
+        """ Release tickBars (and ATR windows) added with addTickBars
+            *bars stop updating once their last consumer releases them, 
+             the bars already built are kept for saving """
+        symbol = contract.symbol
+        for window in ATR_windows:
+            self.removeATR(contract, ticksPerBar, window)
+        if self.subscriptions.release(('bars', symbol, ticksPerBar)):
+            aggregator = self.barAggregators[symbol]
+            aggregator.remove(ticksPerBar)
+            if not len(aggregator):
+                self.unsubscribeTicks(contract, aggregator.tickHandler)
+                del self.barAggregators[symbol]
+
     """
     ///////////////////////////////////////////////////////////////////////////
     Indicator methods
@@ -260,13 +363,77 @@ class DataExtensions:
     def _updateFormingTickBarIndicators(self, symbol, ticksPerBar, bar, tickTime):
         self.updateATR(symbol, ticksPerBar, bar, tickTime)
     
+    def _updateTickBarIndicators(self, symbol, ticksPerBar, barTime):
+        """ Indicators updated once per closed bar, before newTickBarEvent is emitted """
+        self.tickBars[symbol][ticksPerBar]['graph'].update(barTime)
+    
+    @staticmethod
+    def barGraph(tickBars):
+        """ IndicatorGraph of new tickBars with the last raw and Heikin-Ashi
+            bars and their colors """
+        graph = IndicatorGraph()
+        
+        def lastBar(store):
+            return lambda: store.lastBar() if len(store) else None
+        
+        def color(name):
+            return lambda: candles.candleColor(graph[name]) if graph[name] else None
+        
+        graph.add('bar', lastBar(tickBars['raw']))
+        graph.add('ha_bar', lastBar(tickBars['smooth']))
+        graph.add('color', color('bar'), inputs=('bar',))
+        graph.add('ha_color', color('ha_bar'), inputs=('ha_bar',))
+        return graph
+    
+    def indicator(self, contract, ticksPerBar, name):
+        """ Value of an indicator of the (symbol, ticksPerBar) graph for the last closed bar """
+        return self.tickBars[contract.symbol][ticksPerBar]['graph'][name]
+    
+    def addMovingAverage(self, contract, ticksPerBar, window, **kwargs):
+        """ Register an incremental tickBar close movingAverage (ewm with kwargs)
+            *it is updated in O(1) as each bar closes and tickBarMovingAverage
+             reads it instead of recomputing the whole average """
+        symbol = contract.symbol
+        key = movingAverageKey(window, **kwargs)
+        checkEwmKwargs(kwargs)
+        if not self.subscriptions.acquire(('MA', symbol, ticksPerBar, key)):
+            return
+        state  = MovingAverage(window, **kwargs)
+        values = ColumnStore(('MA',), capacity=256)
+        tickBars = self.tickBars[symbol][ticksPerBar]
+        raw = tickBars['raw']
+        
+        def updateMovingAverage():
+            """ catch up with the closed bars, one O(1) update per bar """
+            closes, times = raw.values('close'), raw.times
+            for i in range(len(values), len(raw)):
+                values.append(times[i], {'MA': state.update(closes[:i+1])})
+            return values.last('MA') if len(values) else None
+        
+        updateMovingAverage()
+        tickBars['MA'][key] = {'state': state, 'values': values}
+        tickBars['graph'].add(('MA', key), updateMovingAverage, inputs=('bar',))
+    
+    def removeMovingAverage(self, contract, ticksPerBar, window, **kwargs):
+        symbol = contract.symbol
+        key = movingAverageKey(window, **kwargs)
+        if self.subscriptions.release(('MA', symbol, ticksPerBar, key)):
+            self.dropSlopes(self.tickBars[symbol][ticksPerBar]['MA'].pop(key)['values'])
+            self.tickBars[symbol][ticksPerBar]['graph'].remove(('MA', key))
     
     def tickBarMovingAverage(self, contract, ticksPerBar, window,
                              steps_back=0, complete=False, **kwargs):
-        if self.tickBars[contract.symbol][ticksPerBar]['raw'].empty:
+        tickBars = self.tickBars[contract.symbol][ticksPerBar]
+        key = movingAverageKey(window, **kwargs)
+        ma = tickBars['MA'].get(key)
+        if ma is not None and not tickBars['raw'].empty:
+            if not (steps_back or complete):
+                return tickBars['graph'][('MA', key)]
+            return storedValues(ma['values'], 'MA', steps_back, complete)
+        if tickBars['raw'].empty:
             values = Series(dtype=float)
         else:
-            values = self.tickBars[contract.symbol][ticksPerBar]['raw']['close']
+            values = tickBars['raw'].series('close')
         return self.movingAverage(values, window,
                              steps_back=steps_back,
                              complete=complete, 
@@ -274,12 +441,52 @@ class DataExtensions:
                              )
         
     
+    def tickBarMovingAverageSlope(self, contract, ticksPerBar, window, slope_window,
+                                  steps_back=0, complete=False, **kwargs):
+        """ averageSlope of a tickBar close movingAverage, kwargs are the slope's """
+        tickBars = self.tickBars[contract.symbol][ticksPerBar]
+        name = ('MA_slope', movingAverageKey(window), movingAverageKey(slope_window, **kwargs))
+        if not (steps_back or complete) and name in tickBars['graph']:
+            return tickBars['graph'][name]
+        ma = tickBars['MA'].get(movingAverageKey(window))
+        if ma is None:
+            return self.averageSlope(
+                self.tickBarMovingAverage(contract, ticksPerBar, window, complete=True),
+                slope_window, steps_back=steps_back, complete=complete, **kwargs
+            )
+        return self.storedSlope(ma['values'], 'MA', slope_window,
+                                steps_back=steps_back, complete=complete, **kwargs)
+    
+    def addMovingAverageSlope(self, contract, ticksPerBar, window, slope_window, **kwargs):
+        """ Add the slope of a registered tickBar close movingAverage to the bar graph """
+        symbol = contract.symbol
+        maKey, slopeKey = movingAverageKey(window), movingAverageKey(slope_window, **kwargs)
+        checkEwmKwargs(kwargs)
+        if not self.subscriptions.acquire(('MA_slope', symbol, ticksPerBar, maKey, slopeKey)):
+            return
+        self.addMovingAverage(contract, ticksPerBar, window)
+        ma = self.tickBars[symbol][ticksPerBar]['MA'][maKey]
+        self.tickBars[symbol][ticksPerBar]['graph'].add(
+            ('MA_slope', maKey, slopeKey),
+            lambda: self.storedSlope(ma['values'], 'MA', slope_window, **kwargs),
+            inputs=(('MA', maKey),)
+        )
+    
+    def removeMovingAverageSlope(self, contract, ticksPerBar, window, slope_window, **kwargs):
+        symbol = contract.symbol
+        maKey, slopeKey = movingAverageKey(window), movingAverageKey(slope_window, **kwargs)
+        if self.subscriptions.release(('MA_slope', symbol, ticksPerBar, maKey, slopeKey)):
+            self.tickBars[symbol][ticksPerBar]['graph'].remove(('MA_slope', maKey, slopeKey))
+            ma = self.tickBars[symbol][ticksPerBar]['MA'][maKey]
+            self.dropSlopes(ma['values'], 'MA', slope_window, **kwargs)
+            self.removeMovingAverage(contract, ticksPerBar, window)
+    
     def tickMovingAverage(self, contract, window,
                           steps_back=0, complete=False, priceType='mid', **kwargs):
         if self.prices[contract.symbol].empty:
             values = Series(dtype=float)
         else:
-            values = self.prices[contract.symbol][priceType]
+            values = self.prices[contract.symbol].series(priceType)
         return self.movingAverage(values, window,
                              steps_back=steps_back,
                              complete=complete,
@@ -287,83 +494,57 @@ class DataExtensions:
                              )
 
    
-    def addATR(self, contract, ticksPerBar, window):
+    def addATR(self, contract, ticksPerBar, window, retention=None):
+        """ Add a forming ATR to the tickBars
+            *retention decides which per-tick forming values are kept,
+             defaults to formingRetention """
         symbol = contract.symbol
+        if not self.subscriptions.acquire(('ATR', symbol, ticksPerBar, window)):
+            return
+        retention = retention or self.formingRetention
         self.tickBars[symbol][ticksPerBar]['ATR'][window] = tickbars = {
-            'formed' :{
-                'values':Series(dtype=float),
-                'slopes':Series(dtype=float)
-            },
-            'forming':{
-                'values':Series(dtype=float),
-                'slopes':Series(dtype=float)
-            }
+            'formed' : ColumnStore(('values', 'slopes')),
+            'forming': retention.store(('values', 'slopes')),
+            'state'  : self.newFormingATR(contract, ticksPerBar, window),
+            'retention': retention
         }
         
-        for bar_state, data in tickbars.items():
-            for derivative, values in data.items():
-                def getValues():
-                    return self.tickBars[symbol][ticksPerBar]['ATR'][window][bar_state][derivative]
+        for bar_state in ('formed', 'forming'):
+            for derivative in ('values', 'slopes'):
+                def getValues(data=tickbars[bar_state], derivative=derivative):
+                    return data.series(derivative)
                 data_name = f'ATR_{derivative}_{bar_state}_{symbol}_{ticksPerBar}tpb_window{window}'
                 self._data_streams[data_name] = getValues
     
+    def removeATR(self, contract, ticksPerBar, window):
+        if self.subscriptions.release(('ATR', contract.symbol, ticksPerBar, window)):
+            self.tickBars[contract.symbol][ticksPerBar]['ATR'].pop(window)
+    
     
     def updateATR(self, symbol, ticksPerBar, bar, tickTime):
-        
-        def _formingATR(window, bars, formingTR, atrData, r, tickTime):
-            formedATRs = atrData['formed']['values']
-            avgTrueRange = formedATRs.iloc[-1] if formedATRs.size else 0
-            if bars.shape[0] > window:
-                removedRange = candles.trueRange(bars, window + int(r))
-                newATR = avgTrueRange + r*(formingTR - removedRange)/window
-            else:
-                window = bars.shape[0]
-                newATR = (avgTrueRange*window + r*formingTR)/(window + r)
-            atrData['forming']['values'].at[tickTime] = newATR
-            if r == 1.0:
-                formedATRs.at[tickTime] = newATR
-            _formingSlope(atrData, r, tickTime)
-                
-        def _formingSlope(atrData, r, tickTime):
-            formedATRs = atrData['formed']['values']
-            ATR_forming = atrData['forming']['values'].iloc[-1]
-            ATR_new_formed = formedATRs.iloc[-1] if formedATRs.size else 0
-            ATR_old_formed = formedATRs.iloc[-2] if formedATRs.size > 1 else 0
-            if r == 1.0:
-                ATR_slope = ATR_new_formed - ATR_old_formed
-                atrData['forming']['slopes'].at[tickTime] = ATR_slope
-                atrData['formed']['slopes'].at[tickTime] = ATR_slope
-            else:
-                ATR_slope = r*(ATR_forming - ATR_new_formed) + (1-r)*(ATR_new_formed - ATR_old_formed)
-                atrData['forming']['slopes'].at[tickTime] = ATR_slope
-        
-        def _updateATRs(symbol, ticksPerBar, bar, tickTime):
-            aTRs = self.tickBars[symbol][ticksPerBar]['ATR'].items()
-            if aTRs:
-                bars = self.tickBars[symbol][ticksPerBar]['raw']
-                r    = bar['ticks']/ticksPerBar
-                if r == 1.0:
-                    forming_TR = candles.trueRange(bars, 1)
-                else:
-                    prev_close = bars.iloc[-1]['close'] if bars.size else bar['open']
-                    forming_TR = max(bar['high']-bar['low'], 
-                                     abs(prev_close-bar['high']), 
-                                     abs(prev_close-bar['low'])
-                                     )
-                
-                for window, ATR_data in aTRs:
-                    _formingATR(window, bars, forming_TR, ATR_data, r, tickTime)
-        
-        _updateATRs(symbol, ticksPerBar, bar, tickTime)
+        """ Update every ATR window of the tickBars with the forming bar"""
+        aTRs = self.tickBars[symbol][ticksPerBar]['ATR']
+        if aTRs:
+            r = bar['ticks']/ticksPerBar
+            closed = r == 1.0
+            for atrData in aTRs.values():
+                atr = atrData['state']
+                atr.update(bar, r)
+                values = {'values': atr.forming, 'slopes': atr.formingSlope}
+                if atrData['retention'].keep(atr.ticks, closed):
+                    atrData['forming'].append(tickTime, values)
+                if closed:
+                    atrData['formed'].append(tickTime, values)
     
     
     def getATR_values(self, contract, ticksPerBar, window,forming=True, slope=False, steps_back=0, complete=False):
-        atrs = self.tickBars[contract.symbol][ticksPerBar]['ATR'][window][
-            'forming' if forming else 'formed'
-        ]['slopes' if slope else 'values']
-        if steps_back:
-            atrs = atrs.head(-steps_back)
-        return atrs if complete else atrs.iloc[-1]
+        atrData = self.tickBars[contract.symbol][ticksPerBar]['ATR'][window]
+        derivative = 'slopes' if slope else 'values'
+        if forming and not (steps_back or complete) and atrData['state'].ticks:
+            atr = atrData['state']
+            return atr.formingSlope if slope else atr.forming
+        atrs = atrData['forming' if forming else 'formed']
+        return storedValues(atrs, derivative, steps_back, complete)
     
     def getFormingATR(self, contract, ticksPerBar, window, steps_back=0, complete=False):
         return self.getATR_values(
@@ -396,102 +577,104 @@ class DataExtensions:
     
     def addDMI(self, contract, ticksPerBar, window):
         symbol = contract.symbol
-        self.tickBars[symbol][ticksPerBar]['STR'][window] = Series(dtype=float)
-        self.tickBars[symbol][ticksPerBar]['DMI'][window] = {
-            'DM':{
-                'plus' :Series(dtype=float),
-                'minus':Series(dtype=float)
-            },
-            'DI':{
-                'plus' :Series(dtype=float),
-                'minus':Series(dtype=float)
-            }
-        }
-        if not self.DMI_started:
-            self.startDMI()
+        if not self.subscriptions.acquire(('DMI', symbol, ticksPerBar, window)):
+            return
+        tickBars = self.tickBars[symbol][ticksPerBar]
+        tickBars['DMI'][window] = dmi = ColumnStore(DirectionalMovement.DMI_columns, capacity=256)
+        tickBars['DM'].addDMI(window, dmi)
+        graph = tickBars['graph']
+        engine, raw = tickBars['DM'], tickBars['raw']
+        if 'DM' not in graph:
+            engine.rows = len(raw)
         
-        str_    = f'STR_{symbol}_{ticksPerBar}tpb_window{window}'
-        dmplus  = f'DMplus_{symbol}_{ticksPerBar}tpb_window{window}'
-        dmminus = f'DMminus_{symbol}_{ticksPerBar}tpb_window{window}'
-        diplus  = f'DIplus_{symbol}_{ticksPerBar}tpb_window{window}'
-        diminus = f'DIminus_{symbol}_{ticksPerBar}tpb_window{window}'
+        def updateDirectionalMovement():
+            if len(raw):
+                engine.update(raw, raw.lastTime())
+            return engine
         
-        self._data_streams[str_]    = lambda: self.tickBars[symbol][ticksPerBar]['STR'][window]
-        self._data_streams[dmplus]  = lambda: self.tickBars[symbol][ticksPerBar]['DMI'][window]['DM']['plus']
-        self._data_streams[dmminus] = lambda: self.tickBars[symbol][ticksPerBar]['DMI'][window]['DM']['minus']
-        self._data_streams[diplus]  = lambda: self.tickBars[symbol][ticksPerBar]['DMI'][window]['DI']['plus']
-        self._data_streams[diminus] = lambda: self.tickBars[symbol][ticksPerBar]['DMI'][window]['DI']['minus']
-
-    def startDMI(self):
-        
-        def updateSTR(contract, ticksPerBar, barTime, *args, **kwargs):
-            symbol = contract.symbol
-            if self.tickBars[symbol][ticksPerBar]['raw'].shape[0] > 1:
-                sTRs  = self.tickBars[symbol][ticksPerBar]['STR']
-                newTR = candles.trueRange(self.tickBars[symbol][ticksPerBar]['raw'], 1)
-                for window, values in sTRs.items():
-                    sTRs[window].at[barTime] = self.get_smoothed_value(
-                        values,
-                        newTR,
-                        window
-                    )
-
-        def updateDMI(contract, ticksPerBar, barTime, *args, **kwargs):
-            symbol = contract.symbol
-            bars = self.tickBars[symbol][ticksPerBar]['raw']
-            if bars.shape[0] > 1:
-                [[prev_high, prev_low],[current_high, current_low]] = bars[['high','low']].iloc[-2:].values
-                DM_plus = max(current_high - prev_high, 0)
-                DM_minus = max(prev_low - current_low, 0)
-                if DM_plus > DM_minus:
-                    	DM_minus = 0
-                elif DM_minus > DM_plus:
-                    	DM_plus = 0
-                else:
-                    	DM_minus = DM_plus = 0
-                for window, DMI in self.tickBars[symbol][ticksPerBar]['DMI'].items():
-                    smoothDM_plus  = self.get_smoothed_value(DMI['DM']['plus'], DM_plus, window)
-                    smoothDM_minus = self.get_smoothed_value(DMI['DM']['minus'], DM_minus, window)
-                    smoothTR = self.tickBars[symbol][ticksPerBar]['STR'][window].iloc[-1]
-                    DI_plus  = 100*smoothDM_plus/smoothTR
-                    DI_minus = 100*smoothDM_minus/smoothTR
-                    DMI['DM']['plus'].at[barTime]  = smoothDM_plus
-                    DMI['DM']['minus'].at[barTime] = smoothDM_minus
-                    DMI['DI']['plus'].at[barTime]  = DI_plus
-                    DMI['DI']['minus'].at[barTime] = DI_minus
-                    
-        self.newTickBarEvent += updateSTR
-        self.newTickBarEvent += updateDMI
-        self.DMI_started = True
+        # the engine is referenced once per DMI window, removeDMI releases it with the last one
+        graph.add('DM', updateDirectionalMovement, inputs=('bar',))
+        graph.add(('DMI', window), lambda: dmi.lastRow() if len(dmi) else None, inputs=('DM',))
         
+        for column in DirectionalMovement.DMI_columns:
+            filename = f'{column}_{symbol}_{ticksPerBar}tpb_window{window}'
+            self._data_streams[filename] = lambda column=column: dmi.series(column)
+    
+    def removeDMI(self, contract, ticksPerBar, window):
+        """ the window stops updating, the values already computed are kept for saving """
+        symbol = contract.symbol
+        if self.subscriptions.release(('DMI', symbol, ticksPerBar, window)):
+            self.tickBars[symbol][ticksPerBar]['DM'].removeDMI(window)
+            self.tickBars[symbol][ticksPerBar]['graph'].remove(('DMI', window))
+            self.tickBars[symbol][ticksPerBar]['graph'].remove('DM')
 
     def addADX(self, contract, ticksPerBar, window):
         symbol = contract.symbol
-        if window not in self.tickBars[symbol][ticksPerBar]['STR']:
-            self.addDMI(contract, ticksPerBar, window)
-        self.tickBars[symbol][ticksPerBar]['ADX'][window] = Series(dtype=float)
-        self.startADX()
-        
-        self._data_streams[f'ADX_{symbol}_{ticksPerBar}tpb_window{window}'] = lambda: self.tickBars[symbol][ticksPerBar]['ADX'][window]
+        if not self.subscriptions.acquire(('ADX', symbol, ticksPerBar, window)):
+            return
+        self.addDMI(contract, ticksPerBar, window)
+        tickBars = self.tickBars[symbol][ticksPerBar]
+        tickBars['ADX'][window] = adx = ColumnStore(DirectionalMovement.ADX_columns, capacity=256)
+        tickBars['DM'].addADX(window, adx)
+        tickBars['graph'].add(
+            ('ADX', window),
+            lambda: adx.last('ADX') if len(adx) else None,
+            inputs=(('DMI', window),)
+        )
         
+        self._data_streams[f'ADX_{symbol}_{ticksPerBar}tpb_window{window}'] = lambda: adx.series('ADX')
     
+    def removeADX(self, contract, ticksPerBar, window):
+        """ the window stops updating, the values already computed are kept for saving """
+        symbol = contract.symbol
+        if self.subscriptions.release(('ADX', symbol, ticksPerBar, window)):
+            self.tickBars[symbol][ticksPerBar]['DM'].removeADX(window)
+            self.tickBars[symbol][ticksPerBar]['graph'].remove(('ADX', window))
+            self.removeDMI(contract, ticksPerBar, window)
     
-    def startADX(self):
-        
-        def updateADX(contract, ticksPerBar, barTime, *args, **kwargs):
-            symbol = contract.symbol
-            if self.tickBars[symbol][ticksPerBar]['raw'].shape[0] > 1:
-                ADXs = self.tickBars[symbol][ticksPerBar]['ADX']
-                for window, values in ADXs.items():
-                    dmi = self.tickBars[symbol][ticksPerBar]['DMI'][window]['DI']
-                    if dmi['plus'].size >= window:
-                        di_plus  = dmi['plus'].iloc[-1]
-                        di_minus = dmi['minus'].iloc[-1]
-                        dx = 100*abs(di_plus - di_minus)/abs(di_plus + di_minus)
-                        ADXs[window].at[barTime] = self.get_smoothed_value(values, dx, window)
-        
-        if not self.DMI_started:
-            self.startDMI()
-        if not self.ADX_started:
-            self.newTickBarEvent += updateADX
-            self.ADX_started = True
\ No newline at end of file
+    def addADX_slope(self, contract, ticksPerBar, window, slope_window, **kwargs):
+        """ Add the averageSlope of an ADX window to the bar graph """
+        symbol = contract.symbol
+        slopeKey = movingAverageKey(slope_window, **kwargs)
+        checkEwmKwargs(kwargs)
+        if not self.subscriptions.acquire(('ADX_slope', symbol, ticksPerBar, window, slopeKey)):
+            return
+        self.addADX(contract, ticksPerBar, window)
+        adx = self.tickBars[symbol][ticksPerBar]['ADX'][window]
+        self.tickBars[symbol][ticksPerBar]['graph'].add(
+            ('ADX_slope', window, slopeKey),
+            lambda: self.storedSlope(adx, 'ADX', slope_window, **kwargs),
+            inputs=(('ADX', window),)
+        )
+    
+    def removeADX_slope(self, contract, ticksPerBar, window, slope_window, **kwargs):
+        symbol = contract.symbol
+        slopeKey = movingAverageKey(slope_window, **kwargs)
+        if self.subscriptions.release(('ADX_slope', symbol, ticksPerBar, window, slopeKey)):
+            self.tickBars[symbol][ticksPerBar]['graph'].remove(('ADX_slope', window, slopeKey))
+            adx = self.tickBars[symbol][ticksPerBar]['ADX'][window]
+            self.dropSlopes(adx, 'ADX', slope_window, **kwargs)
+            self.removeADX(contract, ticksPerBar, window)
+    
+    def getDMI_values(self, contract, ticksPerBar, window, value='DIplus', steps_back=0, complete=False):
+        """ value is one of STR, DMplus, DMminus, DIplus or DIminus """
+        tickBars = self.tickBars[contract.symbol][ticksPerBar]
+        if not (steps_back or complete) and tickBars['graph'].get(('DMI', window)):
+            return tickBars['graph'][('DMI', window)][value]
+        return storedValues(tickBars['DMI'][window], value, steps_back, complete)
+    
+    def getADX(self, contract, ticksPerBar, window, steps_back=0, complete=False):
+        tickBars = self.tickBars[contract.symbol][ticksPerBar]
+        if not (steps_back or complete) and tickBars['graph'].get(('ADX', window)) is not None:
+            return tickBars['graph'][('ADX', window)]
+        return storedValues(tickBars['ADX'][window], 'ADX', steps_back, complete)
+    
+    def getADX_slope(self, contract, ticksPerBar, window, slope_window,
+                     steps_back=0, complete=False, **kwargs):
+        tickBars = self.tickBars[contract.symbol][ticksPerBar]
+        name = ('ADX_slope', window, movingAverageKey(slope_window, **kwargs))
+        if not (steps_back or complete) and name in tickBars['graph']:
+            return tickBars['graph'][name]
+        adx = tickBars['ADX'][window]
+        return self.storedSlope(adx, 'ADX', slope_window,
+                                steps_back=steps_back, complete=complete, **kwargs)
\ No newline at end of file
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:26:53 2026
+"""
+
+import os
+import numpy
+from collections import OrderedDict
+
+from stores import BarStore, ColumnStore
+from bars import TickBarBuilder
+from indicators import FormingATR, DirectionalMovement
+from replaycache import sourceVersion
+
+
+BAR_COLUMNS = ('open', 'high', 'low', 'ticks', 'close')    # the order TickBarBuilder fills a bar
+HA_COLUMNS  = ('close', 'high', 'low', 'open', 'ticks')    # the order of heikinAshiBar
+
+
+def tickPrices(ticks, conId, priceType='mid'):
+    """ (times, prices) of a contract's ticks, priced as TickBatch prices them """
+    ticks = ticks[ticks['conId'] == conId]
+    if priceType == 'mid':
+        prices = ((ticks['ask']*ticks['askSize'] + ticks['bid']*ticks['bidSize'])
+                  /(ticks['askSize'] + ticks['bidSize']))
+    else:
+        prices = ticks[priceType]
+    return numpy.ascontiguousarray(ticks['time']), numpy.ascontiguousarray(prices, dtype=float)
+
+
+def barTape(ticks, conId, ticksPerBar, priceType='mid') -> dict:
+    """ Forming raw and Heikin-Ashi bar after every tick of a contract, built by a TickBarBuilder
+        *bar and ha are (ticks, 5) arrays in BAR_COLUMNS and HA_COLUMNS order,
+         the bars closed at the ticks where the ticks column reaches ticksPerBar """
+    times, prices = tickPrices(ticks, conId, priceType)
+    builder = TickBarBuilder(ticksPerBar, {}, {}, BarStore(), BarStore(), priceType=priceType)
+    bars, has = numpy.empty((prices.size, 5)), numpy.empty((prices.size, 5))
+    for i, (price, time) in enumerate(zip(prices.tolist(), times.tolist())):
+        builder.update({priceType: price}, time)
+        bars[i] = [builder.bar[c] for c in BAR_COLUMNS]
+        has[i]  = [builder.ha_bar[c] for c in HA_COLUMNS]
+    return {'time': times, 'price': prices, 'bar': bars, 'ha': has}
+
+
+def closedBars(tape, ticksPerBar):
+    """ (times, rows) of the bars closed in a barTape """
+    closed = numpy.flatnonzero(tape['bar'][:, 3] == ticksPerBar)
+    return tape['time'][closed], tape['bar'][closed]
+
+
+def atrTape(tape, ticksPerBar, window) -> dict:
+    """ forming ATR value and slope after every tick of a barTape, as a FormingATR updates them """
+    atr = FormingATR(window)
+    forming, slopes = numpy.empty(len(tape['bar'])), numpy.empty(len(tape['bar']))
+    for i, row in enumerate(tape['bar'].tolist()):
+        atr.update(dict(zip(BAR_COLUMNS, row)), row[3]/ticksPerBar)
+        forming[i], slopes[i] = atr.forming, atr.formingSlope
+    return {'forming': forming, 'slopes': slopes}
+
+
+def dmTape(tape, ticksPerBar, window) -> dict:
+    """ DMI and ADX rows of one window after every closed bar of a barTape
+        *DMI row i is appended at bar i+2, ADX row i at bar adxStart+i """
+    dm, raw = DirectionalMovement(), BarStore()
+    dmi = ColumnStore(DirectionalMovement.DMI_columns)
+    adx = ColumnStore(DirectionalMovement.ADX_columns)
+    dm.addDMI(window, dmi)
+    dm.addADX(window, adx)
+    adxStart = 0
+    for time, row in zip(*closedBars(tape, ticksPerBar)):
+        raw.append(time, dict(zip(BAR_COLUMNS, row)))
+        dm.update(raw, time)
+        if len(adx) and not adxStart:
+            adxStart = len(raw)
+    return {
+        'DMI'     : numpy.column_stack([dmi.values(c) for c in DirectionalMovement.DMI_columns]),
+        'ADX'     : adx.values('ADX').copy(),
+        'adxStart': numpy.array(adxStart)
+    }
+
+
+class IndicatorCache:
+    """ Bar and indicator tapes of a tick record array, shared by the backtests replaying it
+        *a tape is computed once per (contract, ticksPerBar, priceType[, window]),
+         every backtest of a sweep reads it instead of rebuilding its bars and indicators
+        *tapes are kept in memory up to max_bytes, the least recently used are evicted
+        *with a directory (and the ticksDigest of the ticks) tapes are also saved
+         there, under the tick digest and source version, and loaded before computing """
+
+    def __init__(self, ticks, max_bytes=256 << 20, directory=None, digest=None):
+        self.ticks     = ticks
+        self.max_bytes = int(max_bytes)
+        self.directory = None
+        if directory and digest:
+            self.directory = os.path.join(directory, f'{digest[:16]}-{sourceVersion()[:12]}')
+            os.makedirs(self.directory, exist_ok=True)
+        self.tapes    = OrderedDict()
+        self.bytes    = 0
+        self.hits     = 0
+        self.computed = 0
+
+    def bars(self, conId, ticksPerBar, priceType='mid'):
+        return self.tape(
+            ('bars', conId, ticksPerBar, priceType),
+            lambda: barTape(self.ticks, conId, ticksPerBar, priceType)
+        )
+
+    def atr(self, conId, ticksPerBar, priceType, window):
+        return self.tape(
+            ('atr', conId, ticksPerBar, priceType, window),
+            lambda: atrTape(self.bars(conId, ticksPerBar, priceType), ticksPerBar, window)
+        )
+
+    def dm(self, conId, ticksPerBar, priceType, window):
+        return self.tape(
+            ('dm', conId, ticksPerBar, priceType, window),
+            lambda: dmTape(self.bars(conId, ticksPerBar, priceType), ticksPerBar, window)
+        )
+
+    def tape(self, key, compute) -> dict:
+        """ tape of key from memory, the directory, or compute() """
+        if key in self.tapes:
+            self.tapes.move_to_end(key)
+            self.hits += 1
+            return self.tapes[key]
+        tape = self.load(key)
+        if tape is None:
+            tape = compute()
+            self.computed += 1
+            self.save(key, tape)
+        self.tapes[key] = tape
+        self.bytes += sum(a.nbytes for a in tape.values())
+        while self.bytes > self.max_bytes and len(self.tapes) > 1:
+            _, evicted = self.tapes.popitem(last=False)
+            self.bytes -= sum(a.nbytes for a in evicted.values())
+        return tape
+
+    def path(self, key):
+        return os.path.join(self.directory, '_'.join(map(str, key)) + '.npz')
+
+    def load(self, key):
+        if self.directory is None or not os.path.exists(self.path(key)):
+            return None
+        try:
+            with numpy.load(self.path(key)) as data:
+                return {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key, tape):
+        if self.directory is None:
+            return
+        temp = f'{self.path(key)}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as file:
+            numpy.savez(file, **tape)
+        os.replace(temp, self.path(key))
+
+
+class ReplayBarBuilder(TickBarBuilder):
+    """ TickBarBuilder reading its bars from a barTape of the ticks being replayed
+        *each tick is checked against the tape's price, from the first tick that
+         differs it builds its bars itself, as a TickBarBuilder """
+
+    def __init__(self, tape, ticksPerBar, bar, ha_bar, raw, smooth, priceType='mid', moves=None):
+        super().__init__(ticksPerBar, bar, ha_bar, raw, smooth, priceType, moves)
+        self.prices    = tape['price'].tolist()
+        self.rows      = [(o, h, l, int(n), c) for o, h, l, n, c in tape['bar'].tolist()]
+        self.ha_rows   = [(c, h, l, o, int(n)) for c, h, l, o, n in tape['ha'].tolist()]
+        self.tick      = 0
+        self.replaying = not (bar or len(raw))
+
+    def update(self, tickPrice, tickTime) -> bool:
+        i = self.tick
+        if not (self.replaying and i < len(self.prices)
+                and tickPrice[self.priceType] == self.prices[i]):
+            self.replaying = False
+            return super().update(tickPrice, tickTime)
+        self.tick += 1
+        bar = self.bar
+        bar['open'], bar['high'], bar['low'], bar['ticks'], bar['close'] = self.rows[i]
+        hkbar = dict(zip(HA_COLUMNS, self.ha_rows[i]))
+        self.ha_bar.update(hkbar)
+        if bar['ticks'] == self.ticksPerBar:
+            self.raw.append(tickTime, bar)
+            self.smooth.append(tickTime, hkbar)
+            self.ha_open, self.ha_close = hkbar['open'], hkbar['close']
+            self.moves['raw'].update(bar)
+            self.moves['smooth'].update(hkbar)
+            return True
+        return False
+
+
+class ReplayATR(FormingATR):
+    """ FormingATR reading its values from an atrTape
+        *each forming bar is checked against the barTape, from the first one that
+         differs the ATR is rebuilt from the tape's bars and updated as a FormingATR
+        *only the forming value, slope and tick count are kept while replaying """
+
+    def __init__(self, window, ticksPerBar, bars, tape):
+        super().__init__(window)
+        self.ticksPerBar = ticksPerBar
+        self.rows      = [tuple(row) for row in bars['bar'].tolist()]
+        self.values    = tape['forming'].tolist()
+        self.slopes    = tape['slopes'].tolist()
+        self.replaying = True
+
+    def update(self, bar, r):
+        i = self.ticks
+        if self.replaying:
+            if (i < len(self.rows) and self.rows[i] ==
+                    (bar['open'], bar['high'], bar['low'], bar['ticks'], bar['close'])):
+                self.ticks += 1
+                self.forming, self.formingSlope = self.values[i], self.slopes[i]
+                return self.forming
+            self.replaying, self.ticks = False, 0
+            for row in self.rows[:i]:
+                super().update(dict(zip(BAR_COLUMNS, row)), row[3]/self.ticksPerBar)
+        return super().update(bar, r)
+
+
+class ReplayDirectionalMovement(DirectionalMovement):
+    """ DirectionalMovement reading the windows added before the first bar from dmTapes
+        *the other windows, and a window whose ADX is added later, are computed
+        *each closed bar is checked against the barTape, from the first one that
+         differs every window is computed, starting from its stored values """
+
+    def __init__(self, cache, conId, ticksPerBar, priceType, bars):
+        self.cache       = cache
+        self.key         = (conId, ticksPerBar, priceType)
+        self.bars        = bars
+        self.replayDMI   = {}
+        self.replayADX   = {}
+        self.tapes       = {}
+        times, rows = closedBars(cache.bars(*self.key), ticksPerBar)
+        self.closeTimes  = times.tolist()
+        self.closes      = rows[:, 4].tolist()
+        super().__init__()
+
+    def __len__(self):
+        return len(self.DMI) + len(self.replayDMI)
+
+    def _replayable(self, store):
+        return not (self.rows or len(self.bars) or len(store))
+
+    def addDMI(self, window, store):
+        if window not in self.DMI and self._replayable(store):
+            self.replayDMI[window] = store
+            tape = self.cache.dm(*self.key, window)
+            self.tapes[window] = {
+                'DMI'     : [dict(zip(self.DMI_columns, row)) for row in tape['DMI'].tolist()],
+                'ADX'     : tape['ADX'].tolist(),
+                'adxStart': int(tape['adxStart'])
+            }
+        else:
+            super().addDMI(window, store)
+
+    def removeDMI(self, window):
+        self.replayDMI.pop(window, None)
+        self.replayADX.pop(window, None)
+        super().removeDMI(window)
+
+    def addADX(self, window, store):
+        if window in self.replayDMI:
+            if self._replayable(store):
+                self.replayADX[window] = store
+                return
+            self.DMI[window] = self.replayDMI.pop(window)
+        super().addADX(window, store)
+
+    def removeADX(self, window):
+        self.replayADX.pop(window, None)
+        super().removeADX(window)
+
+    def compute(self):
+        """ Compute every replayed window from now on """
+        self.DMI.update(self.replayDMI)
+        self.ADX.update(self.replayADX)
+        self.replayDMI, self.replayADX = {}, {}
+        self._build()
+
+    def update(self, bars, barTime):
+        rows = len(bars)
+        if rows == self.rows:
+            return
+        if self.replayDMI and not (
+                rows <= len(self.closeTimes)
+                and int(bars.times[-1]) == self.closeTimes[rows - 1]
+                and bars.last('close') == self.closes[rows - 1]):
+            self.compute()
+        super().update(bars, barTime)
+        if rows <= 1:
+            return
+        for window, store in self.replayDMI.items():
+            tape = self.tapes[window]
+            store.append(barTime, tape['DMI'][rows - 2])
+            if window in self.replayADX and rows >= tape['adxStart'] > 0:
+                self.replayADX[window].append(barTime, {'ADX': tape['ADX'][rows - tape['adxStart']]})
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:10:26 2026
+"""
+
+import numpy
+
+from stores import ColumnStore
+
+
+class FormingATR:
+    """ Incremental forming/formed ATR of one (symbol, ticksPerBar, window)
+        *true ranges of the last window+1 closed bars are kept in a ring buffer
+        *a tick update is a handful of float operations, no bar lookups """
+
+    def __init__(self, window, bars=None):
+        self.window       = window
+        self.ticks        = 0
+        self.trueRanges   = [0.0]*(window + 1)
+        self.bars         = 0
+        self.prevClose    = 0.0
+        self.formed       = 0
+        self.prevFormed   = 0
+        self.forming      = 0
+        self.formingSlope = 0
+        self.formedSlope  = 0
+        if bars is not None and len(bars):
+            self.seed(bars)
+
+    def seed(self, bars):
+        """ Start from the closed bars of a BarStore """
+        n = min(len(bars), self.window + 1)
+        self.bars = len(bars) - n
+        for bars_ago in range(n, 0, -1):
+            self._addTrueRange(bars.trueRange(bars_ago))
+        self.prevClose = bars.last('close')
+
+    def _addTrueRange(self, trueRange):
+        self.trueRanges[self.bars % len(self.trueRanges)] = trueRange
+        self.bars += 1
+
+    def _trueRange(self, bars_ago):
+        return self.trueRanges[(self.bars - bars_ago) % len(self.trueRanges)]
+
+    def update(self, bar, r):
+        """ Update with the forming bar, r is the fraction of its ticks received (1.0 once closed) """
+        self.ticks += 1
+        prev_close = self.prevClose if self.bars else bar['open']
+        formingTR  = max(bar['high']-bar['low'],
+                         abs(prev_close-bar['high']),
+                         abs(prev_close-bar['low'])
+                         )
+        if r == 1.0:
+            self._addTrueRange(formingTR)
+            self.prevClose = bar['close']
+
+        if self.bars > self.window:
+            removedRange = self._trueRange(self.window + int(r))
+            newATR = self.formed + r*(formingTR - removedRange)/self.window
+        else:
+            newATR = (self.formed*self.bars + r*formingTR)/(self.bars + r)
+
+        self.forming = newATR
+        if r == 1.0:
+            self.prevFormed, self.formed = self.formed, newATR
+            self.formingSlope = self.formedSlope = self.formed - self.prevFormed
+        else:
+            self.formingSlope = (r*(self.forming - self.formed)
+                                 + (1-r)*(self.formed - self.prevFormed))
+        return newATR
+
+
+class DirectionalMovement:
+    """ Wilder smoothed TR, DM, DI and ADX of every window of one (symbol, ticksPerBar)
+        *the smoothing state of all windows is held in numpy vectors and
+         updated in one step per closed bar
+        *values are appended to a ColumnStore per window, DMI and ADX """
+
+    DMI_columns = ('STR', 'DMplus', 'DMminus', 'DIplus', 'DIminus')
+    ADX_columns = ('ADX',)
+
+    def __init__(self):
+        self.DMI  = {}
+        self.ADX  = {}
+        self.rows = 0
+        self._build()
+
+    def __len__(self):
+        return len(self.DMI)
+
+    def _build(self):
+        """ (re)build the state vectors from the last stored value of each window """
+        self.windows = list(self.DMI)
+        self.window  = numpy.array(self.windows, dtype=float)
+        self.count   = numpy.array([len(self.DMI[w]) for w in self.windows], dtype=float)
+        def last(stores, column):
+            return numpy.array([
+                stores[w].last(column) if w in stores and len(stores[w]) else 0.0
+                for w in self.windows
+            ])
+        self.smoothTR      = last(self.DMI, 'STR')
+        self.smoothDMplus  = last(self.DMI, 'DMplus')
+        self.smoothDMminus = last(self.DMI, 'DMminus')
+        self.adx      = last(self.ADX, 'ADX')
+        self.adxCount = numpy.array([len(self.ADX.get(w, ())) for w in self.windows], dtype=float)
+        self.hasADX   = numpy.array([w in self.ADX for w in self.windows], dtype=bool)
+
+    def addDMI(self, window, store):
+        self.DMI[window] = store
+        self._build()
+
+    def removeDMI(self, window):
+        self.DMI.pop(window, None)
+        self.ADX.pop(window, None)
+        self._build()
+
+    def addADX(self, window, store):
+        self.ADX[window] = store
+        self._build()
+
+    def removeADX(self, window):
+        self.ADX.pop(window, None)
+        self._build()
+
+    def smooth(self, values, new, count, window):
+        """ get_smoothed_value of every window at once, count is the number of previous values """
+        window = numpy.minimum(window, count + 1)
+        return numpy.where(count > 0, (values*(window - 1) + new)/window, new)
+
+    def update(self, bars, barTime):
+        """ Update every window with the last closed bar of a BarStore, once per bar """
+        if len(bars) == self.rows:
+            return
+        self.rows = len(bars)
+        if len(bars) <= 1 or not self.windows:
+            return
+        newTR = bars.trueRange(1)
+        DM_plus  = max(bars.last('high') - bars.last('high', 1), 0)
+        DM_minus = max(bars.last('low', 1) - bars.last('low'), 0)
+        if DM_plus > DM_minus:
+            DM_minus = 0
+        elif DM_minus > DM_plus:
+            DM_plus = 0
+        else:
+            DM_minus = DM_plus = 0
+
+        self.smoothTR      = self.smooth(self.smoothTR, newTR, self.count, self.window)
+        self.smoothDMplus  = self.smooth(self.smoothDMplus, DM_plus, self.count, self.window)
+        self.smoothDMminus = self.smooth(self.smoothDMminus, DM_minus, self.count, self.window)
+        self.count += 1
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            DI_plus  = 100*self.smoothDMplus/self.smoothTR
+            DI_minus = 100*self.smoothDMminus/self.smoothTR
+            dx = 100*numpy.abs(DI_plus - DI_minus)/numpy.abs(DI_plus + DI_minus)
+        ready = self.hasADX & (self.count >= self.window)
+        self.adx = numpy.where(ready, self.smooth(self.adx, dx, self.adxCount, self.window), self.adx)
+        self.adxCount += ready
+
+        for i, window in enumerate(self.windows):
+            self.DMI[window].append(barTime, {
+                'STR'    : self.smoothTR[i],
+                'DMplus' : self.smoothDMplus[i],
+                'DMminus': self.smoothDMminus[i],
+                'DIplus' : DI_plus[i],
+                'DIminus': DI_minus[i]
+            })
+            if ready[i]:
+                self.ADX[window].append(barTime, {'ADX': self.adx[i]})
+
+
+def ewmAlpha(com=None, span=None, halflife=None, alpha=None, **kwargs):
+    """ smoothing factor of pandas ewm decay arguments """
+    if com is not None:
+        return 1/(1 + com)
+    if span is not None:
+        return 2/(span + 1)
+    if halflife is not None:
+        return 1 - numpy.exp(-numpy.log(2)/halflife)
+    if alpha is not None:
+        return alpha
+    raise ValueError('Must pass one of com, span, halflife, or alpha')
+
+
+EWM_KWARGS = {'com', 'span', 'halflife', 'alpha', 'adjust'}
+
+
+def checkEwmKwargs(kwargs):
+    """ Raise on ewm arguments the incremental averages do not support (EWM_KWARGS only) """
+    unsupported = set(kwargs) - EWM_KWARGS
+    if unsupported:
+        raise ValueError(
+            f'unsupported ewm arguments {sorted(unsupported)}, '
+            f'incremental averages take {sorted(EWM_KWARGS)}'
+        )
+
+
+def windowedEwm(values, window=0, com=None, span=None, halflife=None, alpha=None, adjust=True):
+    """ ewm mean of the last window values at every position of a numpy array
+        *the first window-1 positions average every value so far (movingAverage seed)
+        *one convolution with the precomputed decay weights instead of an ewm per position """
+    alpha = ewmAlpha(com, span, halflife, alpha)
+    decay = 1 - alpha
+    n = len(values)
+    window = min(window, n) if window > 0 else n
+    weights = decay**numpy.arange(window)
+    count = numpy.minimum(numpy.arange(1, n + 1), window)
+    sums = numpy.convolve(values, weights)[:n]
+    if adjust:
+        average = sums/numpy.cumsum(weights)[count - 1]
+    else:
+        average = alpha*sums + decay**count*values[numpy.arange(n) - count + 1]
+    average[count == 1] = values[count == 1]
+    return average
+
+
+class MovingAverage:
+    """ Incremental ibxdata.movingAverage of one source, updated once per new value
+        *without kwargs it is the rolling mean, with ewm kwargs the windowed ewm
+        *the first window-1 values average the values seen so far (warm-up seed)
+        *a window of 0 averages the whole history
+        *kwargs outside EWM_KWARGS raise a ValueError """
+
+    def __init__(self, window=0, **kwargs):
+        checkEwmKwargs(kwargs)
+        self.window       = max(int(window), 0)
+        self.kwargs       = kwargs
+        self.count        = 0
+        self.total        = 0.0
+        self.compensation = 0.0
+        self.weight       = 0.0
+        self.value        = 0
+        if kwargs:
+            self.decay  = 1 - ewmAlpha(**kwargs)
+            self.adjust = kwargs.get('adjust', True)
+
+    def _add(self, value):
+        """ compensated (Kahan) running sum """
+        y = value - self.compensation
+        total = self.total + y
+        self.compensation = (total - self.total) - y
+        self.total = total
+
+    def update(self, values):
+        """ Average including the last of values, a numpy view of the whole source """
+        new  = values[-1]
+        full = self.window and self.count >= self.window
+        if self.kwargs:
+            self.total = self.decay*self.total + new
+            if full:
+                self.total -= self.decay**self.window*values[-1-self.window]
+            else:
+                self.count += 1
+                self.weight = self.decay*self.weight + 1
+            if self.adjust:
+                value = self.total/self.weight
+            else:
+                n = self.count
+                value = (1 - self.decay)*self.total + self.decay**n*values[-n]
+        else:
+            self._add(new)
+            if full:
+                self._add(-values[-1-self.window])
+            else:
+                self.count += 1
+            value = self.total/self.count
+        self.value = new if self.count == 1 else value
+        return self.value
+
+
+class AverageSlope:
+    """ Incremental ibxdata.averageSlope of one ColumnStore column
+        *the differences and their MovingAverage are extended with only the
+         source rows added since the last update
+        *NaN differences are skipped, as diff().dropna() does """
+
+    def __init__(self, source, column, window, **kwargs):
+        self.source  = source
+        self.column  = column
+        self.average = MovingAverage(window, **kwargs)
+        self.diffs   = ColumnStore(('diff',), capacity=256)
+        self.slopes  = ColumnStore(('slope',), capacity=256)
+        self.rows    = 0
+
+    def update(self):
+        """ Catch up with the source, O(1) per new source row """
+        values, times = self.source.values(self.column), self.source.times
+        for i in range(max(self.rows, 1), len(values)):
+            diff = values[i] - values[i-1]
+            if diff == diff:
+                self.diffs.append(times[i], {'diff': diff})
+                self.slopes.append(times[i], {'slope': self.average.update(self.diffs.values('diff'))})
+        self.rows = len(values)
+        return self.slopes
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:17:35 2026
+"""
+
+import os
+import json
+import time as t
+import datetime
+import numpy
+from ib_insync import Contract, Ticker, TickByTickBidAsk
+from ib_insync.objects import TickAttribBidAsk
+from ib_insync.util import dataclassAsDict, sleep
+
+import utils
+
+
+TICK_DTYPE = numpy.dtype([
+    ('conId'  , '<i8'),
+    ('time'   , '<i8'),
+    ('bid'    , '<f8'),
+    ('ask'    , '<f8'),
+    ('bidSize', '<f8'),
+    ('askSize', '<f8'),
+])
+TICK_MAGIC = b'DTTICKS1'    # file header, the records follow it back to back
+
+
+def readTicks(path, mmap=True) -> numpy.ndarray:
+    """ BidAsk tick records of a TickRecorder file
+        *memory-mapped read-only by default, nothing is loaded until it is read """
+    with open(path, 'rb') as file:
+        if file.read(len(TICK_MAGIC)) != TICK_MAGIC:
+            raise ValueError(f'{path} is not a tick recording')
+    size = (os.path.getsize(path) - len(TICK_MAGIC))//TICK_DTYPE.itemsize
+    if not size:
+        return numpy.empty(0, dtype=TICK_DTYPE)
+    if mmap:
+        return numpy.memmap(path, dtype=TICK_DTYPE, mode='r',
+                            offset=len(TICK_MAGIC), shape=(size,))
+    return numpy.fromfile(path, dtype=TICK_DTYPE, count=size, offset=len(TICK_MAGIC))
+
+
+def writeTicks(path, ticks, contracts=()):
+    """ Save a TICK_DTYPE record array as a recording, with its contracts if any """
+    with open(path, 'wb') as file:
+        file.write(TICK_MAGIC)
+        numpy.asarray(ticks, dtype=TICK_DTYPE).tofile(file)
+    if contracts:
+        writeContracts(path, contracts)
+
+
+def contractsPath(path):
+    return f'{path}.contracts.json'
+
+
+def writeContracts(path, contracts):
+    """ Save the contracts (with their price increment) of a recording next to it """
+    with open(contractsPath(path), 'w') as file:
+        json.dump([
+            dict(dataclassAsDict(c), increment=getattr(c, 'increment', 0))
+            for c in contracts
+        ], file, indent=1, default=str)
+
+
+def readContracts(path) -> dict:
+    """ {conId: Contract} saved with a recording, empty if there are none """
+    if not os.path.exists(contractsPath(path)):
+        return {}
+    with open(contractsPath(path)) as file:
+        details = json.load(file)
+    contracts = {}
+    for detail in details:
+        increment = detail.pop('increment')
+        contract = Contract.create(**{k: v for k, v in detail.items() if v is not None})
+        contract.increment = increment
+        contracts[contract.conId] = contract
+    return contracts
+
+
+def mergeTicks(*recordings) -> numpy.ndarray:
+    """ One time-ordered record array of several recordings, ties keep file order
+        *a single recording already in order is returned as is (still memory-mapped) """
+    if len(recordings) == 1 and not (numpy.diff(recordings[0]['time']) < 0).any():
+        return recordings[0]
+    ticks = numpy.concatenate(recordings) if recordings else numpy.empty(0, dtype=TICK_DTYPE)
+    return ticks[numpy.argsort(ticks['time'], kind='stable')]
+
+
+class TickRecorder:
+    """ Appends every BidAsk tick of the recorded contracts to a binary file
+        *listens to the TickRouter batch event, a batch is one numpy write,
+         flushed so the file holds every batch recorded so far
+        *records are fixed size TICK_DTYPE rows, read back with readTicks
+        *without conIds every routed tick is recorded
+        *contracts are saved beside the file, a backtest resolves them from it """
+
+    def __init__(self, path, conIds=None, contracts=()):
+        self.path      = path
+        self.conIds    = None if conIds is None else numpy.array(sorted(conIds), dtype='int64')
+        self.contracts = list(contracts)
+        self.ticks     = 0
+        self.file      = None
+        self.router    = None
+
+    def start(self, router):
+        """ Start recording the batches of a TickRouter """
+        new = not os.path.exists(self.path) or not os.path.getsize(self.path)
+        self.file = open(self.path, 'ab')
+        if new:
+            self.file.write(TICK_MAGIC)
+        if self.contracts:
+            saved = readContracts(self.path)
+            saved.update({c.conId: c for c in self.contracts})
+            writeContracts(self.path, saved.values())
+        self.router = router
+        self.router.batchEvent += self.record
+
+    def stop(self):
+        if self.router is not None:
+            self.router.batchEvent -= self.record
+            self.router = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def record(self, batch):
+        if not len(batch):
+            return
+        keep = slice(None) if self.conIds is None else numpy.isin(batch.conId, self.conIds)
+        records = numpy.empty(batch.conId[keep].size, dtype=TICK_DTYPE)
+        records['conId']   = batch.conId[keep]
+        records['time']    = batch.time[keep]
+        records['bid']     = batch.bid[keep]
+        records['ask']     = batch.ask[keep]
+        records['bidSize'] = batch.bidSize[keep]
+        records['askSize'] = batch.askSize[keep]
+        records.tofile(self.file)
+        self.file.flush()
+        self.ticks += records.size
+
+
+class TickReplay:
+    """ Feeds recorded ticks to an IB instance through pendingTickersEvent
+        *ticks sharing a timestamp are emitted as one batch, one Ticker per contract
+        *speed 1 replays in real time, N at N times real time, 0 as fast as possible
+        *no connection is needed, the ticks take the same path as live ticks
+        *a cursor keeps the position, replay(stop) continues from the last tick
+        *halt() from a tick handler ends the replay after the current batch """
+
+    def __init__(self, ib, *paths, speed=0, contracts=(), ticks=None):
+        self.ib        = ib
+        self.speed     = float(speed)
+        recordings     = [readTicks(path) for path in paths]
+        self.ticks     = mergeTicks(*recordings, *([] if ticks is None else [ticks]))
+        self.contracts = {c.conId: c for c in contracts}
+        self.cursor    = 0
+        self.elapsed   = 0.0
+        self.halted    = False
+
+    def __len__(self):
+        return self.ticks.size
+
+    @property
+    def done(self):
+        return self.cursor >= self.ticks.size
+
+    @property
+    def startTime(self):
+        """ ns time of the first tick, None without ticks """
+        return int(self.ticks['time'][0]) if self.ticks.size else None
+
+    def halt(self):
+        """ Stop replaying, later replay calls return without emitting """
+        self.halted = True
+
+    def contract(self, conId):
+        if conId not in self.contracts:
+            self.contracts[conId] = Contract(conId=conId)
+        return self.contracts[conId]
+
+    @staticmethod
+    def tickTime(time) -> datetime.datetime:
+        """ tz-aware datetime of int64 ns, the inverse of utils.getTimestamp """
+        return utils.EPOCH_UTC + datetime.timedelta(microseconds=int(time)//1000)
+
+    def batches(self, start, stop):
+        """ (tickTime ns, Tickers) of every distinct tick time of ticks[start:stop]
+            *the Tickers of a batch are in the order of their first tick """
+        ticks = self.ticks[start:stop]
+        if not ticks.size:
+            return
+        bounds = numpy.flatnonzero(numpy.diff(ticks['time'])) + 1
+        attrib = TickAttribBidAsk()
+        for i, j in zip(numpy.r_[0, bounds], numpy.r_[bounds, ticks.size]):
+            block = ticks[i:j].tolist()
+            time  = self.tickTime(block[0][1])
+            tickers = {}
+            for conId, _, bid, ask, bidSize, askSize in block:
+                if conId not in tickers:
+                    tickers[conId] = Ticker(contract=self.contract(conId), time=time, tickByTicks=[])
+                tickers[conId].tickByTicks.append(
+                    TickByTickBidAsk(time, bid, ask, bidSize, askSize, attrib)
+                )
+            yield block[0][1], list(tickers.values())
+
+    def seek(self, time):
+        """ Move the cursor to the first tick at or after time (ns) """
+        self.cursor = int(numpy.searchsorted(self.ticks['time'], time, side='left'))
+
+    def replay(self, stop=None):
+        """ Emit the ticks from the cursor up to (not including) time stop (ns)
+            *returns the number of ticks replayed """
+        end = self.ticks.size if stop is None else int(
+            numpy.searchsorted(self.ticks['time'], stop, side='left')
+        )
+        start, began, first = self.cursor, t.perf_counter(), None
+        if self.halted:
+            return 0
+        for time, tickers in self.batches(start, end):
+            if self.speed > 0:
+                first = time if first is None else first
+                delay = (time - first)/1e9/self.speed - (t.perf_counter() - began)
+                if delay > 0:
+                    sleep(delay)
+            self.ib.pendingTickersEvent.emit(tickers)
+            if self.halted:
+                end = int(numpy.searchsorted(self.ticks['time'], time, side='right'))
+                break
+        self.cursor = max(end, start)
+        self.elapsed += t.perf_counter() - began
+        return self.cursor - start
+
+    def run(self, start=None, stop=None):
+        """ Replay the ticks with start <= tick time < stop (datetimes or ns)
+            *returns the number of ticks replayed """
+        start = utils.getTimestamp(start) if isinstance(start, datetime.datetime) else start
+        stop  = utils.getTimestamp(stop) if isinstance(stop, datetime.datetime) else stop
+        if start is not None:
+            self.seek(start)
+        return self.replay(stop)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:41:27 2026
+"""
+
+import os
+import glob
+import json
+import pickle
+import hashlib
+
+from recording import contractsPath
+
+
+_digests = {}    # (realpath, size, mtime) -> digest of a file already hashed
+
+
+def fileDigest(path) -> str:
+    """ sha256 of a file's content, remembered until the file changes """
+    stat = os.stat(path)
+    stamp = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    if stamp not in _digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        _digests[stamp] = digest.hexdigest()
+    return _digests[stamp]
+
+
+def ticksDigest(paths) -> str:
+    """ digest of the content of tick recordings and their contracts, in the order given """
+    digests = []
+    for path in paths:
+        digests.append(fileDigest(path))
+        if os.path.exists(contractsPath(path)):
+            digests.append(fileDigest(contractsPath(path)))
+    return hashlib.sha256(' '.join(digests).encode()).hexdigest()
+
+
+def sourceVersion(directory=os.path.dirname(os.path.abspath(__file__))) -> str:
+    """ digest of every .py file of the project source, any code change gives a new version """
+    return hashlib.sha256(' '.join(
+        fileDigest(path) for path in sorted(glob.glob(os.path.join(directory, '*.py')))
+    ).encode()).hexdigest()
+
+
+class ReplayCache:
+    """ Results of backtest replays on disk, one file per replay
+        *entries are addressed by the digest of the tick data, the strategy class,
+         the algo config, the replay options and the source version, so a replay
+         of changed code or data never hits an older entry
+        *file names start with the strategy class and source version, invalidate
+         removes a strategy's entries or those of older sources
+        *reads refresh an entry's mtime, the least recently used entries are
+         removed once the cache is larger than max_bytes
+        *entries are written to a temporary file and renamed, so processes of a
+         sweep can share one cache """
+
+    def __init__(self, directory='cache', max_bytes=1 << 30, source=None):
+        self.directory = directory
+        self.max_bytes = int(max_bytes)
+        self.source    = source or sourceVersion()
+        self.hits      = 0
+        self.misses    = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, ticks, strategy, config, options={}) -> str:
+        """ file name of the replay of strategy (class) with an algo config on ticks (ticksDigest)
+            *the key only needs the class, it is known before the strategy is built """
+        digest = hashlib.sha256(json.dumps({
+            'ticks'   : ticks,
+            'strategy': f'{strategy.__module__}.{strategy.__qualname__}',
+            'config'  : config,
+            'options' : options,
+            'source'  : self.source
+        }, sort_keys=True, default=str).encode()).hexdigest()
+        return f'{strategy.__name__}-{self.source[:12]}-{digest}.pkl'
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        """ {'summary': row, 'log': DataFrame or None} of key, None if it is not cached """
+        try:
+            with open(self.path(key), 'rb') as file:
+                entry = pickle.load(file)
+            os.utime(self.path(key))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, summary, log=None):
+        temp = self.path(f'{key}.{os.getpid()}.tmp')
+        with open(temp, 'wb') as file:
+            pickle.dump({'summary': summary, 'log': log}, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, self.path(key))
+        self.evict()
+
+    def entries(self, pattern='*.pkl') -> list:
+        """ (mtime, size, path) of the cached files matching pattern, least recent first """
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, pattern)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """ Remove the least recently used entries until the cache fits max_bytes """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def invalidate(self, strategy=None, stale=False) -> int:
+        """ Remove the entries of strategy (class or name), every entry without one
+            *stale only removes the entries of other source versions
+            *returns the number of entries removed """
+        name = getattr(strategy, '__name__', strategy) or '*'
+        removed = 0
+        for _, _, path in self.entries(f'{name}-*.pkl'):
+            if stale and os.path.basename(path).split('-')[1] == self.source[:12]:
+                continue
+            removed += self._remove(path)
+        return removed
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:03:52 2026
+"""
+
+import numpy
+from pandas import Series, DataFrame, DatetimeIndex
+
+
+class ColumnStore:
+    """ Struct-of-arrays time series backed by preallocated numpy buffers
+        *grows by doubling, so appending is amortized O(1)
+        *with maxlen set it only retains the last maxlen rows (ring buffer)
+        *column views are zero-copy, DataFrames are only built on demand """
+
+    columns = ()
+
+    def __init__(self, columns=(), capacity=1024, maxlen=0):
+        self.columns  = tuple(columns or self.columns)
+        self.maxlen   = int(maxlen)
+        capacity      = max(int(capacity), 2*self.maxlen, 1)
+        self._time    = numpy.empty(capacity, dtype='int64')
+        self._data    = {c: numpy.empty(capacity) for c in self.columns}
+        self._start   = 0
+        self._stop    = 0
+        self._frame   = None
+        self._version = 0
+
+    def __len__(self):
+        return self._stop - self._start
+
+    @property
+    def empty(self):
+        return self._stop == self._start
+
+    def _reserve(self, n):
+        """ make room for n more rows at the end of the buffers """
+        if self._stop + n <= self._time.size:
+            return
+        size = len(self)
+        capacity = self._time.size
+        if not (self.maxlen and size + n <= capacity//2):
+            capacity = max(2*capacity, 2*(size + n))
+        buffers = [self._time] + [self._data[c] for c in self.columns]
+        moved = [
+            numpy.empty(capacity, dtype=b.dtype) if capacity != b.size else b
+            for b in buffers
+        ]
+        for new, old in zip(moved, buffers):
+            new[:size] = old[self._start:self._stop]
+        self._time = moved[0]
+        self._data = dict(zip(self.columns, moved[1:]))
+        self._start, self._stop = 0, size
+
+    def _trim(self):
+        if self.maxlen and len(self) > self.maxlen:
+            self._start = self._stop - self.maxlen
+
+    def append(self, time, row):
+        """ Add one row: time as int64 ns or datetime64[ns], row as {column: value} """
+        self._reserve(1)
+        i = self._stop
+        self._time[i] = time
+        for c in self.columns:
+            self._data[c][i] = row[c]
+        self._stop += 1
+        self._version += 1
+        self._trim()
+
+    def extend(self, times, **columns):
+        """ Add a block of rows from int64 ns times and one array per column """
+        n = len(times)
+        if not n:
+            return
+        self._reserve(n)
+        i, j = self._stop, self._stop + n
+        self._time[i:j] = times
+        for c in self.columns:
+            self._data[c][i:j] = columns[c]
+        self._stop = j
+        self._version += 1
+        self._trim()
+
+    @property
+    def times(self):
+        """ zero-copy int64 ns view of the retained times """
+        return self._time[self._start:self._stop]
+
+    @property
+    def index(self):
+        return DatetimeIndex(self.times.view('datetime64[ns]'))
+
+    def values(self, column):
+        """ zero-copy view of the retained values of column """
+        return self._data[column][self._start:self._stop]
+
+    def _lastRow(self, steps_back):
+        if not 0 <= steps_back < len(self):
+            raise IndexError(f'{steps_back} steps back is out of bounds for {len(self)} rows')
+        return self._stop - 1 - steps_back
+
+    def last(self, column, steps_back=0):
+        return self._data[column][self._lastRow(steps_back)]
+
+    def lastTime(self, steps_back=0):
+        return self._time[self._lastRow(steps_back)].view('datetime64[ns]')
+
+    def lastRow(self, steps_back=0):
+        """ {column: value} of one row, steps_back rows before the last """
+        i = self._lastRow(steps_back)
+        return {c: self._data[c][i] for c in self.columns}
+
+    def series(self, column):
+        return Series(self.values(column), index=self.index, name=column, copy=False)
+
+    def frame(self):
+        """ DataFrame of the retained rows, rebuilt only after new rows arrive
+            *keyed on an append counter, since compaction reuses (start, stop) """
+        if self._frame is None or self._frame[0] != self._version:
+            self._frame = (self._version, DataFrame(
+                {c: self.values(c) for c in self.columns},
+                index=self.index
+            ))
+        return self._frame[1]
+
+
+class Retention:
+    """ Which per-tick values of a forming indicator are stored
+        *maxlen      : only the last maxlen values are retained (0 keeps them all)
+        *every       : only every k-th tick is stored, bar closes are always stored
+        *closes_only : only the values at bar close are stored """
+
+    def __init__(self, maxlen=0, every=1, closes_only=False):
+        self.maxlen      = int(maxlen)
+        self.every       = max(int(every), 1)
+        self.closes_only = bool(closes_only)
+
+    def store(self, columns=()):
+        return ColumnStore(columns, maxlen=self.maxlen)
+
+    def keep(self, tick, closed=False):
+        """ Whether the value of the tick-th tick (counting from 1) is stored """
+        return closed or not (self.closes_only or tick % self.every)
+
+
+class TickStore(ColumnStore):
+    """ ask, bid and mid price of every tick of a contract """
+
+    columns = ('ask', 'bid', 'mid')
+
+
+class BarStore(ColumnStore):
+    """ OHLC tick bars with O(1) scalar access to the latest bars """
+
+    columns = ('open', 'high', 'low', 'close', 'ticks')
+
+    def __init__(self, columns=(), capacity=256, maxlen=0):
+        super().__init__(columns, capacity=capacity, maxlen=maxlen)
+
+    def lastBar(self, steps_back=0):
+        return self.lastRow(steps_back)
+
+    def trueRange(self, bars_ago=1):
+        """ candles.trueRange read straight from the buffers """
+        bars_ago = min(bars_ago, len(self))
+        high = self.last('high', bars_ago - 1)
+        low  = self.last('low', bars_ago - 1)
+        if bars_ago < len(self):
+            prev_close = self.last('close', bars_ago)
+        else:
+            prev_close = self.last('open', bars_ago - 1)
+        return max(high-low, abs(high-prev_close), abs(prev_close-low))
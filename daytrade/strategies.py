@@ -11,10 +11,13 @@ from strategy import logTrigger
 from strategyxdata import ADXStrategy, SignalBarStrategy, FormingATRStrategy, FlagStrategy
 from strategyxorders import BasicBracketStrategy, TTTSStrategy, MarketBracketStrategy
 
-def get_strategy(class_name: str, *args, **kwargs):
+def get_strategy_class(class_name: str):
     return utils.getModuleClasses(
         sys.modules[__name__]
-    )[class_name](*args, **kwargs)
+    )[class_name]
+
+def get_strategy(class_name: str, *args, **kwargs):
+    return get_strategy_class(class_name)(*args, **kwargs)
 
 sign = lambda b: b*2 - 1
 
@@ -40,8 +43,8 @@ class Scalping(SignalBarStrategy, BasicBracketStrategy, FlagStrategy):
             self.long_term_ma, complete=True
         )
         adx_slope_filename = f'ADXslope_{self.contract.symbol}_{self.ticksPerBar}tpb_adxWindow{self.long_term_ma}_slopeWindow{2}'
-        self.ib._data_streams[adx_slope_filename] = lambda: self.ib.averageSlope(
-            self.ib.tickBars[self.contract.symbol][self.ticksPerBar]['ADX'][self.ATR_window], 2,
+        self.ib._data_streams[adx_slope_filename] = lambda: self.ib.getADX_slope(
+            self.contract, self.ticksPerBar, self.ATR_window, 2,
             complete=True,
             alpha=self.ADX_slope_alpha
         )
@@ -53,6 +56,13 @@ class Scalping(SignalBarStrategy, BasicBracketStrategy, FlagStrategy):
     
     def add_data_reqs(self):
         super().add_data_reqs()
+        for window in (self.short_term_ma, self.long_term_ma):
+            self.ib.addMovingAverage(self.contract, self.ticksPerBar, window)
+        self.ib.addMovingAverageSlope(self.contract, self.ticksPerBar, self.short_term_ma, 1)
+        self.ib.addADX_slope(
+            self.contract, self.ticksPerBar, self.ATR_window, self.ADX_slope_window,
+            alpha=self.ADX_slope_alpha
+        )
         self.ib.addATR(
             contract=self.contract,
             ticksPerBar = self.ticksPerBar,
@@ -64,10 +74,30 @@ class Scalping(SignalBarStrategy, BasicBracketStrategy, FlagStrategy):
             window = self.ATR_window
         )
     
+    def remove_data_reqs(self):
+        self.ib.removeADX(
+            contract=self.contract,
+            ticksPerBar = self.ticksPerBar,
+            window = self.ATR_window
+        )
+        self.ib.removeATR(
+            contract=self.contract,
+            ticksPerBar = self.ticksPerBar,
+            window = self.ATR_window
+        )
+        self.ib.removeADX_slope(
+            self.contract, self.ticksPerBar, self.ATR_window, self.ADX_slope_window,
+            alpha=self.ADX_slope_alpha
+        )
+        self.ib.removeMovingAverageSlope(self.contract, self.ticksPerBar, self.short_term_ma, 1)
+        for window in (self.short_term_ma, self.long_term_ma):
+            self.ib.removeMovingAverage(self.contract, self.ticksPerBar, window)
+        super().remove_data_reqs()
+    
     
     def exit(self):
         self.resetExposure()
-        self.ib.pendingTickersEvent -= self.newTicksEvent
+        self.ib.unsubscribeTicks(self.contract, self.newTicksEvent)
     
     @logTrigger
     def checkEntryFailure(self, tickPrice, long):
@@ -111,7 +141,7 @@ class Scalping(SignalBarStrategy, BasicBracketStrategy, FlagStrategy):
                             long,
                             **self.setOrderDetails(signal_bar, long)
                         )
-                        self.ib.pendingTickersEvent += self.newTicksEvent
+                        self.ib.subscribeTicks(self.contract, self.newTicksEvent)
                     else:
                         self.action = None
             elif any(order.orderId == self.entryOrder.orderId 
@@ -122,21 +152,16 @@ class Scalping(SignalBarStrategy, BasicBracketStrategy, FlagStrategy):
         return scalpingNewBarUpdate(contract, ticksPerBar)
 
     
-    def newTicksEvent(self, tickers):
-        
-        @self.ib.tickersEvent(self.contract)
-        def scalpingNewTickRun(tickPrice, tickTime):
-            if any(order.orderId == self.entryOrder.orderId 
-                       for order in self.openOrders()):
-                tickPrice  = tickPrice['mid']
-                long: bool = self.action == 'BUY'
-                failureHit = self.checkEntryFailure(tickPrice, long)
-                if self.flagsTriggered or failureHit:
-                    self.exit()
-            else:
-                 self.exit()
-        
-        return scalpingNewTickRun(tickers)
+    def newTicksEvent(self, tickPrice, tickTime):
+        if any(order.orderId == self.entryOrder.orderId 
+                   for order in self.openOrders()):
+            tickPrice  = tickPrice['mid']
+            long: bool = self.action == 'BUY'
+            failureHit = self.checkEntryFailure(tickPrice, long)
+            if self.flagsTriggered or failureHit:
+                self.exit()
+        else:
+             self.exit()
         
 
 #//////////////////////////////////////////////////////////////////////////////
@@ -207,7 +232,7 @@ class TrendScalping(ADXStrategy, BasicBracketStrategy):
             if not self.open:
                 shouldEnter, long = self.shouldEnter
                 if shouldEnter and not self.entry_blocked:
-                    bar = self.ha_bars.iloc[-1]
+                    bar = self.indicator('ha_bar')
                     self.submit_entry_order(
                         long,
                         **self.setOrderDetails(bar, long)
@@ -251,20 +276,15 @@ class Spiking(FormingATRStrategy, MarketBracketStrategy):
             'stopLossPrice'   : self.round(tickPrice - scale*self.loss_buffer, up=long)
         }
     
-    def newTicksEvent(self, tickers):
-        
-        @self.ib.tickersEvent(self.contract)
-        def spikingNewTicksRun(tickPrice, tickTime):
-            tickPrice = tickPrice['mid']
-            self.calibrateStatus()
-            if not self.open:
-                shouldEnter, long = self.shouldEnter
-                if shouldEnter and not self.entry_blocked:
-                    self.submit_entry_order(
-                        long,
-                        **self.setOrderDetails(tickPrice, long)
-                    )
-        
-        return spikingNewTicksRun(tickers)
+    def newTicksEvent(self, tickPrice, tickTime):
+        tickPrice = tickPrice['mid']
+        self.calibrateStatus()
+        if not self.open:
+            shouldEnter, long = self.shouldEnter
+            if shouldEnter and not self.entry_blocked:
+                self.submit_entry_order(
+                    long,
+                    **self.setOrderDetails(tickPrice, long)
+                )
 
 #//////////////////////////////////////////////////////////////////////////////
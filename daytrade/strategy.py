@@ -7,7 +7,6 @@ Created on Tue Aug  4 10:54:45 2020
 
 from pandas import Series, DataFrame
 from decimal import Decimal, ROUND_HALF_UP, ROUND_HALF_DOWN
-import time as t
 
 import utils
 import eventkit
@@ -89,7 +88,7 @@ class Strategy:
     
     def stop_entry(self):
         self.entry_blocked = True
-        self.wait_start = t.time()
+        self.wait_start = utils.getTime()
     
     
     def placeOrder(self, contract, order):
@@ -315,7 +314,7 @@ class SingleContractStrategy(Strategy):
     
     def close_if_time(self):
         if ((self.wait_time >= 0) 
-            and (t.time() > self.wait_time + self.wait_start)):
+            and (utils.getTime() > self.wait_time + self.wait_start)):
             self.resetExposure()
     
     
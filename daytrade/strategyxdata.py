@@ -15,10 +15,10 @@ class TickStrategy(strategy.SingleContractStrategy):
     
     def start(self):
         self.active = True
-        self.ib.pendingTickersEvent += self.newTicksEvent
+        self.ib.subscribeTicks(self.contract, self.newTicksEvent)
     
     def stop(self):
-        self.ib.pendingTickersEvent -= self.newTicksEvent
+        self.ib.unsubscribeTicks(self.contract, self.newTicksEvent)
         self.active = False
 
 
@@ -42,6 +42,12 @@ class BarStrategy(strategy.SingleContractStrategy):
             ticksPerBar = self.ticksPerBar
         )
     
+    def remove_data_reqs(self):
+        self.ib.removeTickBars(
+            contract = self.contract,
+            ticksPerBar = self.ticksPerBar
+        )
+    
     def start(self):
         self.active = True
         self.ib.newTickBarEvent += self._logNewTickBarEvent
@@ -54,22 +60,38 @@ class BarStrategy(strategy.SingleContractStrategy):
         self.active = False
     
     @property
-    def bars(self):
+    def raw_store(self):
         return self.ib.tickBars[self.contract.symbol][self.ticksPerBar]['raw']
     
+    @property
+    def ha_store(self):
+        return self.ib.tickBars[self.contract.symbol][self.ticksPerBar]['smooth']
+    
+    @property
+    def ha_moves(self):
+        return self.ib.tickBars[self.contract.symbol][self.ticksPerBar]['moves']['smooth']
+    
+    @property
+    def bars(self):
+        return self.raw_store.frame()
+    
     @property
     def current_bar(self):
         return self.ib.currentBar[self.contract.symbol][self.ticksPerBar]['raw']
     
     @property
     def ha_bars(self):
-        return self.ib.tickBars[self.contract.symbol][self.ticksPerBar]['smooth']
+        return self.ha_store.frame()
     
     @property
     def current_ha_bar(self):
         return self.ib.currentBar[self.contract.symbol][self.ticksPerBar]['smooth']
     
     
+    def indicator(self, name):
+        """ cached value of a bar graph indicator for the last closed bar """
+        return self.ib.indicator(self.contract, self.ticksPerBar, name)
+    
     def getBarData(self, *args):
         data = self.ib.tickBars[self.contract.symbol][self.ticksPerBar]
         for arg in args:
@@ -78,18 +100,20 @@ class BarStrategy(strategy.SingleContractStrategy):
     
     @strategy.logEvent
     def _logNewTickBarEvent(self, *args, **kwargs):
+        bar    = self.indicator('bar')
+        ha_bar = self.indicator('ha_bar')
         return {
             'Event'    : 'New Bar',
-            'color'    : candles.getColor(self.bars),
-            'ha_color' : candles.getColor(self.ha_bars),
-            'open'     : self.bars.iloc[-1]['open'],
-            'close'    : self.bars.iloc[-1]['close'],
-            'high'     : self.bars.iloc[-1]['high'],
-            'low'      : self.bars.iloc[-1]['low'],
-            'ha_open'  : self.ha_bars.iloc[-1]['open'],
-            'ha_close' : self.ha_bars.iloc[-1]['close'],
-            'ha_high'  : self.ha_bars.iloc[-1]['high'],
-            'ha_low'   : self.ha_bars.iloc[-1]['low']
+            'color'    : self.indicator('color'),
+            'ha_color' : self.indicator('ha_color'),
+            'open'     : bar['open'],
+            'close'    : bar['close'],
+            'high'     : bar['high'],
+            'low'      : bar['low'],
+            'ha_open'  : ha_bar['open'],
+            'ha_close' : ha_bar['close'],
+            'ha_high'  : ha_bar['high'],
+            'ha_low'   : ha_bar['low']
         }
 
 
@@ -123,6 +147,13 @@ class FormingATRStrategy(TickStrategy):
             ticksPerBar = self.ticksPerBar,
             ATR_windows = [self.window]
         )
+    
+    def remove_data_reqs(self):
+        self.ib.removeTickBars(
+            contract = self.contract,
+            ticksPerBar = self.ticksPerBar,
+            ATR_windows = [self.window]
+        )
         
     @property
     def shouldEnter(self):
@@ -132,7 +163,7 @@ class FormingATRStrategy(TickStrategy):
         tickBars = self.ib.tickBars[symbol][ticksPerBar]
         ATR_forming = self.ib.getFormingATR(self.contract, ticksPerBar, window)
         ATR_slope = self.ib.getFormingATR_slope(self.contract, ticksPerBar, window)
-        move_status = candles.moveStatus(tickBars['smooth'])
+        move_status = candles.moveStatus(tickBars['moves']['smooth'])
         should_enter = (
             (ATR_forming > self.ATR_thresh) 
             and (ATR_slope > self.ATR_slope_thresh) 
@@ -155,8 +186,8 @@ class ADXStrategy(BarStrategy):
         self.slope_window = int(slope_window)
         self.adx_threshold = float(adx_threshold)
         adx_slope_filename = f'ADXslope_{self.contract.symbol}_{self.ticksPerBar}tpb_adxWindow{window}_slopeWindow{slope_window}'
-        self.ib._data_streams[adx_slope_filename] = lambda: self.ib.averageSlope(
-            self.getBarData('ADX', self.window), self.slope_window,
+        self.ib._data_streams[adx_slope_filename] = lambda: self.ib.getADX_slope(
+            self.contract, self.ticksPerBar, self.window, self.slope_window,
             complete=True
         )
         self.adx_data = {}
@@ -182,11 +213,21 @@ class ADXStrategy(BarStrategy):
     
     def add_data_reqs(self):
         BarStrategy.add_data_reqs(self)
-        self.ib.addADX(
+        self.ib.addADX_slope(
+            contract=self.contract,
+            ticksPerBar = self.ticksPerBar,
+            window = self.window,
+            slope_window = self.slope_window
+        )
+    
+    def remove_data_reqs(self):
+        self.ib.removeADX_slope(
             contract=self.contract,
             ticksPerBar = self.ticksPerBar,
-            window = self.window
+            window = self.window,
+            slope_window = self.slope_window
         )
+        BarStrategy.remove_data_reqs(self)
     
     def ADXEvent(self, *args, **kwargs):
         self.adx_data = self.getADXData()
@@ -194,14 +235,13 @@ class ADXStrategy(BarStrategy):
     
     def getADXData(self):
         # get indicator values
-        adx = self.getBarData('ADX', self.window)
-        adx_now = adx.iloc[-1] if adx.size else 0
-        adx_slope = self.ib.averageSlope(
-        adx, self.slope_window
+        adx_now = self.indicator(('ADX', self.window)) or 0
+        adx_slope = self.ib.getADX_slope(
+        self.contract, self.ticksPerBar, self.window, self.slope_window
         )#alpha=self.ADX_slope_alpha)
-        dmi = self.getBarData('DMI', self.window, 'DI')
-        dmi_plus = dmi['plus'].iloc[-1] if dmi['plus'].size else 0
-        dmi_minus = dmi['minus'].iloc[-1] if dmi['minus'].size else 0
+        dmi = self.indicator(('DMI', self.window)) or {}
+        dmi_plus = dmi.get('DIplus', 0)
+        dmi_minus = dmi.get('DIminus', 0)
         return {
             'ADX' : adx_now, 
             'ADX Slope' : adx_slope, 
@@ -220,7 +260,7 @@ class ADXStrategy(BarStrategy):
         equal_dmi = dmi_plus == dmi_minus
         long = dmi_plus > dmi_minus != self.flip
         goodColor = (
-            (candles.getColor(self.ha_bars) == 'green') 
+            (self.indicator('ha_color') == 'green') 
             == (dmi_plus > dmi_minus)
         )
         is_valid_entry = valid_adx and (not equal_dmi) and goodColor
@@ -228,8 +268,8 @@ class ADXStrategy(BarStrategy):
 
     @property
     def shouldExit(self):
-        return self.ib.averageSlope(
-            self.getBarData('ADX', self.window),
+        return self.ib.getADX_slope(
+            self.contract, self.ticksPerBar, self.window,
             self.slope_window
         ) <= 0
     
@@ -258,9 +298,9 @@ class SignalBarStrategy(BarStrategy):
         return super().getInputs(inputs)
     
     def getSignalBar(self):
-        bar = self.ha_bars.iloc[-1]
+        bar = self.indicator('ha_bar')
         is_signalBar, bar_color = candles.isSignalBar(
-                self.ha_bars,
+                self.ha_moves,
                 current_move_size = None,
                 thresh = self.signal_thresh
             )
@@ -309,11 +349,11 @@ def ADX_flag(strat):
     ticksPerBar   = strat.ticksPerBar
     window        = strat.ATR_window
     ADX_threshold = strat.ADX_threshold
-    if not strat.ib.tickBars[symbol][ticksPerBar]['ADX'][window].size:
+    if not len(strat.ib.tickBars[symbol][ticksPerBar]['ADX'][window]):
         ADX = None
         isTriggered = True
     else:
-        ADX = strat.ib.tickBars[symbol][ticksPerBar]['ADX'][window].iloc[-1]
+        ADX = strat.ib.getADX(strat.contract, ticksPerBar, window)
         if strat.ignore_ADX:
             isTriggered = False
         else:
@@ -339,12 +379,12 @@ def ADX_slope_flag(strat):
     alpha        = strat.ADX_slope_alpha
     adx = strat.ib.tickBars[symbol][ticksPerBar]['ADX'][window]
     
-    if adx.size < 2:
+    if len(adx) < 2:
         ADX_slope   = None
         isTriggered = True
     else:
-        ADX_slope = strat.ib.averageSlope(
-            adx, slope_window,
+        ADX_slope = strat.ib.getADX_slope(
+            strat.contract, ticksPerBar, window, slope_window,
             alpha=strat.ADX_slope_alpha
         )
         if strat.ignore_ADX_slope:
@@ -369,8 +409,8 @@ def DMI_flag(strat):
     symbol        = strat.contract.symbol
     ticksPerBar   = strat.ticksPerBar
     window        = strat.ATR_window
-    plus_DMI = strat.ib.tickBars[symbol][ticksPerBar]['DMI'][window]['DI']['plus'].iloc[-1]
-    minus_DMI = strat.ib.tickBars[symbol][ticksPerBar]['DMI'][window]['DI']['minus'].iloc[-1]
+    plus_DMI = strat.ib.getDMI_values(strat.contract, ticksPerBar, window, 'DIplus')
+    minus_DMI = strat.ib.getDMI_values(strat.contract, ticksPerBar, window, 'DIminus')
     if strat.ignore_DMI:
         isTriggered = False
     else:
@@ -395,7 +435,12 @@ def movingAvg_flags(strat):
         complete=True
     )
     old_short_ma, new_short_ma = short_ma.values[-2:]
-    short_slope = strat.ib.averageSlope(short_ma, 1)
+    short_slope = strat.ib.tickBarMovingAverageSlope(
+        strat.contract,
+        strat.ticksPerBar,
+        strat.short_term_ma,
+        1
+    )
     
     @strategy.logTrigger
     def flatMA(strat):
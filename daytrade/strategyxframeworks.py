@@ -13,6 +13,7 @@ import eventkit
 import utils
 from strategies import get_strategy
 from strategy import logEvent
+from recording import TickRecorder
 
 
 def get_framework(framework, *args, **kwargs):
@@ -26,8 +27,13 @@ class StrategyManager:
     
     framework = 'base'
     
-    def __init__(self, ib, *strategy_files, logging=True, sleep_time=1, **kwargs):
+    def __init__(self, ib, *strategy_files, logging=True, sleep_time=1, record_ticks='', **kwargs):
         
+        if record_ticks and getattr(ib, 'replay', None) is not None:
+            raise ValueError(
+                f'record_ticks ({record_ticks}) must be empty in a backtest, '
+                'the replayed ticks would be appended to it'
+            )
         self.ib = ib
         self.strategy_files = strategy_files
         self.contracts = {}
@@ -37,6 +43,8 @@ class StrategyManager:
         self.name = 'manager'
         self.ticksPerEvent = []
         self.sleep_time = sleep_time
+        self.record_ticks = record_ticks
+        self.recorder = None
         
         self._logging = logging
         if logging:
@@ -79,12 +87,19 @@ class StrategyManager:
 
 
     def loadStrategy(self, file, strategy_id=0):
-        strategy_params = utils.readConfig(file)
+        return self.newStrategy(
+            file.split('algos/')[-1].split('.ini')[0],
+            utils.readConfig(file)
+        )
+    
+    def newStrategy(self, name, strategy_params):
+        """ Strategy of an algo config {'strategy', 'contract', **parameters} """
+        strategy_params = dict(strategy_params)
         strategy_name = strategy_params.pop('strategy')
         symbol = strategy_params.pop('contract')
         strategy = get_strategy(
             strategy_name,
-            name=file.split('algos/')[-1].split('.ini')[0],
+            name=name,
             ib=self.ib,
             manager=self,
             logging=self._logging,
@@ -97,13 +112,34 @@ class StrategyManager:
     
     def stopStremaing(self):
         self.ib.cancelPnL(self.account)
-        for contract in self.contracts.values():
-            self.ib.cancelLiveTicks(contract)
+        for s in self.strategies:
+            self.ib.cancelLiveTicks(s.contract)
+        self.stopRecording()
     
     def startStreaming(self):
+        self.startRecording()
         self.ib.reqPnL(self.account)
-        for contract in self.contracts.values():
-            self.ib.reqLiveTicks(contract)
+        for s in self.strategies:
+            self.ib.reqLiveTicks(s.contract)
+    
+    def startRecording(self):
+        """ Record the ticks of the strategies' contracts to record_ticks, if set """
+        if self.record_ticks and self.recorder is None:
+            self.recorder = TickRecorder(
+                self.record_ticks, 
+                conIds={s.contract.conId for s in self.strategies},
+                contracts=self.contracts.values()
+            )
+            self.recorder.start(self.ib.tickRouter)
+    
+    def stopRecording(self):
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+    
+    def removeDataReqs(self):
+        for s in self.strategies:
+            s.remove_data_reqs()
     
     def start_strategies(self, *strategies):
         strategies = strategies or self.strategies
@@ -147,6 +183,7 @@ class StrategyManager:
         self.ib.sleep(revtime)
         self.runStrategies(runtime)
         self.stopStremaing()
+        self.removeDataReqs()
     
     
     def getPosition(self, contract):
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:02:31 2026
+"""
+
+
+class Subscriptions:
+    """ Reference counts of shared data requests
+        *the first acquire of a key should set the data up
+        *the last release of a key should tear it down """
+
+    def __init__(self):
+        self.counts = {}
+
+    def __contains__(self, key):
+        return key in self.counts
+
+    def count(self, key):
+        return self.counts.get(key, 0)
+
+    def acquire(self, key) -> bool:
+        """ Add a consumer of key, return True if it is the first one """
+        self.counts[key] = self.counts.get(key, 0) + 1
+        return self.counts[key] == 1
+
+    def release(self, key) -> bool:
+        """ Remove a consumer of key, return True if it was the last one """
+        if key not in self.counts:
+            return False
+        self.counts[key] -= 1
+        if self.counts[key]:
+            return False
+        del self.counts[key]
+        return True
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:48:19 2026
+"""
+
+import os
+import math
+import random
+import tempfile
+import itertools
+import traceback
+import multiprocessing
+import time as t
+from logging import getLogger, CRITICAL
+from configparser import ConfigParser
+from pandas import DataFrame, concat
+
+import utils
+from backtest import BacktestTrader
+from recording import readTicks, readContracts, mergeTicks, writeTicks, contractsPath
+from replaycache import ticksDigest
+from indicatorcache import IndicatorCache
+from strategyxframeworks import StrategyManager
+from strategies import get_strategy_class
+
+
+def paramGrid(grid: dict) -> list:
+    """ every combination of the values of grid, as {parameter: value} dicts """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def algoConfigs(base: dict, grid: dict) -> list:
+    """ the algo config base with each combination of grid
+        *values are strings, as read from an algo .ini file """
+    return [
+        {**base, **{name: str(value) for name, value in combination.items()}}
+        for combination in paramGrid(grid)
+    ]
+
+
+def readSweep(configfile):
+    """ (options, base algo config, grid) of a sweep .ini file
+        *[Sweep]      ticks (comma separated recordings), algo, revtime, runtime,
+                      processes, results, optimizer, eta, min_runtime, cutoff, seed,
+                      cache, cache_size (MB), indicator_cache (MB), indicator_dir,
+                      serve, authkey, workers, job_timeout, retries
+        *[Parameters] base algo config, over algos/<algo>.ini if algo is set
+        *[Grid]       parameter = value;value;... """
+    config = ConfigParser()
+    config.read(configfile)
+    options = dict(config.items('Sweep'))
+    base = utils.readConfig(f"algos/{options['algo']}.ini") if options.get('algo') else {}
+    if config.has_section('Parameters'):
+        base.update(config.items('Parameters'))
+    grid = {
+        name: [value.strip() for value in values.split(';')]
+        for name, values in (config.items('Grid') if config.has_section('Grid') else [])
+    }
+    return options, base, grid
+
+
+def tickSpan(paths) -> float:
+    """ seconds from the first to the last tick of the recordings """
+    ticks = mergeTicks(*[readTicks(path) for path in paths])
+    return (int(ticks['time'][-1]) - int(ticks['time'][0]))/1e9 if ticks.size else 0.0
+
+
+def replayConfig(config, ticks, contracts=(), revtime=0, runtime=None, cutoff=None,
+                 logging=False, name='sweep', cache=None, digest=None, indicators=None):
+    """ Backtest one algo config on a tick record array, return its summary row
+        *the row is the strategy's getInputs() with the run's PnL
+        *without runtime the strategy runs until the ticks end
+        *with a cutoff the run stops early once its PnL falls below it
+        *with a ReplayCache (and the ticksDigest of the ticks) a replay already
+         cached is returned before the backtest is set up, new replays are
+         added with their log
+        *with an IndicatorCache of ticks the bars and indicators are read from its tapes """
+    began = t.perf_counter()
+    if runtime is None:
+        runtime = max((int(ticks['time'][-1]) - int(ticks['time'][0]))/1e9 - revtime, 0)
+    if cache is not None:
+        key = cache.key(digest, get_strategy_class(config['strategy']), config, {
+            'revtime': revtime, 'runtime': runtime, 'cutoff': cutoff
+        })
+        entry = cache.get(key)
+        if entry is not None and (entry['log'] is not None or not logging):
+            return dict(entry['summary'], cached=True)
+    ib = BacktestTrader(
+        ticks=ticks, contracts=contracts, cutoff=cutoff, indicators=indicators, local=False
+    )
+    try:
+        manager = StrategyManager(ib, logging=logging)
+        strategy = manager.newStrategy(name, config)
+        manager.strategies.append(strategy)
+        manager.run(runtime, revtime)
+        broker = ib.client
+        unrealized = broker.unrealizedPnL()
+        row = strategy.getInputs({})
+        row.update({
+            'realizedPnL'   : broker.realized,
+            'unrealizedPnL' : unrealized,
+            'PnL'           : broker.realized + unrealized,
+            'commission'    : broker.commissions,
+            'executions'    : broker.executions,
+            'position'      : strategy.position,
+            'stopped'       : ib.stopped,
+            'ticks'         : ib.replay.cursor,
+            'seconds'       : t.perf_counter() - began,
+            'cached'        : False
+        })
+        if cache is not None:
+            cache.put(key, row, strategy._log if logging else None)
+        return row
+    finally:
+        ib.disconnect()
+
+
+def mergeRecordings(paths):
+    """ (paths, temporary recording or None) for the processes of a sweep
+        *several recordings (or one out of order) are merged once here into a
+         temporary recording, which every process memory-maps as it is """
+    recordings = [readTicks(path) for path in paths]
+    ticks = mergeTicks(*recordings)
+    if len(paths) == 1 and ticks is recordings[0]:
+        return paths, None
+    contracts = {}
+    for path in paths:
+        contracts.update(readContracts(path))
+    file, temp = tempfile.mkstemp(suffix='.bin', prefix='sweep_ticks_')
+    os.close(file)
+    writeTicks(temp, ticks, contracts.values())
+    return [temp], temp
+
+
+class SweepWorker:
+    """ State of a sweep process, set once by the pool initializer
+        *the recordings are memory-mapped read-only, so every worker shares the
+         page cache instead of holding its own copy of the ticks
+        *ib_insync's order error logging is silenced, errors stay in the strategy logs
+        *with indicators (IndicatorCache options) the bar and indicator tapes are
+         shared by every config the process runs """
+
+    ticks      = None
+    contracts  = ()
+    options    = {}
+    indicators = None
+
+    @classmethod
+    def start(cls, paths, options, indicators=None):
+        getLogger('ib_insync').setLevel(CRITICAL)
+        cls.ticks = mergeTicks(*[readTicks(path) for path in paths])
+        contracts = {}
+        for path in paths:
+            contracts.update(readContracts(path))
+        cls.contracts = list(contracts.values())
+        cls.options = options
+        cls.indicators = None if indicators is None else IndicatorCache(cls.ticks, **indicators)
+
+    @classmethod
+    def run(cls, job):
+        """ (job index, summary row) of one config, failures are reported in the row """
+        index, config = job
+        try:
+            row = replayConfig(
+                config, cls.ticks, cls.contracts, indicators=cls.indicators, **cls.options
+            )
+        except Exception:
+            row = dict(config, error=traceback.format_exc(limit=-3))
+        return index, row
+
+
+def workerSetup(paths, options, cache=None, indicators=None):
+    """ (options, indicators) of SweepWorker.start with a ReplayCache and IndicatorCache
+        options, both keyed by the digest of the recordings """
+    digest = None
+    if cache is not None or (indicators or {}).get('directory'):
+        digest = ticksDigest(paths)
+    if cache is not None:
+        options = dict(options, cache=cache, digest=digest)
+    if indicators is not None:
+        indicators = dict(indicators, digest=digest)
+    return options, indicators
+
+
+def sweep(configs, paths, processes=0, revtime=0, runtime=None, cutoff=None, cache=None,
+          indicators=None, coordinator=None, chunksize=1):
+    """ Backtest every algo config on the tick recordings across a process pool
+        *processes of 0 uses every core, 1 runs in this process
+        *with a ReplayCache the configs already replayed are read from it
+        *with indicators, {'max_bytes', 'directory'} of an IndicatorCache, each
+         process computes the bars and indicators of a (contract, ticksPerBar, window)
+         once (or loads them from the directory) for all of its configs
+        *with a SweepCoordinator the configs are run by its workers instead
+        *several recordings are merged once, into a temporary recording shared
+         by the processes, the caches are still keyed by the recordings given
+        *returns one row per config, in the order of configs """
+    options = {
+        'revtime': float(revtime),
+        'runtime': None if runtime is None else float(runtime),
+        'cutoff' : None if cutoff is None else float(cutoff)
+    }
+    jobs = list(enumerate(configs))
+    if coordinator is not None:
+        results = coordinator.run(configs, paths, options, cache, indicators)
+        return DataFrame([results[i] for i in range(len(jobs))])
+    options, indicators = workerSetup(paths, options, cache, indicators)
+    processes = int(processes) or os.cpu_count()
+    if processes == 1:
+        SweepWorker.start(paths, options, indicators)
+        results = dict(map(SweepWorker.run, jobs))
+    else:
+        merged, temp = mergeRecordings(paths)
+        try:
+            with multiprocessing.Pool(processes, SweepWorker.start, (merged, options, indicators)) as pool:
+                results = dict(pool.imap_unordered(SweepWorker.run, jobs, chunksize))
+        finally:
+            for path in [] if temp is None else [temp, contractsPath(temp)]:
+                if os.path.exists(path):
+                    os.remove(path)
+    return DataFrame([results[i] for i in range(len(jobs))])
+
+
+def rungRuntimes(min_runtime, max_runtime, eta=3) -> list:
+    """ runtimes of successive halving rungs: min_runtime times eta**rung, then max_runtime """
+    runtimes, runtime = [], float(min_runtime)
+    while runtime < max_runtime:
+        runtimes.append(runtime)
+        runtime *= eta
+    return runtimes + [float(max_runtime)]
+
+
+def promoted(results, keep, cutoff=None) -> list:
+    """ config of the keep rows with the best PnL
+        *runs that failed, were stopped or ended below cutoff are never promoted """
+    if 'PnL' not in results:
+        return []
+    alive = results[results['PnL'].notna() & ~results['stopped'].fillna(True).astype(bool)]
+    if cutoff is not None:
+        alive = alive[alive['PnL'] >= cutoff]
+    return alive.nlargest(keep, 'PnL')['config'].tolist()
+
+
+def successiveHalving(configs, paths, eta=3, min_runtime=60, max_runtime=None, cutoff=None,
+                      processes=0, revtime=0, cache=None, indicators=None, coordinator=None):
+    """ Backtest the configs on short runs, promoting the best 1/eta to eta times longer runs
+        *every run replays the ticks from their start, so a rung sees the earlier ones' data
+        *the last rung runs for max_runtime (until the ticks end by default)
+        *runs falling below cutoff are stopped at once and dropped
+        *returns a row per run with its config index, rung, runtime and promotion """
+    if max_runtime is None:
+        max_runtime = max(tickSpan(paths) - revtime, 0)
+    runtimes  = rungRuntimes(min_runtime, max_runtime, eta)
+    survivors = list(range(len(configs)))
+    rungs     = []
+    for rung, runtime in enumerate(runtimes):
+        results = sweep(
+            [configs[i] for i in survivors], paths, processes, revtime, runtime, cutoff, cache,
+            indicators, coordinator
+        )
+        results.insert(0, 'config' , survivors)
+        results.insert(1, 'rung'   , rung)
+        results.insert(2, 'runtime', runtime)
+        final = rung == len(runtimes) - 1
+        survivors = [] if final else promoted(results, math.ceil(len(survivors)/eta), cutoff)
+        results['promoted'] = results['config'].isin(survivors)
+        rungs.append(results)
+        if not survivors:
+            break
+    return concat(rungs, ignore_index=True)
+
+
+def hyperband(configs, paths, eta=3, min_runtime=60, max_runtime=None, cutoff=None,
+              processes=0, revtime=0, cache=None, indicators=None, coordinator=None, seed=0):
+    """ Successive halving brackets, from many configs starting on min_runtime runs
+        to a few configs run for max_runtime only
+        *each bracket samples its configs from configs, seed makes the samples repeatable
+        *brackets share runtimes, with a ReplayCache a run repeated by a later
+         bracket is read from it
+        *returns the successiveHalving rows of every bracket, config indexes into configs """
+    if max_runtime is None:
+        max_runtime = max(tickSpan(paths) - revtime, 0)
+    runtimes = rungRuntimes(min_runtime, max_runtime, eta)
+    sampler  = random.Random(seed)
+    brackets = []
+    top = len(runtimes) - 1
+    for bracket, rungs in enumerate(range(top, -1, -1)):
+        n = math.ceil((top + 1)/(rungs + 1)*eta**rungs)
+        sample  = sampler.sample(range(len(configs)), min(n, len(configs)))
+        results = successiveHalving(
+            [configs[i] for i in sample], paths, eta, runtimes[top - rungs], max_runtime,
+            cutoff, processes, revtime, cache, indicators, coordinator
+        )
+        results['config'] = [sample[i] for i in results['config']]
+        results.insert(0, 'bracket', bracket)
+        brackets.append(results)
+    return concat(brackets, ignore_index=True)
+
+
+def best(results):
+    """ row with the best PnL among the runs of the longest runtime """
+    if 'PnL' not in results or not results['PnL'].notna().any():
+        return None
+    final = results[results['runtime'] == results['runtime'].max()]
+    return final.loc[final['PnL'].idxmax()] if final['PnL'].notna().any() else None
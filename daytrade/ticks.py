@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+"""
+
+import numpy
+import eventkit
+from ib_insync import TickByTickBidAsk
+
+import utils
+from stores import ColumnStore
+
+
+BATCH_HISTORY = 100000    # batches kept for the ticksPerBatch stream
+
+
+class TickBatch:
+    """ Columnar record of the BidAsk ticks in one pendingTickersEvent batch
+        *decoded once per batch and shared by every handler
+        *every tick in ticker.tickByTicks is kept, in the order it arrived
+        *all ticks of a ticker share ticker.time, the time the batch arrived """
+
+    def __init__(self, tickers, conIds=None):
+        rows = [
+            (ticker.contract.conId, utils.getTimestamp(ticker.time),
+             tick.askPrice, tick.bidPrice, tick.askSize, tick.bidSize)
+            for ticker in tickers
+            if conIds is None or ticker.contract.conId in conIds
+            for tick in ticker.tickByTicks
+            if isinstance(tick, TickByTickBidAsk)
+        ]
+        conId, time, ask, bid, askSize, bidSize = zip(*rows) if rows else [()]*6
+        self.conId   = numpy.array(conId, dtype='int64')
+        self.time    = numpy.array(time, dtype='int64')
+        self.ask     = numpy.array(ask, dtype=float)
+        self.bid     = numpy.array(bid, dtype=float)
+        self.askSize = numpy.array(askSize, dtype=float)
+        self.bidSize = numpy.array(bidSize, dtype=float)
+        self.mid     = (self.ask*self.askSize + self.bid*self.bidSize)/(self.askSize + self.bidSize)
+        self._tickPrices = [None]*len(self)
+
+    def __len__(self):
+        return self.conId.size
+
+    def mask(self, conId):
+        """ boolean selector of the ticks belonging to one contract """
+        return self.conId == conId
+
+    def tickPrice(self, i):
+        """ {'ask', 'bid', 'mid'} of the i-th tick, built once and shared """
+        if self._tickPrices[i] is None:
+            self._tickPrices[i] = {
+                'ask':float(self.ask[i]),
+                'bid':float(self.bid[i]),
+                'mid':float(self.mid[i])
+            }
+        return self._tickPrices[i]
+
+    def tickTime(self, i):
+        return numpy.datetime64(int(self.time[i]), 'ns')
+
+
+class TickRouter:
+    """ Dispatches pendingTickersEvent batches to the handlers of each contract
+        *handlers are indexed by conId so a ticker only reaches the handlers
+         subscribed to its contract
+        *batchEvent fires before the per-contract handlers, routedEvent after
+         all of them so stores fed from it never lead a handler
+        *the size of the last BATCH_HISTORY batches is kept for ticksPerBatch,
+         batches and ticks count every batch routed """
+
+    def __init__(self):
+        self.events = {}
+        self.batchEvent  = eventkit.Event('tickBatch')
+        self.routedEvent = eventkit.Event('tickBatchRouted')
+        self.batchSizes = ColumnStore(('ticks',), maxlen=BATCH_HISTORY)
+        self.batches    = 0
+        self.ticks      = 0
+
+    def event(self, contract) -> eventkit.Event:
+        """ Event emitting (tickPrice, tickTime) for each tick of the contract """
+        if contract.conId not in self.events:
+            self.events[contract.conId] = eventkit.Event(f'ticks_{contract.conId}')
+        return self.events[contract.conId]
+
+    def subscribe(self, contract, handler):
+        self.event(contract).connect(handler)
+
+    def unsubscribe(self, contract, handler):
+        if contract.conId in self.events:
+            self.events[contract.conId].disconnect(handler)
+
+    def ticksPerBatch(self):
+        """ Number of routed ticks carried by each batch """
+        return self.batchSizes.series('ticks').astype(int)
+
+    def route(self, tickers):
+        conIds = None if self.batchEvent or self.routedEvent else [
+            conId for conId, event in self.events.items() if event
+        ]
+        batch = TickBatch(tickers, conIds)
+        self.batchSizes.append(utils.getTimestamp(), {'ticks': len(batch)})
+        self.batches += 1
+        self.ticks   += len(batch)
+        self.batchEvent.emit(batch)
+        for i, conId in enumerate(batch.conId.tolist()):
+            event = self.events.get(conId)
+            if event:
+                event.emit(batch.tickPrice(i), batch.tickTime(i))
+        self.routedEvent.emit(batch)
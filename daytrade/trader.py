@@ -8,11 +8,13 @@ import utils
 from ib import IBGW
 from ibxdata import DataExtensions
 from ibxorders import OrderExtensions
+from ticks import TickRouter
 
 
 class LiveTrader(IBGW, DataExtensions, OrderExtensions):
     
     streaming_ticks = []
+    _tickRouter     = None
     
     """
     ///////////////////////////////////////////////////////////////////////////
@@ -44,17 +46,31 @@ class LiveTrader(IBGW, DataExtensions, OrderExtensions):
             return tickersFunction
         return newTickersEvent
     
+    @property
+    def tickRouter(self):
+        if self._tickRouter is None:
+            self._tickRouter = TickRouter()
+            self.pendingTickersEvent += self._tickRouter.route
+            self._data_streams['ticksPerBatch'] = self._tickRouter.ticksPerBatch
+        return self._tickRouter
     
+    def subscribeTicks(self, contract, handler):
+        """ Call handler(tickPrice, tickTime) on every tick of the given Contract """
+        self.tickRouter.subscribe(contract, handler)
+    
+    def unsubscribeTicks(self, contract, handler):
+        self.tickRouter.unsubscribe(contract, handler)
     
     def reqLiveTicks(self, contract):
-        """ Requesting real time tick price updates """
-        if contract not in self.streaming_ticks:
+        """ Requesting real time tick price updates
+            *the tickByTick feed is shared, each request must be paired with cancelLiveTicks """
+        if self.subscriptions.acquire(('ticks', contract.conId)):
             self.streaming_ticks.append(contract)
             self.reqTickByTickData(contract, 'BidAsk')
 
     
     def cancelLiveTicks(self, contract): 
-        """ Cancel all updates requiring tickByTick data for the given Contract"""
-        if contract in self.streaming_ticks:
+        """ Release a tickByTick request, the feed is cancelled when its last consumer releases it"""
+        if self.subscriptions.release(('ticks', contract.conId)):
             self.streaming_ticks.remove(contract)
             self.cancelTickByTickData(contract, 'BidAsk')
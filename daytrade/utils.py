@@ -7,15 +7,40 @@ Created on Tue Aug  4 00:34:37 2020
 
 import numpy
 import datetime
+import time as t
 import configparser
 import inspect
 from ib_insync import Future, Forex, Contract
 
 
+EPOCH     = datetime.datetime(1970, 1, 1)
+EPOCH_UTC = EPOCH.replace(tzinfo=datetime.timezone.utc)
+
+
+class Clock:
+    """ Current UTC time, the wall clock unless a backtest sets its replayed time
+        *source is a callable returning a naive UTC datetime """
+    
+    source = None
+    
+    @classmethod
+    def now(cls) -> datetime.datetime:
+        return cls.source() if cls.source else datetime.datetime.utcnow()
+
 def getDatetime(time: datetime.datetime = None) -> numpy.datetime64:
-    time = time or datetime.datetime.utcnow()
+    time = time or Clock.now()
     return numpy.datetime64(time).astype('datetime64[ns]')
 
+def getTimestamp(time: datetime.datetime = None) -> int:
+    """ int64 nanoseconds since epoch, the integer form of getDatetime """
+    time = time or Clock.now()
+    since_epoch = time - (EPOCH_UTC if time.tzinfo else EPOCH)
+    return since_epoch // datetime.timedelta(microseconds=1) * 1000
+
+def getTime() -> float:
+    """ seconds since epoch, time.time() under the wall clock """
+    return getTimestamp()/1e9 if Clock.source else t.time()
+
 def getModuleClasses(module, identifier=lambda x,y: x):
     return {
         identifier(name, cls_obj) : cls_obj
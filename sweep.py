@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:55:02 2026
+"""
+import os
+import multiprocessing
+os.sys.path.insert(1, os.path.realpath('./daytrade'))
+from sweeps import readSweep, algoConfigs, sweep, successiveHalving, hyperband, best
+from replaycache import ReplayCache
+from coordinator import SweepCoordinator, parseAddress, work
+
+def startWorkers(address, authkey, processes):
+    """ worker processes of a coordinator on this machine """
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=work, args=(address, authkey)) for _ in range(processes)]
+    for process in workers:
+        process.start()
+    return workers
+
+def worker(address, processes=1):
+    """ Run the jobs of the coordinator at address (host:port) in processes, until it is done
+        *the coordinator's authkey is read from the SWEEP_AUTHKEY environment variable """
+    authkey = os.environ.get('SWEEP_AUTHKEY', '')
+    if not authkey:
+        raise ValueError('set SWEEP_AUTHKEY to the authkey of the coordinator')
+    if int(processes) == 1:
+        print(f'{work(parseAddress(address), authkey)} jobs run')
+        return
+    for process in startWorkers(parseAddress(address), authkey, int(processes)):
+        process.join()
+
+def main(configfile='sweep.ini'):
+    options, base, grid = readSweep(configfile)
+    configs = algoConfigs(base, grid)
+    optimizer = options.get('optimizer') or 'grid'
+    print(f'Sweeping {len(configs)} configs of {base["strategy"]} ({optimizer})')
+    paths = options['ticks'].split(',')
+    processes = int(options.get('processes', 0))
+    revtime = float(options.get('revtime', 0))
+    runtime = float(options['runtime']) if options.get('runtime') else None
+    cutoff = float(options['cutoff']) if options.get('cutoff') else None
+    cache = ReplayCache(
+        options['cache'], float(options.get('cache_size', 1024))*2**20
+    ) if options.get('cache') else None
+    indicators = {
+        'max_bytes': float(options['indicator_cache'])*2**20,
+        'directory': options.get('indicator_dir') or None
+    } if float(options.get('indicator_cache') or 0) else None
+    coordinator, workers = None, []
+    if options.get('serve'):
+        authkey = options.get('authkey') or os.environ.get('SWEEP_AUTHKEY', '')
+        coordinator = SweepCoordinator(
+            parseAddress(options['serve']), authkey,
+            retries=int(options.get('retries') or 2),
+            timeout=float(options['job_timeout']) if options.get('job_timeout') else None
+        ).start()
+        print(f'Serving jobs on {options["serve"]}')
+        workers = startWorkers(coordinator.address, authkey, int(options.get('workers') or 0))
+    try:
+        results = search(
+            optimizer, configs, paths, options, processes, revtime, runtime, cutoff,
+            cache, indicators, coordinator
+        )
+    finally:
+        if coordinator is not None:
+            coordinator.close()
+        for process in workers:
+            process.join()
+    if cache is not None and 'cached' in results:
+        print(f'{(results["cached"] == True).sum()} of {len(results)} runs read from the cache')
+    results.to_csv(options.get('results', 'sweep_results.csv'))
+    return results
+
+def search(optimizer, configs, paths, options, processes, revtime, runtime, cutoff,
+           cache, indicators, coordinator):
+    if optimizer == 'grid':
+        return sweep(
+            configs, paths, processes, revtime, runtime, cutoff, cache, indicators, coordinator
+        )
+    else:
+        optimize = {'halving': successiveHalving, 'hyperband': hyperband}[optimizer]
+        kwargs = {'seed': int(options.get('seed', 0))} if optimizer == 'hyperband' else {}
+        results = optimize(
+            configs, paths,
+            eta=float(options.get('eta', 3)),
+            min_runtime=float(options.get('min_runtime', 60)),
+            max_runtime=runtime,
+            cutoff=cutoff,
+            processes=processes,
+            revtime=revtime,
+            cache=cache,
+            indicators=indicators,
+            coordinator=coordinator,
+            **kwargs
+        )
+        print(f'{len(results)} runs, best:', best(results), sep='\n')
+        return results
+
+if __name__ == '__main__':
+    if os.sys.argv[1:2] == ['--worker']:
+        worker(*os.sys.argv[2:])
+    else:
+        main(*os.sys.argv[1:])
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:02:11 2026
+"""
+import os
+os.sys.path.insert(1, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'daytrade'))
+
+import numpy as np
+import pytest
+from ib_insync import Forex
+
+from recording import TICK_DTYPE, writeTicks
+
+
+def syntheticTicks(n, seed=5, conId=12087792, start='2020-11-02T14:00:00'):
+    """ n TICK_DTYPE ticks of a random walk, about 0.3 s apart """
+    rng = np.random.default_rng(seed)
+    ticks = np.empty(n, TICK_DTYPE)
+    ticks['conId'] = conId
+    start = np.datetime64(start, 'ns').astype('int64')
+    ticks['time'] = start + (rng.exponential(0.3, n)*1e9).astype('int64').cumsum()//1000*1000
+    prices = 1.17 + 0.00005*rng.choice([-2, -1, -1, 0, 1, 1, 2], n).cumsum()
+    ticks['bid'] = np.round(prices, 5)
+    ticks['ask'] = np.round(prices, 5) + 0.00005
+    ticks['bidSize'] = rng.integers(1, 9, n)*1e5
+    ticks['askSize'] = rng.integers(1, 9, n)*1e5
+    return ticks
+
+
+@pytest.fixture
+def writeRecording(tmp_path):
+    """ write(name, n, seed) saves synthetic EURUSD ticks with their contracts, returns the path """
+    eur = Forex('EURUSD', conId=12087792, exchange='IDEALPRO')
+    eur.increment = 0.00005
+    def write(name='ticks.bin', n=5000, seed=5, **kwargs):
+        path = str(tmp_path / name)
+        writeTicks(path, syntheticTicks(n, seed, **kwargs), [eur])
+        return path
+    return write
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:41:17 2026
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from ib_insync import Forex, Order, MarketOrder, LimitOrder, StopOrder
+
+from backtest import SimulatedBroker
+
+
+class RecordingWrapper:
+    """ Wrapper stub recording every callback the broker makes """
+
+    def __init__(self):
+        self.calls = []
+        self._futures = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return lambda *args: self.calls.append((name, args))
+
+    def named(self, name):
+        return [args for call, args in self.calls if call == name]
+
+    def statuses(self, orderId):
+        return [args[1] for args in self.named('orderStatus') if args[0] == orderId]
+
+
+EUR = Forex('EURUSD', conId=1, exchange='IDEALPRO')
+
+
+@pytest.fixture
+def broker():
+    return SimulatedBroker(RecordingWrapper(), contracts=[EUR], commission_rate=0.0001, min_commission=2.0)
+
+
+def tick(broker, bid, ask, conId=EUR.conId):
+    broker.onTicks(SimpleNamespace(
+        conId=np.array([conId]), time=np.array([broker.time + 10**9]),
+        bid=np.array([bid]), ask=np.array([ask])
+    ))
+
+
+def place(broker, orderId, order, **kwargs):
+    order.orderId = orderId
+    for key, value in kwargs.items():
+        setattr(order, key, value)
+    broker.placeOrder(orderId, EUR, order)
+
+
+def fills(broker):
+    return [(args[2].orderId, args[2].side, args[2].price) for args in broker.wrapper.named('execDetails')]
+
+
+def test_orders_are_answered_at_the_next_tick(broker):
+    place(broker, 1, MarketOrder('BUY', 1000))
+    assert not broker.wrapper.calls
+    tick(broker, 1.1, 1.2)
+    assert broker.wrapper.statuses(1) == ['Submitted', 'Filled']
+    assert fills(broker) == [(1, 'BOT', 1.2)]
+
+
+def test_market_orders_fill_at_the_touch(broker):
+    tick(broker, 1.1, 1.2)
+    place(broker, 1, MarketOrder('BUY', 1000))
+    place(broker, 2, MarketOrder('SELL', 1000))
+    tick(broker, 1.3, 1.4)
+    assert fills(broker) == [(1, 'BOT', 1.4), (2, 'SLD', 1.3)]
+
+
+@pytest.mark.parametrize('action,limit,quotes,price', [
+    ('BUY', 1.15, [(1.1, 1.2), (1.14, 1.16), (1.13, 1.15)], 1.15),
+    ('SELL', 1.25, [(1.1, 1.2), (1.24, 1.26), (1.26, 1.28)], 1.26),
+])
+def test_limit_orders_fill_once_the_touch_reaches_the_limit(broker, action, limit, quotes, price):
+    place(broker, 1, LimitOrder(action, 1000, limit))
+    for quote in quotes[:-1]:
+        tick(broker, *quote)
+    assert not fills(broker)
+    tick(broker, *quotes[-1])
+    assert fills(broker) == [(1, 'BOT' if action == 'BUY' else 'SLD', price)]
+
+
+@pytest.mark.parametrize('action,stop,quotes,price', [
+    ('BUY', 1.25, [(1.1, 1.2), (1.24, 1.249), (1.25, 1.26)], 1.26),
+    ('SELL', 1.05, [(1.1, 1.2), (1.051, 1.06), (1.04, 1.05)], 1.04),
+])
+def test_stop_orders_fill_at_the_touch_once_triggered(broker, action, stop, quotes, price):
+    place(broker, 1, StopOrder(action, 1000, stop))
+    for quote in quotes[:-1]:
+        tick(broker, *quote)
+    assert not fills(broker)
+    tick(broker, *quotes[-1])
+    assert fills(broker) == [(1, 'BOT' if action == 'BUY' else 'SLD', price)]
+
+
+def test_sell_trail_follows_the_bid_up(broker):
+    place(broker, 1, Order(action='SELL', totalQuantity=1000, orderType='TRAIL', auxPrice=0.1))
+    for bid in (1.0, 1.2, 1.15, 1.3, 1.21):
+        tick(broker, bid, bid + 0.01)
+    assert not fills(broker)
+    assert broker.orders[1].stop == pytest.approx(1.2)
+    tick(broker, 1.2, 1.21)
+    assert fills(broker) == [(1, 'SLD', 1.2)]
+
+
+def test_buy_trail_follows_the_ask_down(broker):
+    place(broker, 1, Order(action='BUY', totalQuantity=1000, orderType='TRAIL', auxPrice=0.1))
+    for ask in (1.5, 1.3, 1.35, 1.39):
+        tick(broker, ask - 0.01, ask)
+    assert not fills(broker)
+    tick(broker, 1.4, 1.41)
+    assert fills(broker) == [(1, 'BOT', 1.41)]
+
+
+def bracket(broker):
+    place(broker, 1, LimitOrder('BUY', 1000, 1.1), transmit=False)
+    place(broker, 2, LimitOrder('SELL', 1000, 1.3), parentId=1, transmit=False)
+    place(broker, 3, StopOrder('SELL', 1000, 1.0), parentId=1, transmit=True)
+
+
+def test_untransmitted_orders_are_held(broker):
+    place(broker, 1, MarketOrder('BUY', 1000), transmit=False)
+    tick(broker, 1.1, 1.2)
+    assert broker.orders[1].state == 'held'
+    assert not fills(broker)
+
+
+def test_bracket_children_wait_for_the_parent_fill(broker):
+    bracket(broker)
+    tick(broker, 1.3, 1.35)
+    assert not fills(broker)
+    assert broker.orders[2].state == broker.orders[3].state == 'pending'
+    tick(broker, 1.05, 1.1)
+    assert fills(broker) == [(1, 'BOT', 1.1)]
+    assert broker.orders[2].state == broker.orders[3].state == 'working'
+
+
+def test_bracket_child_fill_cancels_its_sibling(broker):
+    bracket(broker)
+    tick(broker, 1.05, 1.1)
+    tick(broker, 1.3, 1.31)
+    assert fills(broker) == [(1, 'BOT', 1.1), (2, 'SLD', 1.3)]
+    assert broker.wrapper.statuses(3)[-1] == 'Cancelled'
+    assert not broker.orders
+    assert broker.positions[EUR.conId][0] == 0
+
+
+def test_cancelling_the_parent_cancels_its_children(broker):
+    bracket(broker)
+    tick(broker, 1.15, 1.2)
+    broker.cancelOrder(1)
+    tick(broker, 1.15, 1.2)
+    assert [broker.wrapper.statuses(i)[-1] for i in (1, 2, 3)] == ['Cancelled']*3
+    assert not broker.orders
+
+
+def test_oca_fill_cancels_the_group(broker):
+    place(broker, 1, LimitOrder('SELL', 1000, 1.3), ocaGroup='exit')
+    place(broker, 2, StopOrder('SELL', 1000, 1.0), ocaGroup='exit')
+    place(broker, 3, StopOrder('SELL', 1000, 1.0))
+    tick(broker, 1.1, 1.2)
+    tick(broker, 1.3, 1.31)
+    assert fills(broker) == [(1, 'SLD', 1.3)]
+    assert broker.wrapper.statuses(2)[-1] == 'Cancelled'
+    assert list(broker.orders) == [3]
+
+
+def test_cancelling_an_unknown_order_is_error_10147(broker):
+    broker.cancelOrder(7)
+    tick(broker, 1.1, 1.2)
+    assert [args[:2] for args in broker.wrapper.named('error')] == [(7, 10147)]
+
+
+def test_commission_and_realized_pnl(broker):
+    assert broker.book(EUR, 100000, 1.1) == (pytest.approx(11.0), 0.0)
+    position, avgCost = broker.positions[EUR.conId]
+    assert position == 100000
+    assert avgCost == pytest.approx(1.1 + 11.0/100000)
+    commission, realized = broker.book(EUR, -40000, 1.2)
+    assert commission == pytest.approx(4.8)
+    assert realized == pytest.approx((1.2 - avgCost)*40000 - 4.8)
+    commission, flat = broker.book(EUR, -60000, 1.0)
+    assert commission == pytest.approx(6.0)
+    assert flat == pytest.approx((1.0 - avgCost)*60000 - 6.0)
+    assert broker.positions[EUR.conId] == (0, 0.0)
+    assert broker.realized == pytest.approx(realized + flat)
+    assert broker.commissions == pytest.approx(21.8)
+
+
+def test_minimum_commission_and_reversal(broker):
+    assert broker.book(EUR, 1000, 1.0) == (2.0, 0.0)
+    commission, realized = broker.book(EUR, -3000, 1.5)
+    assert commission == 2.0
+    assert realized == pytest.approx((1.5 - 1.002)*1000 - 2.0/3)
+    position, avgCost = broker.positions[EUR.conId]
+    assert position == -2000
+    assert avgCost == pytest.approx(1.5 - 2.0*2/3/2000)
+
+
+def test_fill_reports_commission_and_pnl(broker):
+    place(broker, 1, MarketOrder('BUY', 100000))
+    tick(broker, 1.1, 1.2)
+    place(broker, 2, MarketOrder('SELL', 100000))
+    tick(broker, 1.3, 1.4)
+    reports = [args[0] for args in broker.wrapper.named('commissionReport')]
+    assert [r.commission for r in reports] == pytest.approx([12.0, 13.0])
+    assert reports[0].realizedPNL == 0.0
+    assert reports[1].realizedPNL == pytest.approx(0.1*100000 - 25.0)
+    assert broker.wrapper.named('position')[-1][2] == 0
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:21:40 2026
+"""
+import warnings
+import numpy as np
+import pytest
+from numpy.testing import assert_allclose
+from pandas import DataFrame
+
+import candles
+import batchcandles
+
+
+WINDOW = 14
+
+
+def randomCandles(n, seed=0):
+    """ OHLC candlesticks on a quarter tick grid, so some of them open at their close """
+    rng = np.random.default_rng(seed)
+    opens  = np.round(100 + np.cumsum(rng.normal(0, 1, n))*4)/4
+    closes = np.round((opens + rng.normal(0, 1, n))*4)/4
+    highs  = np.maximum(opens, closes) + np.round(rng.exponential(0.5, n)*4)/4
+    lows   = np.minimum(opens, closes) - np.round(rng.exponential(0.5, n)*4)/4
+    return DataFrame({'open': opens, 'high': highs, 'low': lows, 'close': closes})
+
+
+LENGTHS = [1, 2, WINDOW - 1, WINDOW, WINDOW + 1, 150]
+
+
+@pytest.fixture(params=LENGTHS)
+def candlesticks(request):
+    return randomCandles(request.param, seed=request.param)
+
+
+def test_heikin_ashi(candlesticks):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        expected = candles.getHeikinAshi(candlesticks)
+    ha_open, ha_high, ha_low, ha_close = batchcandles.heikinAshi(*batchcandles.ohlc(candlesticks))
+    for column, values in zip(('open', 'high', 'low', 'close'), (ha_open, ha_high, ha_low, ha_close)):
+        assert_allclose(values, expected[column].to_numpy(dtype=float), rtol=1e-12)
+
+
+def test_true_ranges(candlesticks):
+    expected = [candles.trueRange(candlesticks.head(i), 1) for i in range(1, len(candlesticks) + 1)]
+    assert_allclose(batchcandles.trueRanges(*batchcandles.ohlc(candlesticks)), expected, rtol=1e-12)
+
+
+@pytest.mark.parametrize('window', [1, 3, WINDOW])
+def test_average_true_ranges(candlesticks, window):
+    expected = [candles.getATR(candlesticks.head(i), window) for i in range(1, len(candlesticks) + 1)]
+    assert_allclose(
+        batchcandles.averageTrueRanges(*batchcandles.ohlc(candlesticks), window), expected, rtol=1e-12
+    )
+
+
+def test_colors(candlesticks):
+    opens, _, _, closes = batchcandles.ohlc(candlesticks)
+    expected = [candles.candleColor(row) for _, row in candlesticks.iterrows()]
+    assert batchcandles.colors(opens, closes).tolist() == expected
+
+
+def test_moves(candlesticks):
+    opens, _, _, closes = batchcandles.ohlc(candlesticks)
+    colors, sizes, price_changes = batchcandles.moves(opens, closes)
+    history = candles.moveHistory(candlesticks)
+    assert colors.tolist() == [move['color'] for move in history]
+    assert sizes.tolist() == [move['size'] for move in history]
+    assert_allclose(price_changes, [move['price_change'] for move in history], rtol=1e-12)
+    assert sizes.sum() == len(candlesticks)
+
+
+def test_move_sizes(candlesticks):
+    opens, _, _, closes = batchcandles.ohlc(candlesticks)
+    n = len(candlesticks)
+    expected = [candles.moveStatus(candlesticks.head(i))['size'] for i in range(1, n + 1)]
+    assert batchcandles.moveSizes(opens, closes).tolist() == expected
+    last = candles.moveStatus(candlesticks)
+    assert_allclose(
+        closes[-1] - opens[n - last['size']], last['price_change'], rtol=1e-12
+    )
+
+
+def test_signal_bars(candlesticks):
+    opens, _, _, closes = batchcandles.ohlc(candlesticks)
+    expected = [candles.isSignalBar(candlesticks.head(i))[0] for i in range(1, len(candlesticks) + 1)]
+    assert batchcandles.signalBars(opens, closes).tolist() == expected
+
+
+def test_empty():
+    empty = np.array([])
+    assert batchcandles.heikinAshi(empty, empty, empty, empty)[0].size == 0
+    assert batchcandles.averageTrueRanges(empty, empty, empty, empty, WINDOW).size == 0
+    assert batchcandles.moveSizes(empty, empty).size == 0
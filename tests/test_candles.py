@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:34:52 2026
+"""
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+import candles
+
+
+def colorCandles(n, seed=0, doji=0.2, start=()):
+    """ candlesticks of a random color sequence, doji (black) ones open at their close
+        *start forces the colors of the first candlesticks """
+    rng = np.random.default_rng(seed)
+    colors = rng.choice(['green', 'red', 'black'], n, p=[(1 - doji)/2, (1 - doji)/2, doji])
+    colors[:len(start)] = start
+    rows, price = [], 100.0
+    for color in colors:
+        step = float(rng.integers(1, 4))
+        close = price + step if color == 'green' else price - step if color == 'red' else price
+        rows.append({'open': price, 'high': max(price, close) + 1,
+                     'low': min(price, close) - 1, 'close': close})
+        price = close
+    return rows
+
+
+def referenceColor(candlesticks, moves_ago=0):
+    try:
+        return candles.candleColor(candlesticks.iloc[-(1 + moves_ago)])
+    except Exception:
+        return 'black'
+
+
+def referenceMoveStatus(candlesticks, move_size=1, current_color='', moves_ago=0):
+    """ the recursive moveStatus MoveTracker replaced """
+    if moves_ago:
+        candlesticks = candlesticks.head(-moves_ago)
+    try:
+        current_color  = current_color or referenceColor(candlesticks)
+        previous_color = referenceColor(candlesticks, moves_ago=move_size)
+    except Exception:
+        previous_color = 'none'
+    if current_color == previous_color:
+        try:
+            return referenceMoveStatus(candlesticks, move_size + 1, current_color=previous_color)
+        except Exception:
+            pass
+    return {'color'        : current_color,
+            'size'         : move_size,
+            'price_change' : candles.priceChange(candlesticks, -move_size, -1)}
+
+
+def referenceSignalBar(candlesticks, thresh=4):
+    """ the isSignalBar of the recursive moveStatus """
+    if not candlesticks.size:
+        return False, 'none'
+    elif candlesticks.shape[0] == 1:
+        return False, referenceColor(candlesticks)
+    move_status = referenceMoveStatus(candlesticks)
+    if move_status['size'] == 1 and move_status['color'] != 'black':
+        if referenceMoveStatus(candlesticks, moves_ago=1)['size'] >= thresh:
+            return True, move_status['color']
+    return False, move_status['color']
+
+
+@pytest.mark.parametrize('seed,start', [(0, ()), (1, ()), (2, ('black',)*3), (3, ('green',)*6)])
+def test_move_tracker_matches_recursive_move_status(seed, start):
+    rows = colorCandles(120, seed, start=start)
+    frame = DataFrame(rows)
+    tracker = candles.MoveTracker()
+    assert candles.isSignalBar(tracker) == referenceSignalBar(frame.head(0))
+    for i, row in enumerate(rows):
+        tracker.update(row)
+        bars = frame.head(i + 1)
+        assert len(tracker) == i + 1
+        assert candles.moveStatus(tracker) == referenceMoveStatus(bars)
+        if i:
+            assert candles.moveStatus(tracker, moves_ago=1) == referenceMoveStatus(bars, moves_ago=1)
+        for thresh in (1, 2, 3, 4):
+            assert candles.isSignalBar(tracker, thresh=thresh) == referenceSignalBar(bars, thresh)
+
+
+def test_move_tracker_only_tracks_two_bars():
+    tracker = candles.MoveTracker()
+    tracker.update({'open': 1.0, 'close': 2.0})
+    with pytest.raises(IndexError):
+        tracker.status(1)
+    with pytest.raises(ValueError):
+        tracker.status(2)
+
+
+def expandedSizes(history, color=''):
+    return np.array([move['size'] for move in history if color in ('', move['color'])])
+
+
+@pytest.mark.parametrize('color', ['', 'red', 'green', 'black'])
+def test_move_histogram_stats_match_the_expanded_sizes(color):
+    frame = DataFrame(colorCandles(400, seed=4))
+    history = candles.moveHistory(frame)
+    sizes = expandedSizes(history, color)
+    histograms = [candles.MoveHistogram(frame), candles.MoveHistogram(move_history=history)]
+    moves = candles.MoveHistogram()
+    for move in history:
+        moves.addMove(move)
+    histograms.append(moves)
+    for histogram in histograms:
+        sizeCounts = dict(zip(*np.unique(sizes, return_counts=True)))
+        assert histogram.getHistogram(color) == {int(k): int(v) for k, v in sizeCounts.items()}
+        assert sorted(histogram.get_list(color).tolist()) == sorted(sizes.tolist())
+        assert histogram.get_average(color) == pytest.approx(sizes.mean(), rel=1e-12)
+        assert histogram.std(color) == pytest.approx(sizes.std(), rel=1e-12)
+        stats = histogram.get_stats(color)
+        assert stats['mean'] == pytest.approx(sizes.mean(), rel=1e-12)
+        assert stats['std'] == pytest.approx(sizes.std(), rel=1e-12)
+        assert stats['ratio'] == pytest.approx(sizes.mean()/sizes.std(), rel=1e-12)
+
+
+def test_move_histograms_do_not_share_counts():
+    first = candles.MoveHistogram(move_history=[{'color': 'red', 'size': 3}])
+    second = candles.MoveHistogram()
+    assert second.getHistogram() == second.getHistogram('red') == {}
+    second.addMove({'color': 'green', 'size': 2})
+    assert first.getHistogram() == {3: 1}
+    assert first.getHistogram('green') == {}
+    assert second.getHistogram() == {2: 1}
+    assert np.isnan(second.get_average('red'))
+
+
+def test_move_histogram_rejects_unknown_colors():
+    histogram = candles.MoveHistogram(move_history=[{'color': 'red', 'size': 3}])
+    with pytest.raises(KeyError):
+        histogram.addMove({'color': 'blue', 'size': 2})
+    with pytest.raises(KeyError):
+        histogram.addHistory([{'color': 'green', 'size': 1}, {'color': 'none', 'size': 1}])
+    assert histogram.getHistogram() == histogram.getHistogram('red') == {3: 1}
+    assert histogram.getHistogram('green') == {}
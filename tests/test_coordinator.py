@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:26:03 2026
+"""
+import os
+import time
+import signal
+import threading
+import socket
+import multiprocessing
+
+import pytest
+
+import utils
+from sweeps import algoConfigs, sweep
+from coordinator import SweepCoordinator, work
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def configs():
+    base = utils.readConfig(os.path.join(ROOT, 'algos', 'mike.ini'))
+    return algoConfigs(base, {'ticksperbar': [10, 25], 'profit_buffer': [1, 2, 3]})
+
+
+def startWorkers(address, authkey, directory, processes):
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(target=work, args=(address, authkey, directory), daemon=True)
+        for _ in range(processes)
+    ]
+    for process in workers:
+        process.start()
+    return workers
+
+
+def workerName(process):
+    return f'{socket.gethostname()}:{process.pid}'
+
+
+def comparable(results):
+    return results.drop(columns=['seconds', 'worker'], errors='ignore')
+
+
+@pytest.fixture
+def recording(writeRecording):
+    return writeRecording()
+
+
+def test_two_workers_match_a_local_sweep(recording, tmp_path):
+    local = sweep(configs(), [recording], processes=1, revtime=30)
+    coordinator = SweepCoordinator(('127.0.0.1', 0), 'k3y', timeout=10).start()
+    workers = startWorkers(coordinator.address, 'k3y', str(tmp_path / 'sweep_ticks'), 2)
+    try:
+        served = sweep(configs(), [recording], revtime=30, coordinator=coordinator)
+    finally:
+        coordinator.close()
+        for process in workers:
+            process.join(30)
+    assert [process.exitcode for process in workers] == [0, 0]
+    assert 'error' not in served
+    assert set(served['worker']) <= {workerName(process) for process in workers}
+    assert comparable(served).equals(comparable(local))
+
+
+def test_stopped_worker_job_is_requeued(recording, tmp_path):
+    local = sweep(configs(), [recording], processes=1, revtime=30)
+    coordinator = SweepCoordinator(('127.0.0.1', 0), 'k3y', retries=1, timeout=2).start()
+    workers = startWorkers(coordinator.address, 'k3y', str(tmp_path / 'sweep_ticks'), 2)
+    stopped, other = workers
+
+    def stop():
+        # stopped once it sent its first result, it already holds its next job
+        while coordinator.workers.get(workerName(stopped), 0) < 1:
+            time.sleep(0.01)
+        os.kill(stopped.pid, signal.SIGSTOP)
+
+    threading.Thread(target=stop, daemon=True).start()
+    while len(coordinator.workers) < 2:
+        time.sleep(0.01)
+    try:
+        served = sweep(configs(), [recording], revtime=30, coordinator=coordinator)
+    finally:
+        coordinator.close()
+        os.kill(stopped.pid, signal.SIGKILL)
+        other.join(30)
+    assert other.exitcode == 0
+    assert coordinator.requeued == 1
+    assert 'error' not in served
+    assert (served['worker'] == workerName(stopped)).sum() == 1
+    assert (served['worker'] == workerName(other)).sum() == len(served) - 1
+    assert comparable(served).equals(comparable(local))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:58:30 2026
+"""
+import pytest
+
+from backtest import BacktestTrader
+from indicators import FormingATR
+from recording import readTicks, readContracts
+from indicatorcache import IndicatorCache, ReplayBarBuilder, ReplayATR, ReplayDirectionalMovement
+
+
+def backtestStreams(path, indicators=None, late=0):
+    """ every data stream of a backtest with tick bars, ATR, DMI and ADX windows
+        *late seconds of ticks are replayed before the last windows are added """
+    ib = BacktestTrader(path, indicators=indicators)
+    try:
+        contract = next(iter(readContracts(path).values()))
+        ib.addTickBars(contract, 10, ATR_windows=[3, 14])
+        ib.addTickBars(contract, 25, ATR_windows=[14])
+        ib.addDMI(contract, 10, 14)
+        ib.addADX(contract, 10, 5)
+        ib.addADX(contract, 25, 14)
+        if late:
+            ib.sleep(late)
+            ib.addTickBars(contract, 10, ATR_windows=[7])
+            ib.addADX(contract, 10, 14)
+            ib.addDMI(contract, 25, 3)
+        ib.sleep(3600)
+        tickBars = ib.tickBars[contract.symbol]
+        state = {
+            'builders': {tpb: type(b) for tpb, b in ib.barAggregators[contract.symbol].builders.items()},
+            'ATR'     : {(tpb, w): type(atr['state']) for tpb in tickBars for w, atr in tickBars[tpb]['ATR'].items()},
+            'DM'      : {tpb: type(tickBars[tpb]['DM']) for tpb in tickBars},
+            'moves'   : {
+                (tpb, kind): (tracker.status(), len(tracker))
+                for tpb in tickBars for kind, tracker in tickBars[tpb]['moves'].items()
+            }
+        }
+        return {name: stream() for name, stream in ib._data_streams.items()}, state
+    finally:
+        ib.disconnect()
+
+
+def assertSameStreams(cached, fresh):
+    assert sorted(cached) == sorted(fresh)
+    for name, stream in fresh.items():
+        assert cached[name].equals(stream), name
+
+
+@pytest.mark.parametrize('late', [0, 200])
+def test_tape_replay_matches_a_fresh_backtest(writeRecording, late):
+    path = writeRecording(n=3000)
+    fresh, freshState = backtestStreams(path, late=late)
+    indicators = IndicatorCache(readTicks(path))
+    cached, cachedState = backtestStreams(path, indicators, late=late)
+    assert indicators.computed
+    assert cachedState['builders'] == {10: ReplayBarBuilder, 25: ReplayBarBuilder}
+    assert cachedState['DM'] == {10: ReplayDirectionalMovement, 25: ReplayDirectionalMovement}
+    assert cachedState['ATR'][(10, 3)] is cachedState['ATR'][(25, 14)] is ReplayATR
+    if late:
+        # windows added after the first tick are computed, as without the cache
+        assert cachedState['ATR'][(10, 7)] is FormingATR
+    assert cachedState['moves'] == freshState['moves']
+    assert any(len(stream) for name, stream in fresh.items() if name.startswith('ADX_'))
+    assertSameStreams(cached, fresh)
+    # a second backtest reads every tape from the cache
+    computed = indicators.computed
+    again, _ = backtestStreams(path, indicators, late=late)
+    assert indicators.computed == computed and indicators.hits
+    assertSameStreams(again, fresh)
+
+
+def test_saved_tapes_match_a_fresh_backtest(writeRecording, tmp_path):
+    path = writeRecording(n=2000)
+    fresh, _ = backtestStreams(path)
+    saving = IndicatorCache(readTicks(path), directory=str(tmp_path / 'tapes'), digest='d'*64)
+    backtestStreams(path, saving)
+    loading = IndicatorCache(readTicks(path), directory=str(tmp_path / 'tapes'), digest='d'*64)
+    loaded, _ = backtestStreams(path, loading)
+    assert saving.computed and not loading.computed
+    assertSameStreams(loaded, fresh)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 03:04:26 2026
+"""
+import numpy as np
+import pytest
+from pandas import DataFrame, Series
+
+import candles
+from stores import BarStore, ColumnStore
+from indicators import FormingATR, MovingAverage, DirectionalMovement
+from ibxdata import movingAverage, get_smoothed_value
+
+
+def formingBars(n_ticks, ticksPerBar, seed=0):
+    """ forming bar after every tick of a random walk, as TickBarBuilder fills it """
+    rng = np.random.default_rng(seed)
+    prices = np.round(100 + np.cumsum(rng.normal(0, 0.5, n_ticks))*4)/4
+    bars, bar = [], {}
+    for price in prices.tolist():
+        if not bar or bar['ticks'] == ticksPerBar:
+            bar = {'open': price, 'high': price, 'low': price, 'close': price, 'ticks': 0}
+        bar['high'], bar['low'] = max(bar['high'], price), min(bar['low'], price)
+        bar['close'] = price
+        bar['ticks'] += 1
+        bars.append(dict(bar))
+    return bars
+
+
+def referenceATR(bars, ticksPerBar, window, start=0):
+    """ forming/formed values and slopes of the ATR updates before FormingATR,
+        reading the true ranges of the closed bars with candles.trueRange
+        *the ATR is added at bar start, its formed values start from there """
+    closed, rows = [], []
+    formed, forming = [], []
+    for i, bar in enumerate(bars):
+        r = bar['ticks']/ticksPerBar
+        if r == 1.0:
+            closed.append(bar)
+        if i < start:
+            continue
+        candlesticks = DataFrame(closed, columns=['open', 'high', 'low', 'close'])
+        if r == 1.0:
+            formingTR = candles.trueRange(candlesticks, 1)
+        else:
+            prev_close = closed[-1]['close'] if closed else bar['open']
+            formingTR = max(bar['high']-bar['low'],
+                            abs(prev_close-bar['high']),
+                            abs(prev_close-bar['low']))
+        avgTrueRange = formed[-1] if formed else 0
+        if len(closed) > window:
+            removedRange = candles.trueRange(candlesticks, window + int(r))
+            newATR = avgTrueRange + r*(formingTR - removedRange)/window
+        else:
+            newATR = (avgTrueRange*len(closed) + r*formingTR)/(len(closed) + r)
+        forming.append(newATR)
+        if r == 1.0:
+            formed.append(newATR)
+        new_formed = formed[-1] if formed else 0
+        old_formed = formed[-2] if len(formed) > 1 else 0
+        if r == 1.0:
+            slope = new_formed - old_formed
+            rows.append((newATR, slope, newATR, slope))
+        else:
+            slope = r*(newATR - new_formed) + (1-r)*(new_formed - old_formed)
+            rows.append((newATR, slope, None, None))
+    return rows
+
+
+def formingATR(bars, ticksPerBar, window, start=0):
+    closed = BarStore()
+    for i, bar in enumerate(bars[:start]):
+        if bar['ticks'] == ticksPerBar:
+            closed.append(i, bar)
+    atr, rows = FormingATR(window, closed), []
+    for bar in bars[start:]:
+        r = bar['ticks']/ticksPerBar
+        atr.update(bar, r)
+        if r == 1.0:
+            rows.append((atr.forming, atr.formingSlope, atr.formed, atr.formedSlope))
+        else:
+            rows.append((atr.forming, atr.formingSlope, None, None))
+    return rows
+
+
+@pytest.mark.parametrize('ticksPerBar,window', [(1, 3), (5, 3), (10, 14), (7, 1)])
+def test_forming_atr_matches_candles(ticksPerBar, window):
+    bars = formingBars(600, ticksPerBar)
+    assert formingATR(bars, ticksPerBar, window) == referenceATR(bars, ticksPerBar, window)
+
+
+@pytest.mark.parametrize('start', [1, 23, 260])
+def test_forming_atr_added_mid_session(start):
+    bars = formingBars(600, 10, seed=1)
+    assert formingATR(bars, 10, 14, start) == referenceATR(bars, 10, 14, start)
+
+
+def referenceMovingAverage(values, window, **kwargs):
+    """ the rolling/ewm movingAverage path that windowedEwm replaced """
+    window = min(values.size, window) if window > 0 else values.size
+    if window <= 1:
+        return values
+    if kwargs:
+        seed = Series(
+            [values.head(x+1).ewm(**kwargs).mean().iloc[-1] for x in range(window)],
+            index=values.index[:window]
+        )
+        return values.rolling(window).apply(
+            lambda x: x.tail(window).ewm(**kwargs).mean().iloc[-1]
+        ).fillna(value=seed)
+    seed = Series([values.head(x+1).mean() for x in range(window)], index=values.index[:window])
+    return values.rolling(window).mean().fillna(value=seed)
+
+
+MOVING_AVERAGES = [
+    (0, {}), (5, {}), (5, {'span': 3}), (8, {'alpha': 0.3, 'adjust': False}), (4, {'halflife': 2}),
+    (0, {'com': 2}), (1, {'span': 4}), (70, {'span': 6})
+]
+
+
+@pytest.mark.parametrize('window,kwargs', MOVING_AVERAGES)
+def test_moving_average_matches_moving_average(window, kwargs):
+    values = np.random.default_rng(2).normal(0, 1, 60).cumsum()
+    ma = MovingAverage(window, **kwargs)
+    incremental = [ma.update(values[:i+1]) for i in range(values.size)]
+    expected = referenceMovingAverage(Series(values), window, **kwargs)
+    np.testing.assert_allclose(incremental, expected.to_numpy(), rtol=1e-9)
+
+
+@pytest.mark.parametrize('window,kwargs', MOVING_AVERAGES)
+def test_moving_average_function_matches_reference(window, kwargs):
+    values = Series(np.random.default_rng(3).normal(0, 1, 60).cumsum())
+    expected = referenceMovingAverage(values, window, **kwargs)
+    complete = movingAverage(values, window, complete=True, **kwargs)
+    np.testing.assert_allclose(complete.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert movingAverage(values, window, **kwargs) == pytest.approx(expected.iloc[-1], rel=1e-9)
+
+
+@pytest.mark.parametrize('window,kwargs', MOVING_AVERAGES)
+@pytest.mark.parametrize('steps_back', [1, 7, 59])
+def test_moving_average_steps_back_matches_reference(window, kwargs, steps_back):
+    values = Series(np.random.default_rng(4).normal(0, 1, 60).cumsum())
+    expected = referenceMovingAverage(values.head(-steps_back), window, **kwargs)
+    complete = movingAverage(values, window, steps_back, complete=True, **kwargs)
+    np.testing.assert_allclose(complete.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    last = movingAverage(values, window, steps_back, **kwargs)
+    assert last == pytest.approx(expected.iloc[-1], rel=1e-9)
+
+
+@pytest.mark.parametrize('kwargs', [{'span': 3, 'min_periods': 2}, {'alpha': 0.5, 'ignore_na': True}])
+def test_moving_average_rejects_unsupported_kwargs(kwargs):
+    with pytest.raises(ValueError):
+        MovingAverage(5, **kwargs)
+
+
+def closedBars(n, flat=0, seed=0):
+    """ n closed OHLC bars of a random walk, the first flat ones without any range """
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + np.cumsum(rng.normal(0, 1, n))*4)/4
+    close[:flat] = close[0]
+    rows = []
+    for i, price in enumerate(close.tolist()):
+        open_ = rows[-1]['close'] if rows else price
+        spread = 0 if i < flat else float(rng.integers(0, 4))/4
+        rows.append({
+            'open': open_, 'close': price, 'ticks': 10,
+            'high': max(open_, price) + spread, 'low': min(open_, price) - spread
+        })
+    return rows
+
+
+def referenceDirectionalMovement(rows, windows, adxWindows, start=0):
+    """ the Series STR/DMI/ADX handlers DirectionalMovement replaced, windows added after start bars """
+    bars = BarStore()
+    sTRs, DMIs, ADXs = {}, {}, {}
+    for i, row in enumerate(rows):
+        if i == start:
+            for window in windows:
+                sTRs[window] = Series(dtype=float)
+                DMIs[window] = {
+                    'DM': {'plus': Series(dtype=float), 'minus': Series(dtype=float)},
+                    'DI': {'plus': Series(dtype=float), 'minus': Series(dtype=float)}
+                }
+            for window in adxWindows:
+                ADXs[window] = Series(dtype=float)
+        bars.append(i, row)
+        if len(bars) <= 1:
+            continue
+        newTR = bars.trueRange(1)
+        for window, values in sTRs.items():
+            sTRs[window].at[i] = get_smoothed_value(values, newTR, window)
+        DM_plus = max(bars.last('high') - bars.last('high', 1), 0)
+        DM_minus = max(bars.last('low', 1) - bars.last('low'), 0)
+        if DM_plus > DM_minus:
+            DM_minus = 0
+        elif DM_minus > DM_plus:
+            DM_plus = 0
+        else:
+            DM_minus = DM_plus = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for window, DMI in DMIs.items():
+                smoothDM_plus = get_smoothed_value(DMI['DM']['plus'], DM_plus, window)
+                smoothDM_minus = get_smoothed_value(DMI['DM']['minus'], DM_minus, window)
+                smoothTR = sTRs[window].iloc[-1]
+                DMI['DM']['plus'].at[i] = smoothDM_plus
+                DMI['DM']['minus'].at[i] = smoothDM_minus
+                DMI['DI']['plus'].at[i] = 100*smoothDM_plus/smoothTR
+                DMI['DI']['minus'].at[i] = 100*smoothDM_minus/smoothTR
+            for window, values in ADXs.items():
+                dmi = DMIs[window]['DI']
+                if dmi['plus'].size >= window:
+                    di_plus, di_minus = dmi['plus'].iloc[-1], dmi['minus'].iloc[-1]
+                    dx = 100*abs(di_plus - di_minus)/abs(di_plus + di_minus)
+                    ADXs[window].at[i] = get_smoothed_value(values, dx, window)
+    dmi = {
+        window: DataFrame({
+            'STR': sTRs[window], 'DMplus': DMIs[window]['DM']['plus'],
+            'DMminus': DMIs[window]['DM']['minus'], 'DIplus': DMIs[window]['DI']['plus'],
+            'DIminus': DMIs[window]['DI']['minus']
+        })
+        for window in windows
+    }
+    return dmi, ADXs
+
+
+def directionalMovement(rows, windows, adxWindows, start=0):
+    bars, dm = BarStore(), DirectionalMovement()
+    DMIs, ADXs = {}, {}
+    for i, row in enumerate(rows):
+        if i == start:
+            for window in windows:
+                DMIs[window] = ColumnStore(DirectionalMovement.DMI_columns)
+                dm.addDMI(window, DMIs[window])
+            for window in adxWindows:
+                ADXs[window] = ColumnStore(DirectionalMovement.ADX_columns)
+                dm.addADX(window, ADXs[window])
+        bars.append(i, row)
+        dm.update(bars, i)
+    return DMIs, ADXs
+
+
+@pytest.mark.parametrize('flat,start', [(0, 0), (5, 0), (20, 0), (40, 0), (0, 37), (3, 1)])
+def test_directional_movement_matches_series_handlers(flat, start):
+    rows = closedBars(200, flat, seed=flat + start)
+    windows, adxWindows = [1, 3, 14, 30], [3, 14, 30]
+    expectedDMI, expectedADX = referenceDirectionalMovement(rows, windows, adxWindows, start)
+    DMIs, ADXs = directionalMovement(rows, windows, adxWindows, start)
+    for window in windows:
+        frame = DMIs[window].frame()
+        expected = expectedDMI[window]
+        assert DMIs[window].times.tolist() == expected.index.tolist()
+        np.testing.assert_allclose(
+            frame[list(expected.columns)].to_numpy(), expected.to_numpy(), rtol=1e-12
+        )
+    for window in adxWindows:
+        assert ADXs[window].times.tolist() == expectedADX[window].index.tolist()
+        np.testing.assert_allclose(
+            ADXs[window].values('ADX'), expectedADX[window].to_numpy(dtype=float), rtol=1e-12
+        )
+    if flat > 1 and start < flat:
+        # flat warm-up bars have no range, DI is NaN as it was
+        assert np.isnan(DMIs[3].values('DIplus')[0])
+    if flat > 30:
+        assert np.isnan(ADXs[30].values('ADX')).all()
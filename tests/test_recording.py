@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:48:21 2026
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import eventkit
+from ib_insync import Forex
+
+from ticks import TickRouter
+from recording import TickRecorder, TickReplay, readTicks, readContracts, mergeTicks
+from conftest import syntheticTicks
+
+EUR = Forex('EURUSD', conId=1, exchange='IDEALPRO')
+GBP = Forex('GBPUSD', conId=2, exchange='IDEALPRO')
+
+
+def twoContracts():
+    """ interleaved ticks of two contracts, some batches hold both, GBP first """
+    eur = syntheticTicks(300, seed=1, conId=EUR.conId)
+    gbp = syntheticTicks(300, seed=2, conId=GBP.conId)
+    gbp['time'][::3] = eur['time'][::3]
+    ticks = mergeTicks(gbp, eur)
+    assert (np.diff(ticks['time']) == 0).sum() >= 100
+    return ticks
+
+
+def routed(*paths, ticks=None, contracts=()):
+    """ TickReplay, TickRouter and the (time, conIds) of every batch replayed """
+    ib = SimpleNamespace(pendingTickersEvent=eventkit.Event())
+    router, batches = TickRouter(), []
+    ib.pendingTickersEvent += router.route
+    router.batchEvent += lambda batch: batches.append(
+        (int(batch.time[0]), batch.conId.tolist(), batch.bid.tolist(), batch.ask.tolist())
+    )
+    return TickReplay(ib, *paths, ticks=ticks, contracts=contracts), router, batches
+
+
+def test_replay_batches_keep_first_appearance_order():
+    ticks = twoContracts()
+    replay, _, batches = routed(ticks=ticks)
+    replay.replay()
+    order = [conIds for _, conIds, _, _ in batches]
+    assert order == [
+        [ticker.contract.conId for ticker in tickers]
+        for _, tickers in replay.batches(0, len(replay))
+    ]
+    assert sum(order, []) == ticks['conId'].tolist()
+    assert [GBP.conId, EUR.conId] in order
+    assert [EUR.conId, GBP.conId] not in order
+
+
+def test_record_read_replay_round_trip(tmp_path):
+    source = twoContracts()
+    path = str(tmp_path / 'ticks.bin')
+    replay, router, batches = routed(ticks=source)
+    recorder = TickRecorder(path, conIds={EUR.conId, GBP.conId}, contracts=[EUR, GBP])
+    recorder.start(router)
+    replay.replay(int(source['time'][150]))
+    # every recorded batch is already in the file while recording
+    assert readTicks(path).tolist() == source[:replay.cursor].tolist()
+    replay.replay()
+    recorder.stop()
+    recorded = readTicks(path)
+    assert recorded.tolist() == source.tolist()
+    assert recorder.ticks == source.size
+    assert {c.conId: c.symbol for c in readContracts(path).values()} == {1: 'EUR', 2: 'GBP'}
+
+    again, _, replayed = routed(path, contracts=readContracts(path).values())
+    assert again.replay() == source.size
+    assert replayed == batches
+    assert {again.contract(conId).symbol for conId in (1, 2)} == {'EUR', 'GBP'}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:20:16 2026
+"""
+import os
+
+import numpy as np
+import pytest
+
+import utils
+import sweeps
+from recording import readTicks, readContracts, writeTicks
+from replaycache import ReplayCache, ticksDigest
+from strategies import Scalping, get_strategy_class
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPTIONS = {'revtime': 30.0, 'runtime': None, 'cutoff': None}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReplayCache(str(tmp_path / 'cache'), source='a'*64)
+
+
+@pytest.fixture
+def config():
+    return utils.readConfig(os.path.join(ROOT, 'algos', 'mike.ini'))
+
+
+def test_key_follows_ticks_config_options_and_source(cache, config, writeRecording):
+    path = writeRecording(n=100)
+    digest = ticksDigest([path])
+    key = cache.key(digest, Scalping, config, OPTIONS)
+    assert key == cache.key(digest, Scalping, dict(config), dict(OPTIONS))
+    assert key.startswith('Scalping-aaaaaaaaaaaa-')
+
+    ticks = readTicks(path, mmap=False)
+    ticks['bid'][-1] += 0.0001
+    writeTicks(path, ticks, readContracts(path).values())
+    assert ticksDigest([path]) != digest
+    assert cache.key(ticksDigest([path]), Scalping, config, OPTIONS) != key
+
+    assert cache.key(digest, Scalping, dict(config, profit_buffer='3'), OPTIONS) != key
+    assert cache.key(digest, Scalping, config, dict(OPTIONS, revtime=60.0)) != key
+    other = ReplayCache(cache.directory, source='b'*64)
+    assert other.key(digest, Scalping, config, OPTIONS) != key
+    assert get_strategy_class(config['strategy']) is Scalping
+
+
+def test_hit_returns_the_stored_result_without_a_backtest(cache, config, writeRecording, monkeypatch):
+    path = writeRecording(n=1500)
+    ticks, contracts = readTicks(path), list(readContracts(path).values())
+    options = dict(revtime=30, cache=cache, digest=ticksDigest([path]))
+    row = sweeps.replayConfig(config, ticks, contracts, **options)
+    assert row['cached'] is False and cache.misses == 1
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError('a cached replay built a backtest')
+    monkeypatch.setattr(sweeps, 'BacktestTrader', unexpected)
+    cached = sweeps.replayConfig(config, ticks, contracts, **options)
+    assert cached == dict(row, cached=True)
+    assert cache.hits == 1
+    with pytest.raises(AssertionError):
+        sweeps.replayConfig(dict(config, profit_buffer='3'), ticks, contracts, **options)
+
+
+def test_eviction_removes_the_least_recently_used(cache):
+    keys = [f'Scalping-aaaaaaaaaaaa-{i}.pkl' for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.put(key, {'PnL': float(i)}, np.zeros(100))
+        os.utime(cache.path(key), ns=(10**18 + i*10**9,)*2)
+    entry = os.path.getsize(cache.path(keys[0]))
+    # reading refreshes the mtime, so key 0 is now the most recently used
+    assert cache.get(keys[0])['summary'] == {'PnL': 0.0}
+    cache.max_bytes = 3*entry
+    cache.evict()
+    assert [os.path.basename(path) for _, _, path in cache.entries()] == [keys[2], keys[3], keys[0]]
+    assert cache.get(keys[1]) is None
+    cache.max_bytes = 2*entry
+    cache.put(keys[1], {'PnL': 1.0})
+    remaining = {os.path.basename(path) for _, _, path in cache.entries()}
+    assert remaining == {keys[0], keys[1]}
+    assert cache.size() <= cache.max_bytes
+
+
+def test_invalidate(cache):
+    cache.put('Scalping-aaaaaaaaaaaa-1.pkl', {})
+    cache.put('Scalping-bbbbbbbbbbbb-2.pkl', {})
+    cache.put('Trending-bbbbbbbbbbbb-3.pkl', {})
+    assert cache.invalidate('Scalping', stale=True) == 1
+    assert cache.invalidate(stale=True) == 1
+    assert cache.invalidate(Scalping) == 1
+    assert not cache.entries()
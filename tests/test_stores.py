@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+"""
+import numpy as np
+
+from stores import ColumnStore
+
+
+def test_frame_follows_appends_past_compactions():
+    store = ColumnStore(('x',), capacity=1, maxlen=3)
+    for i in range(60):
+        store.append(i, {'x': float(i)})
+        if i % 9 == 8:
+            expected = [float(j) for j in range(i - 2, i + 1)]
+            assert store.frame()['x'].tolist() == expected
+            assert store.frame().index.asi8.tolist() == [int(x) for x in expected]
+
+
+def test_frame_follows_extends_past_compactions():
+    store = ColumnStore(('x',), capacity=1, maxlen=4)
+    for i in range(0, 80, 2):
+        store.extend(np.array([i, i + 1]), x=np.array([i, i + 1], dtype=float))
+        if i % 12 == 10:
+            assert store.frame()['x'].tolist() == [float(j) for j in range(i - 2, i + 2)]
+
+
+def test_frame_is_reused_until_rows_arrive():
+    store = ColumnStore(('x',), maxlen=3)
+    store.append(0, {'x': 1.0})
+    frame = store.frame()
+    assert store.frame() is frame
+    store.append(1, {'x': 2.0})
+    assert store.frame() is not frame
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:02:55 2026
+"""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+import utils
+from strategy import Strategy, SingleContractStrategy
+
+
+@pytest.fixture
+def clock():
+    now = {'time': datetime.datetime(2020, 11, 2, 14)}
+    utils.Clock.source = lambda: now['time']
+    yield now
+    utils.Clock.source = None
+
+
+def test_entry_wait_follows_the_replayed_clock(clock):
+    resets = []
+    strategy = SimpleNamespace(wait_time=30, resetExposure=lambda: resets.append(utils.getTime()))
+    Strategy.stop_entry(strategy)
+    assert strategy.entry_blocked
+    assert strategy.wait_start == datetime.datetime(2020, 11, 2, 14).replace(
+        tzinfo=datetime.timezone.utc).timestamp()
+    clock['time'] += datetime.timedelta(seconds=30)
+    SingleContractStrategy.close_if_time(strategy)
+    assert not resets
+    clock['time'] += datetime.timedelta(seconds=1)
+    SingleContractStrategy.close_if_time(strategy)
+    assert resets == [strategy.wait_start + 31]
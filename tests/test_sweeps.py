@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 12:07:44 2026
+"""
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+
+import utils
+import sweeps
+from recording import readTicks, readContracts, mergeTicks
+from sweeps import algoConfigs, mergeRecordings, sweep
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def tempdir(tmp_path, monkeypatch):
+    directory = tmp_path / 'temp'
+    directory.mkdir()
+    monkeypatch.setattr(tempfile, 'tempdir', str(directory))
+    return directory
+
+
+def test_single_recording_is_not_copied(writeRecording, tempdir):
+    path = writeRecording()
+    assert mergeRecordings([path]) == ([path], None)
+    assert not list(tempdir.iterdir())
+
+
+def test_recordings_are_merged_once_into_a_temporary_recording(writeRecording, tempdir):
+    paths = [writeRecording('a.bin', 500, seed=1), writeRecording('b.bin', 700, seed=2)]
+    merged, temp = mergeRecordings(paths)
+    assert merged == [temp] and os.path.dirname(temp) == str(tempdir)
+    ticks = readTicks(temp)
+    assert isinstance(ticks, np.memmap)
+    expected = mergeTicks(*[readTicks(path) for path in paths])
+    assert ticks.tolist() == expected.tolist()
+    assert list(readContracts(temp)) == list(readContracts(paths[0]))
+
+
+def test_pool_sweep_of_several_recordings(writeRecording, tempdir):
+    paths = [writeRecording('a.bin', 1500, seed=1), writeRecording('b.bin', 1500, seed=2)]
+    base = utils.readConfig(os.path.join(ROOT, 'algos', 'mike.ini'))
+    configs = algoConfigs(base, {'profit_buffer': [1, 2]})
+    local = sweep(configs, paths, processes=1, revtime=30)
+    pooled = sweep(configs, paths, processes=2, revtime=30)
+    assert 'error' not in pooled
+    assert pooled.drop(columns='seconds').equals(local.drop(columns='seconds'))
+    assert not list(tempdir.iterdir())
+
+
+class StubSweep:
+    """ sweeps.sweep standing in for the backtests, PnL is pnl(config, runtime)
+        *records (config x values, runtime) of every call """
+
+    def __init__(self, pnl):
+        self.pnl = pnl
+        self.calls = []
+
+    def __call__(self, configs, paths, processes=0, revtime=0, runtime=None, cutoff=None,
+                 cache=None, indicators=None, coordinator=None):
+        self.calls.append(([config['x'] for config in configs], runtime))
+        return DataFrame([
+            {'x': config['x'], 'PnL': self.pnl(config, runtime), 'stopped': False}
+            for config in configs
+        ])
+
+
+def xConfigs(n):
+    return [{'x': x} for x in range(n)]
+
+
+@pytest.mark.parametrize('min_runtime,max_runtime,eta,runtimes', [
+    (60, 600, 3, [60, 180, 540, 600]),
+    (60, 540, 3, [60, 180, 540]),
+    (1, 27, 3, [1, 3, 9, 27]),
+    (10, 100, 2, [10, 20, 40, 80, 100]),
+    (60, 50, 3, [50]),
+])
+def test_rung_runtimes(min_runtime, max_runtime, eta, runtimes):
+    assert sweeps.rungRuntimes(min_runtime, max_runtime, eta) == runtimes
+
+
+def test_successive_halving_promotes_the_best_of_each_rung(monkeypatch):
+    # the best configs change from rung to rung, so every rung must rank its own results
+    stub = StubSweep(lambda config, runtime: config['x'] if runtime < 9 else -config['x'])
+    monkeypatch.setattr(sweeps, 'sweep', stub)
+    results = sweeps.successiveHalving(xConfigs(27), ['ticks.bin'], eta=3, min_runtime=1, max_runtime=27)
+    assert [runtime for _, runtime in stub.calls] == [1, 3, 9, 27]
+    assert [len(xs) for xs, _ in stub.calls] == [27, 9, 3, 1]
+    assert [sorted(xs) for xs, _ in stub.calls[1:]] == [list(range(18, 27)), [24, 25, 26], [24]]
+    assert results.groupby('rung')['promoted'].sum().tolist() == [9, 3, 1, 0]
+    assert results['config'].tolist() == [x for xs, _ in stub.calls for x in xs]
+    assert (results['config'] == results['x']).all()
+    assert sweeps.best(results)['config'] == 24
+
+
+def test_successive_halving_drops_stopped_and_cut_off_runs(monkeypatch):
+    stub = StubSweep(lambda config, runtime: config['x'] - 5)
+    monkeypatch.setattr(sweeps, 'sweep', stub)
+    results = sweeps.successiveHalving(
+        xConfigs(9), ['ticks.bin'], eta=3, min_runtime=1, max_runtime=9, cutoff=2
+    )
+    assert [sorted(xs) for xs, _ in stub.calls] == [list(range(9)), [7, 8], [8]]
+    assert results[results['rung'] == 0]['promoted'].sum() == 2
+    assert sweeps.promoted(DataFrame({
+        'config': [0, 1, 2, 3], 'PnL': [5.0, float('nan'), 9.0, 1.0], 'stopped': [False, False, True, False]
+    }), 3) == [0, 3]
+    assert sweeps.promoted(DataFrame({'config': [0], 'error': ['boom']}), 1) == []
+
+
+def test_hyperband_brackets(monkeypatch):
+    stub = StubSweep(lambda config, runtime: config['x'])
+    monkeypatch.setattr(sweeps, 'sweep', stub)
+    configs = xConfigs(40)
+    results = sweeps.hyperband(configs, ['ticks.bin'], eta=3, min_runtime=1, max_runtime=9, seed=7)
+    # runtimes 1, 3, 9: brackets start 9 configs on 1, 5 on 3 and 3 on 9
+    assert results.groupby('bracket')['runtime'].min().tolist() == [1, 3, 9]
+    assert results[results['rung'] == 0].groupby('bracket').size().tolist() == [9, 5, 3]
+    assert [runtime for _, runtime in stub.calls] == [1, 3, 9, 3, 9, 9]
+    assert [len(xs) for xs, _ in stub.calls] == [9, 3, 1, 5, 2, 3]
+    assert (results['x'] == results['config']).all()
+    for _, rows in results[results['rung'] == 0].groupby('bracket'):
+        assert rows['config'].is_unique
+    again = StubSweep(stub.pnl)
+    monkeypatch.setattr(sweeps, 'sweep', again)
+    assert sweeps.hyperband(configs, ['ticks.bin'], eta=3, min_runtime=1, max_runtime=9, seed=7).equals(results)
+    best = sweeps.best(results)
+    final = results[results['runtime'] == 9]
+    assert best['PnL'] == final['PnL'].max()
+
+
+def test_best_picks_the_maximum_of_the_longest_runs():
+    results = DataFrame({
+        'config' : [0, 1, 2, 1, 2],
+        'runtime': [1, 1, 1, 3, 3],
+        'PnL'    : [50.0, 4.0, 3.0, float('nan'), 7.0],
+    })
+    assert sweeps.best(results)['config'] == 2
+    assert sweeps.best(results.assign(PnL=float('nan'))) is None
+    assert sweeps.best(results.drop(columns='PnL')) is None
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 16:12:07 2026
+"""
+from types import SimpleNamespace
+
+import eventkit
+from ib_insync import Forex
+
+from backtest import BacktestTrader
+from recording import TickReplay, writeTicks, readTicks
+from ticks import TickRouter
+from conftest import syntheticTicks
+
+EUR = Forex('EURUSD', conId=12087792, exchange='IDEALPRO')
+EUR.increment = 0.00005
+
+
+def test_route_emits_routed_event_after_the_tick_handlers():
+    ticks = syntheticTicks(50)
+    ticks['time'][1::2] = ticks['time'][::2]
+    ib, router, calls = SimpleNamespace(pendingTickersEvent=eventkit.Event()), TickRouter(), []
+    ib.pendingTickersEvent += router.route
+    router.batchEvent += lambda batch: calls.append('batch')
+    router.subscribe(EUR, lambda price, time: calls.append('tick'))
+    router.routedEvent += lambda batch: calls.append('routed')
+    TickReplay(ib, ticks=ticks).replay()
+    assert calls == ['batch', 'tick', 'tick', 'routed']*25
+
+
+def test_tick_prices_never_lead_the_tick_handlers(tmp_path):
+    """ ticks sharing a timestamp arrive in one batch, the handlers of its
+        first tick must not see the later ticks in the price store """
+    path = str(tmp_path / 'ticks.bin')
+    ticks = syntheticTicks(500)
+    ticks['time'][1::2] = ticks['time'][::2]
+    writeTicks(path, ticks, [EUR])
+    ib, seen = BacktestTrader(path), []
+    try:
+        ib.addTickPrices(EUR)
+        prices = ib.prices[EUR.symbol]
+        ib.tickRouter.subscribe(EUR, lambda price, time: seen.append(
+            (time, len(prices), None if prices.empty else prices.lastTime())
+        ))
+        ib.sleep(3600)
+        assert len(seen) == len(ticks)
+        for i, (time, stored, last) in enumerate(seen):
+            assert stored == i - i % 2
+            assert last is None or last < time
+        assert (prices.times == readTicks(path)['time']).all()
+    finally:
+        ib.disconnect()
@@ -6,15 +6,21 @@ import os
 os.sys.path.insert(1, os.path.realpath('./daytrade'))
 from configparser import ConfigParser
 from trader import LiveTrader
+from backtest import BacktestTrader
 from strategyxframeworks import get_framework
 
 def main(framework, runtime, revtime, gateway, ibc, 
-         algos=[], save_data=True, file_exts=[]):
+         algos=[], save_data=True, file_exts=[], record_ticks='', backtest=[]):
     algo_files = [f'algos/{algo}.ini' for algo in algos]
-    ib = LiveTrader(mod=True, gateway=gateway)
+    if backtest:
+        ib = BacktestTrader(*backtest)
+        ibc = False
+    else:
+        ib = LiveTrader(mod=True, gateway=gateway)
     if ibc:
         ib.begin()
-    framework = get_framework(framework, ib, *algo_files, client_id=1)
+    framework = get_framework(framework, ib, *algo_files, 
+                              record_ticks=record_ticks, client_id=1)
     if framework:
         framework.run(runtime, revtime)
         if save_data:
@@ -38,7 +44,11 @@ if __name__ == '__main__':
     ibc = config.getboolean('Parameters', 'ibc')
     save_data = config.getboolean('Parameters', 'save_data')
     exts = config.get('Parameters', 'file_exts').split(',')
+    record_ticks = config.get('Parameters', 'record_ticks', fallback='')
+    backtest = config.get('Parameters', 'backtest', fallback='')
+    backtest = backtest.split(',') if backtest else []
     
     main(framework, runtime, revtime, gateway, ibc, 
-         algos=algos, save_data=save_data, file_exts=exts
+         algos=algos, save_data=save_data, file_exts=exts,
+         record_ticks=record_ticks, backtest=backtest
     )
\ No newline at end of file